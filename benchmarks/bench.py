@@ -0,0 +1,243 @@
+"""Performance benchmarks for the forecasting engine and the Streamlit app.
+
+Measures
+  * funnel throughput for 1, 1k and 1M scenarios per model,
+  * end-to-end script rerun time per tab through Streamlit's AppTest harness
+    (no browser), triggered by moving a slider in that tab,
+  * peak traced memory and wall time of the chunked CSV-upload path,
+  * server-side chart reduction (LTTB, heatmap blocks) and the payload it saves,
+  * loading and querying a benchmark table with thousands of segments.
+
+Results are written as JSON so runs from different versions can be diffed:
+
+    python benchmarks/bench.py -o bench.json
+    python benchmarks/bench.py -o new.json --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from forecasting import MODELS, BenchmarkSet, fit_figure, read_campaign_csv, write_benchmarks  # noqa: E402
+from forecasting.charting import encode  # noqa: E402
+
+SCENARIO_COUNTS = (1, 1_000, 1_000_000)
+CHART_POINTS = (10_000, 1_000_000)
+BENCHMARK_INDUSTRIES = 100
+# (tab, widget label or key, two values to alternate between)
+TAB_WIDGETS = (
+    ("crm", "Contact Rate (%)", (70, 71)),
+    ("webinar", "Landing Page Conversion Rate (%)", (25, 26)),
+    ("book_a_call", "landing_cr_book", (10, 11)),
+)
+
+
+def best_of(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times), float(np.median(times))
+
+
+def random_inputs(model, n, rng):
+    _, defaults = MODELS[model]
+    columns = {}
+    for name, default in defaults.items():
+        if isinstance(default, bool) or name == "months":
+            columns[name] = np.full(n, default)
+        else:
+            columns[name] = float(default) * rng.uniform(0.5, 1.5, n)
+    return columns
+
+
+def bench_funnel(repeat):
+    rng = np.random.default_rng(0)
+    results = []
+    for model, (func, _) in MODELS.items():
+        for n in SCENARIO_COUNTS:
+            inputs = random_inputs(model, n, rng)
+            best, median = best_of(lambda: func(**inputs), repeat)
+            results.append({
+                "name": f"funnel.{model}", "scenarios": n, "best_s": best, "median_s": median,
+                "scenarios_per_s": n / best if best else None,
+            })
+    return results
+
+
+def bench_reruns(repeat):
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(ROOT)  # the app resolves its logo relative to the working directory
+    at = AppTest.from_file(str(ROOT / "streamlit_app.py"), default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    results = [{"name": "app.first_run", "best_s": time.perf_counter() - start, "median_s": None}]
+    if at.exception:
+        raise RuntimeError(f"App raised during benchmark: {at.exception[0].value}")
+
+    for tab, widget, values in TAB_WIDGETS:
+        slider = next(s for s in at.slider if widget in (s.label, s.key))
+        times = []
+        for i in range(repeat):
+            slider.set_value(values[i % 2])
+            start = time.perf_counter()
+            at.run()
+            times.append(time.perf_counter() - start)
+            slider = next(s for s in at.slider if widget in (s.label, s.key))
+        results.append({"name": f"app.rerun.{tab}", "best_s": min(times), "median_s": float(np.median(times))})
+    return results
+
+
+def bench_upload(rows):
+    rng = np.random.default_rng(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "campaign.csv"
+        # Write in slices so generating the file doesn't dominate peak memory
+        for i, start in enumerate(range(0, rows, 250_000)):
+            n = min(250_000, rows - start)
+            pd.DataFrame({
+                "Day": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, n), unit="D"),
+                "Ad Name": "ad",
+                "Amount Spent (USD)": rng.uniform(1, 50, n).round(2),
+                "Link Clicks": rng.integers(0, 40, n),
+                "Registrations": rng.integers(0, 10, n),
+                "Attendees": rng.integers(0, 5, n),
+                "Purchases": rng.integers(0, 2, n),
+            }).to_csv(path, mode="a", header=i == 0, index=False)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        read_campaign_csv(str(path))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return [{
+            "name": "upload.read_campaign_csv", "rows": rows, "file_mb": path.stat().st_size / 1e6,
+            "best_s": elapsed, "median_s": None, "peak_traced_mb": peak / 1e6,
+        }]
+
+
+def bench_charts(repeat):
+    rng = np.random.default_rng(2)
+    results = []
+    for n in CHART_POINTS:
+        side = int(np.sqrt(n))
+        traces = {
+            "line": {"type": "scatter", "mode": "lines", "x": encode(np.arange(n)), "y": encode(rng.normal(size=n).cumsum())},
+            "heatmap": {"type": "heatmap", "z": encode(rng.random((side, side)))},
+        }
+        for kind, trace in traces.items():
+            raw = len(json.dumps({"data": [trace], "layout": {}}))
+            # fit_figure replaces trace arrays in place, so every repetition gets a fresh trace dict
+            best, median = best_of(lambda: fit_figure({"data": [dict(trace)], "layout": {}}), repeat)
+            _, report = fit_figure({"data": [dict(trace)], "layout": {}})
+            results.append({
+                "name": f"chart.fit_figure.{kind}", "rows": n, "best_s": best, "median_s": median,
+                "kept": report["kept"], "payload_kb": raw / 1024, "fitted_kb": report["bytes"] / 1024,
+            })
+    return results
+
+
+def bench_benchmarks(repeat):
+    rng = np.random.default_rng(3)
+    keys = pd.MultiIndex.from_product([
+        ["All"] + [f"Industry {i}" for i in range(BENCHMARK_INDUSTRIES)], ["All", "NA", "EU", "APAC", "LATAM"],
+        ["All", "Meta", "Google", "LinkedIn"], ["All", "<$1k", "$1k-$5k", "$5k-$25k", "$25k+"],
+        ["landing_cr", "attendance_rate", "lead_rate", "sales_rate", "cpc", "roas"],
+    ], names=["industry", "region", "channel", "deal_size", "metric"]).to_frame(index=False)
+    # Drop a share of rows so lookups have to fall back
+    table = keys[rng.random(len(keys)) > 0.3].assign(model="webinar", n=rng.integers(5, 500))
+    p50 = rng.uniform(5, 50, len(table))
+    table = table.assign(p10=p50 * 0.5, p25=p50 * 0.75, p50=p50, p75=p50 * 1.25, p90=p50 * 1.5)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "benchmarks.arrow"
+        write_benchmarks(table, path)
+        load_best, load_median = best_of(lambda: BenchmarkSet.load(path), repeat)
+        bench = BenchmarkSet.load(path)
+        segment = {"industry": "Industry 7", "region": "EU", "channel": "Meta", "deal_size": "$5k-$25k"}
+        values = {m: 10.0 for m in bench.metrics("webinar")}
+        rank_best, rank_median = best_of(lambda: bench.percentile_ranks("webinar", values, **segment), repeat)
+    return [
+        {"name": "benchmarks.load", "rows": len(table), "best_s": load_best, "median_s": load_median},
+        {"name": "benchmarks.percentile_ranks", "rows": len(table), "best_s": rank_best, "median_s": rank_median},
+    ]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, threshold):
+    """Print benchmarks that got slower than ``threshold`` (fractional). Returns the number of regressions."""
+    def key(r):
+        return r["name"], r.get("scenarios"), r.get("rows")
+
+    previous = {key(r): r for r in baseline["results"]}
+    regressions = 0
+    for result in current["results"]:
+        old = previous.get(key(result))
+        if not old or not old.get("best_s"):
+            continue
+        change = result["best_s"] / old["best_s"] - 1
+        flag = "REGRESSION" if change > threshold else ""
+        regressions += bool(flag)
+        label = " ".join(str(k) for k in key(result) if k is not None)
+        print(f"{label:45s} {old['best_s'] * 1e3:10.3f}ms -> {result['best_s'] * 1e3:10.3f}ms {change:+7.1%} {flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-o", "--output", default="bench.json", help="where to write the JSON report")
+    parser.add_argument("--repeat", type=int, default=5, help="timed repetitions per benchmark")
+    parser.add_argument("--upload-rows", type=int, default=1_000_000, help="rows in the synthetic CSV export")
+    parser.add_argument("--skip-app", action="store_true", help="skip the AppTest rerun benchmarks")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = bench_funnel(args.repeat)
+    if not args.skip_app:
+        results += bench_reruns(args.repeat)
+    results += bench_upload(args.upload_rows)
+    results += bench_charts(args.repeat)
+    results += bench_benchmarks(args.repeat)
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"Wrote {len(results)} results to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        return 1 if compare(report, json.loads(Path(args.compare).read_text()), args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
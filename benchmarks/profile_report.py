@@ -0,0 +1,43 @@
+"""Summarize a rerun profile log written by the app with profiling on (PROFILE=1 or ?profile=1).
+
+Prints count, p50, p95 and max milliseconds per section across every
+session in the log, slowest p95 first, with chart payload sizes:
+
+    python benchmarks/profile_report.py profile.jsonl
+    python benchmarks/profile_report.py profile.jsonl --kind chart --csv summary.csv
+"""
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from forecasting import read_profile_log, summarize_profile  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("log", nargs="?", default="profile.jsonl", help="profile log (JSON lines)")
+    parser.add_argument("--kind", help="only this kind: startup, tab, forecast, figure_build, chart or rerun")
+    parser.add_argument("--since", help="only records at or after this ISO timestamp")
+    parser.add_argument("--csv", help="also write the summary to this CSV file")
+    args = parser.parse_args(argv)
+
+    log = read_profile_log(args.log)
+    if args.kind and len(log):
+        log = log[log["kind"] == args.kind]
+    if args.since and len(log):
+        log = log[log["ts"] >= args.since]
+    summary = summarize_profile(log)
+    if summary.empty:
+        print("No profile records.", file=sys.stderr)
+        return 1
+    print(summary.round(2).to_string(index=False))
+    if args.csv:
+        summary.to_csv(args.csv, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""Forecasting engine behind the Campaign Planning Suite.
+
+Importing this package only pulls in NumPy and pandas, so it can be used from
+batch jobs and notebooks without Streamlit.
+"""
+from .allocation import allocate, marginal_curves
+from .batch import forecast_file, iter_scenarios, run_batch, run_scenarios, write_results
+from .benchmarks import BenchmarkSet, percentile_rank, write_benchmarks
+from .cache import ResultCache, canonical_key
+from .calibration import Calibrator
+from .charting import downsample_frame, fit_figure, lttb
+from .cohorts import cohort_timeline, fft_convolve, lag_distribution, payback_period, timeline_frame
+from .export import ResultWriter, export_bytes, read_export, scenario_tables, write_tables
+from .funnel import (
+    BOOK_A_CALL_DEFAULTS,
+    CRM_DEFAULTS,
+    MODELS,
+    ROI_TIERS,
+    WEBINAR_DEFAULTS,
+    book_a_call_forecast,
+    compound_roi,
+    crm_forecast,
+    roi_tiers,
+    run_model,
+    safe_div,
+    webinar_forecast,
+)
+from .goalseek import bisect, leads_for_roi, solve_for
+from .ingest import campaign_inputs, file_digest, read_campaign_csv
+from .leads import read_crm_leads, segment_funnel, segment_inputs
+from .profiling import PANEL_RECORDS, ProfileLog, Profiler, read_profile_log, summarize_profile
+from .reinvestment import (
+    REINVESTMENT_DEFAULTS,
+    leads_for_cumulative_roi,
+    reinvestment_frame,
+    reinvestment_totals,
+    simulate_reinvestment,
+)
+from .sensitivity import sweep_2d, sweep_frames, sweep_range, sweepable_inputs, tornado
+from .store import ScenarioStore
+from .simulation import DEFAULT_DRAWS, DEFAULT_SEED, DRAW_CACHE, draw, simulate, summarize
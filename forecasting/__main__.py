@@ -0,0 +1,36 @@
+"""Command line entry point: ``python -m forecasting scenarios.csv -o results.parquet``."""
+import argparse
+import sys
+import time
+
+from .batch import CHUNKSIZE, forecast_file
+from .funnel import MODELS
+from .store import ScenarioStore
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m forecasting",
+        description="Run the webinar, book-a-call and CRM ROI forecasts over a scenarios file.",
+    )
+    parser.add_argument("scenarios", help="input file: .csv, .parquet or .jsonl, one scenario per row")
+    parser.add_argument("-o", "--output", required=True, help="output file: .csv, .parquet, .jsonl or .xlsx")
+    parser.add_argument("-m", "--model", choices=list(MODELS),
+                        help="model for every row (default: each row's 'model' column)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="rows per work unit")
+    parser.add_argument("--store", metavar="DB", help="also save the results to this SQLite scenario store")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        store = ScenarioStore(args.store) if args.store else None
+        rows = forecast_file(args.scenarios, args.output, args.model, args.workers, args.chunksize, store)
+    except (ValueError, ImportError, FileNotFoundError) as e:
+        parser.exit(1, f"error: {e}\n")
+    print(f"Wrote {rows:,} forecasts to {args.output} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""Headless batch forecasting over scenario files.
+
+A scenario file (CSV, Parquet or JSON lines) has one row per client or
+campaign. Each row is priced with the model named in its ``model`` column
+(``webinar``, ``book_a_call`` or ``crm``), or with the model passed in by the
+caller; missing inputs fall back to the model defaults and any extra columns,
+such as a client id, are carried through to the output. Large files are read
+in chunks, the chunks are spread over a process pool, and each priced chunk
+is appended to the output as soon as it is ready, so memory stays flat no
+matter how many rows the file has.
+
+This module only depends on NumPy and pandas, so pool workers start cheaply.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from .export import ResultWriter
+from .funnel import MODELS, run_model
+
+CHUNKSIZE = 250_000
+# Below this many rows a process pool costs more than it saves
+MIN_PARALLEL_ROWS = 100_000
+
+
+def _format(path):
+    suffix = Path(path).suffix.lower()
+    if suffix in (".csv", ".txt"):
+        return "csv"
+    if suffix in (".parquet", ".pq"):
+        return "parquet"
+    if suffix in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    raise ValueError(f"Unsupported scenario file type '{suffix}' (use .csv, .parquet or .jsonl)")
+
+
+def iter_scenarios(path, chunksize=CHUNKSIZE):
+    """Yield the scenario file as DataFrames of at most ``chunksize`` rows."""
+    fmt = _format(path)
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunksize)
+    elif fmt == "jsonl":
+        yield from pd.read_json(path, lines=True, chunksize=chunksize)
+    else:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet scenario files requires pyarrow") from e
+        # Number rows across batches the way the CSV and JSON readers do
+        start = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            frame = batch.to_pandas()
+            yield frame.set_axis(pd.RangeIndex(start, start + len(frame)))
+            start += len(frame)
+
+
+def run_scenarios(frame, model=None):
+    """Price every row of ``frame``; rows keep their order and extra columns."""
+    if model is None and "model" not in frame.columns:
+        raise ValueError("Scenarios need a 'model' column or an explicit model")
+    if model is None and frame["model"].isna().any():
+        rows = ", ".join(map(str, frame.index[frame["model"].isna()][:10]))
+        raise ValueError(f"No model given for row(s) {rows} (expected one of {', '.join(MODELS)})")
+    # Work on positions so duplicate index labels can't misalign the pieces
+    index, frame = frame.index, frame.reset_index(drop=True)
+    groups = [(model, frame)] if model is not None else frame.groupby("model", sort=False)
+
+    results = []
+    for name, group in groups:
+        if name not in MODELS:
+            raise ValueError(f"Unknown model '{name}' (expected one of {', '.join(MODELS)})")
+        defaults = MODELS[name][1]
+        inputs = group.fillna({k: v for k, v in defaults.items() if k in group.columns})
+        result = run_model(name, inputs)
+        extra = group.drop(columns=[c for c in group.columns if c in result.columns or c == "model"])
+        results.append(pd.concat([extra, result.assign(model=name)], axis=1))
+    priced = pd.concat(results).sort_index() if len(results) > 1 else results[0]
+    return priced.set_axis(index)
+
+
+def _run_chunk(args):
+    frame, model = args
+    return run_scenarios(frame, model)
+
+
+def run_batch(scenarios, model=None, workers=None, chunksize=CHUNKSIZE):
+    """Price a DataFrame of scenarios, in parallel when it's large enough."""
+    if len(scenarios) < MIN_PARALLEL_ROWS or workers == 1:
+        return run_scenarios(scenarios, model)
+    chunks = [scenarios.iloc[i:i + chunksize] for i in range(0, len(scenarios), chunksize)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return pd.concat(pool.map(_run_chunk, [(chunk, model) for chunk in chunks]))
+
+
+def write_results(frame, path):
+    """Write a result DataFrame to .csv, .parquet, .jsonl or .xlsx (see :class:`~forecasting.export.ResultWriter`)."""
+    with ResultWriter(path) as writer:
+        writer.write(frame)
+
+
+def scenario_dtypes(path):
+    """Every column of a scenario file, with the dtype it keeps in typed output, read without loading the rows.
+
+    Parquet files carry their own types (integers become nullable ``Int64``
+    so a missing value in a later chunk still fits); columns of CSV and JSON
+    lines files are text. JSON lines have no header, so their keys are
+    collected in one pass over the file.
+    """
+    fmt = _format(path)
+    if fmt == "csv":
+        return dict.fromkeys(pd.read_csv(path, nrows=0).columns, "string")
+    if fmt == "jsonl":
+        dtypes = {}
+        for chunk in pd.read_json(path, lines=True, chunksize=CHUNKSIZE):
+            dtypes.update(dict.fromkeys(chunk.columns, "string"))
+        return dtypes
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet scenario files requires pyarrow") from e
+
+    def dtype(arrow_type):
+        if pa.types.is_integer(arrow_type):
+            return "Int64"
+        if pa.types.is_floating(arrow_type):
+            return "float64"
+        if pa.types.is_boolean(arrow_type):
+            return "boolean"
+        if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+            return "string"
+        return None
+
+    return {field.name: dtype(field.type) for field in pq.ParquetFile(path).schema_arrow}
+
+
+def result_columns(input_columns, model=None):
+    """Output columns for scenarios with ``input_columns``, the same for every chunk.
+
+    Without a fixed ``model`` the file may mix models, so the columns of every
+    model are included (NaN where a row's model doesn't have them).
+    """
+    columns = [c for c in input_columns if c != "model"]
+    for name in [model] if model is not None else MODELS:
+        sample = run_model(name, pd.DataFrame([MODELS[name][1]]))
+        columns += [c for c in sample.columns if c not in columns]
+    return columns + ["model"]
+
+
+def result_dtypes(input_dtypes, model=None):
+    """Output column -> dtype for scenarios with ``input_dtypes`` (see :func:`scenario_dtypes`).
+
+    Model inputs and outputs are float64 whatever the file says, ``model`` is
+    text and other columns keep their input dtype. The result is fixed before
+    the first chunk is read, so it doesn't depend on which rows come first.
+    """
+    numeric = set()
+    for name in [model] if model is not None else MODELS:
+        numeric.update(MODELS[name][1], run_model(name, pd.DataFrame([MODELS[name][1]])).columns)
+    return {
+        c: "float64" if c in numeric else "string" if c == "model" else input_dtypes.get(c)
+        for c in result_columns(input_dtypes, model)
+    }
+
+
+def _priced_chunks(chunks, workers):
+    """Priced chunks in input order, with at most two chunks per worker in flight."""
+    if workers == 1:
+        yield from map(_run_chunk, chunks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for args in chunks:
+            pending.append(pool.submit(_run_chunk, args))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def forecast_file(source, destination, model=None, workers=None, chunksize=CHUNKSIZE, store=None):
+    """Read ``source``, price every scenario and write ``destination``.
+
+    Chunks of the input are fanned out to a pool of ``workers`` processes
+    (default: one per CPU) and streamed to ``destination`` (.csv, .parquet,
+    .jsonl or .xlsx) in input order as they finish. With a
+    :class:`~forecasting.store.ScenarioStore` as ``store`` the results are
+    also saved there. Returns the number of scenarios written.
+    """
+    workers = workers or os.cpu_count() or 1
+    dtypes = result_dtypes(scenario_dtypes(source), model)
+    columns = list(dtypes)
+    chunks = ((chunk, model) for chunk in iter_scenarios(source, chunksize))
+
+    with ResultWriter(destination, dtypes=dtypes) as writer:
+        for priced in _priced_chunks(chunks, workers):
+            # Every chunk gets the same columns, so CSV headers and the Parquet schema stay valid
+            writer.write(priced.reset_index(drop=True).reindex(columns=columns))
+            if store is not None and len(priced):
+                store.save_many(priced)
+    return writer.rows
@@ -0,0 +1,218 @@
+"""Industry benchmarks: percentile bands per segment, with nearest-segment fallback.
+
+The benchmark file is long-form, one row per model × segment × metric:
+``model, industry, region, channel, deal_size, metric, n, p10, p25, p50,
+p75, p90``. ``All`` in a key column marks an aggregate over that key, and
+``n`` is the number of campaigns behind the row.
+
+Arrow IPC / Feather files are memory-mapped, so the quantile columns are
+read straight from the page cache without a copy; a CSV is converted to an
+Arrow file next to it on first load (and again whenever the CSV is newer).
+Segment keys are dictionary-encoded into integer codes once, so a lookup is
+a handful of vectorized comparisons over every row, whatever the number of
+segments.
+
+A lookup that has no exact segment for a metric falls back to the closest
+one: keys may match exactly or be ``All``, industry counts most, then
+channel, region and deal size, and a neighbouring deal-size band is
+accepted when neither the exact band nor ``All`` has the metric.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SEGMENT_KEYS = ("industry", "region", "channel", "deal_size")
+QUANTILES = (10, 25, 50, 75, 90)
+QUANTILE_COLUMNS = tuple(f"p{q}" for q in QUANTILES)
+ALL = "All"
+# Key weights: any industry match outranks everything below it, and so on
+KEY_WEIGHTS = {"industry": 8.0, "channel": 4.0, "region": 2.0, "deal_size": 1.0}
+DEAL_SIZES = ("<$1k", "$1k-$5k", "$5k-$25k", "$25k+")
+# Metrics where a lower value is the better result
+LOWER_IS_BETTER = {"cpc", "cost_per_lead", "cost_per_attendee"}
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.csv  # noqa: F401
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Benchmark data requires pyarrow") from e
+    return pa
+
+
+def _read_table(path):
+    pa = _arrow()
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        cached = path.with_suffix(".arrow")
+        if not cached.exists() or cached.stat().st_mtime < path.stat().st_mtime:
+            table = pa.csv.read_csv(path)
+            try:
+                write_benchmarks(table, cached)
+            except OSError:
+                # Read-only deployment: keep the parsed table in memory instead
+                return table
+        path, suffix = cached, ".arrow"
+    if suffix in (".arrow", ".feather", ".ipc"):
+        return pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    if suffix in (".parquet", ".pq"):
+        import pyarrow.parquet as pq
+        return pq.read_table(path, memory_map=True)
+    raise ValueError(f"Unsupported benchmark file type '{suffix}' (use .arrow, .feather, .parquet or .csv)")
+
+
+def write_benchmarks(table, path):
+    """Write a benchmark table (DataFrame or Arrow table) as an uncompressed Arrow file, ready to memory-map."""
+    pa = _arrow()
+    if isinstance(table, pd.DataFrame):
+        table = pa.Table.from_pandas(table, preserve_index=False)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def percentile_rank(values, quantiles):
+    """Percentile (0-100) of each value within its benchmark band.
+
+    ``quantiles`` has one row of p10..p90 per value. Values are interpolated
+    between the band's points and extrapolated along the outer slopes past
+    p10 / p90, then clipped to 0-100.
+    """
+    values = np.asarray(values, dtype=float)
+    quantiles = np.atleast_2d(np.asarray(quantiles, dtype=float))
+    levels = np.array(QUANTILES, dtype=float)
+    ranks = np.full(len(values), np.nan)
+    for i, (value, band) in enumerate(zip(values, quantiles)):
+        if np.isnan(value) or np.isnan(band).any():
+            continue
+        if band[-1] <= band[0]:
+            ranks[i] = 50.0 if value == band[0] else (100.0 if value > band[0] else 0.0)
+            continue
+        if value < band[0]:
+            slope = (levels[1] - levels[0]) / max(band[1] - band[0], 1e-12)
+            rank = levels[0] - (band[0] - value) * slope
+        elif value > band[-1]:
+            slope = (levels[-1] - levels[-2]) / max(band[-1] - band[-2], 1e-12)
+            rank = levels[-1] + (value - band[-1]) * slope
+        else:
+            rank = np.interp(value, band, levels)
+        ranks[i] = min(max(rank, 0.0), 100.0)
+    return ranks
+
+
+class BenchmarkSet:
+    """A benchmark table indexed by model, metric and segment keys.
+
+    Build with :meth:`load`; the table itself stays in Arrow memory (mapped
+    from disk for Arrow files) and only integer key codes are held in NumPy.
+    """
+
+    def __init__(self, table):
+        missing = [c for c in ("model", "metric", *SEGMENT_KEYS, *QUANTILE_COLUMNS) if c not in table.column_names]
+        if missing:
+            raise ValueError(f"Benchmark data is missing column(s): {', '.join(missing)}")
+        self.table = table
+        self.values, self.codes, self._index = {}, {}, {}
+        for key in ("model", "metric", *SEGMENT_KEYS):
+            encoded = table.column(key).cast("string").combine_chunks().dictionary_encode()
+            self.values[key] = [str(v) for v in encoded.dictionary.to_pylist()]
+            self.codes[key] = encoded.indices.fill_null(-1).to_numpy().astype(np.int32)
+            self._index[key] = {v: i for i, v in enumerate(self.values[key])}
+        # Quantile columns stay views of the (mapped) Arrow buffers where the layout allows it
+        self._bands = [table.column(c).to_numpy() for c in QUANTILE_COLUMNS]
+        self.n = table.column("n").to_numpy().astype(float) if "n" in table.column_names else np.zeros(len(self))
+        # Rows per (model, metric): every lookup scores only these
+        groups = pd.DataFrame({"model": self.codes["model"], "metric": self.codes["metric"]}).groupby(["model", "metric"])
+        self._rows = {
+            (self.values["model"][model], self.values["metric"][metric]): rows
+            for (model, metric), rows in groups.indices.items()
+        }
+
+    @classmethod
+    def load(cls, path):
+        return cls(_read_table(path))
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def options(self, key, model=None):
+        """Values of a segment key (``All`` first), optionally only those with rows for ``model``."""
+        codes = self.codes[key]
+        if model is not None:
+            codes = codes[self.codes["model"] == self._code("model", model)]
+        values = sorted({self.values[key][c] for c in np.unique(codes)} - {ALL})
+        if key == "deal_size":
+            values.sort(key=lambda v: DEAL_SIZES.index(v) if v in DEAL_SIZES else len(DEAL_SIZES))
+        return [ALL] + values
+
+    def metrics(self, model):
+        return sorted(metric for m, metric in self._rows if m == model)
+
+    def _code(self, key, value):
+        # -2 never matches a code (missing keys are -1 after encoding)
+        return self._index[key].get(str(value), -2)
+
+    def _scores(self, rows, segment):
+        score = np.zeros(len(rows))
+        for key in SEGMENT_KEYS:
+            codes = self.codes[key][rows]
+            wanted = segment.get(key, ALL)
+            match = np.where(codes == self._code(key, wanted), 1.0, np.where(codes == self._code(key, ALL), 0.5, -np.inf))
+            if key == "deal_size" and wanted in DEAL_SIZES and wanted != ALL:
+                # Other bands are a last resort, nearer ones first
+                band = np.array([DEAL_SIZES.index(v) if v in DEAL_SIZES else -99 for v in self.values[key]])[codes]
+                distance = np.abs(band - DEAL_SIZES.index(wanted))
+                match = np.where(np.isinf(match) & (distance < len(DEAL_SIZES)), 0.4 / np.maximum(distance, 1), match)
+            score += KEY_WEIGHTS[key] * match
+        # Among equally close segments, prefer the one with more campaigns behind it
+        return score + 1e-6 * np.log1p(self.n[rows])
+
+    def lookup(self, model, metrics=None, **segment):
+        """Best-matching benchmark band per metric for ``segment`` (keyword segment keys; missing ones mean ``All``).
+
+        Returns a DataFrame indexed by metric with the matched segment keys,
+        ``exact`` (all four keys matched), ``n`` and p10..p90. Metrics with
+        no usable row are left out.
+        """
+        metrics = self.metrics(model) if metrics is None else list(metrics)
+        records = []
+        for metric in metrics:
+            rows = self._rows.get((model, metric))
+            if rows is None:
+                continue
+            scores = self._scores(rows, segment)
+            best = int(np.argmax(scores))
+            if np.isinf(scores[best]):
+                continue
+            row = rows[best]
+            matched = {key: self.values[key][self.codes[key][row]] for key in SEGMENT_KEYS}
+            records.append({
+                "metric": metric, **matched,
+                "exact": all(matched[k] == str(segment.get(k, ALL)) for k in SEGMENT_KEYS),
+                "n": self.n[row], **{c: float(band[row]) for c, band in zip(QUANTILE_COLUMNS, self._bands)},
+            })
+        columns = ["metric", *SEGMENT_KEYS, "exact", "n", *QUANTILE_COLUMNS]
+        return pd.DataFrame(records, columns=columns).set_index("metric")
+
+    def medians(self, model, metrics=None, **segment):
+        """p50 per metric for the best-matching segment, as a dict."""
+        return self.lookup(model, metrics, **segment)["p50"].to_dict()
+
+    def percentile_ranks(self, model, values, **segment):
+        """Where each of ``values`` (metric -> your value) falls in its matched benchmark band.
+
+        Adds ``value``, ``percentile`` and ``better_than`` (the share of the
+        segment you beat, flipped for metrics where lower is better) to
+        :meth:`lookup`'s columns.
+        """
+        bands = self.lookup(model, list(values), **segment)
+        yours = np.array([float(values[m]) for m in bands.index])
+        percentile = percentile_rank(yours, bands[list(QUANTILE_COLUMNS)].to_numpy())
+        lower = np.array([m in LOWER_IS_BETTER for m in bands.index])
+        return bands.assign(value=yours, percentile=percentile, better_than=np.where(lower, 100 - percentile, percentile))
@@ -0,0 +1,129 @@
+"""Process-wide result cache keyed by a canonical hash of the inputs.
+
+Many sessions ask for the same forecasts (industry presets, default
+sliders), so results and serialized figures are kept in one size-bounded LRU
+shared by every session in the process. Entries also expire after a TTL, and
+hit / miss / eviction counters are kept for monitoring.
+"""
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def _canonical(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Can't build a cache key from {type(value).__name__}")
+
+
+def canonical_key(namespace, inputs):
+    """Stable hash of ``inputs`` within ``namespace``.
+
+    Dict order doesn't matter, and NumPy scalars hash like the Python numbers
+    they hold, so ``{"cpc": np.float64(1.5)}`` and ``{"cpc": 1.5}`` share a key.
+    """
+    payload = json.dumps([namespace, inputs], sort_keys=True, default=_canonical, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _sizeof(value):
+    # Rough footprint used for the byte budget; exact accounting isn't needed
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value)
+    if hasattr(value, "memory_usage"):  # pandas objects
+        return int(np.sum(value.memory_usage(deep=True)))
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """Thread-safe LRU cache bounded by total size, with a per-entry TTL.
+
+    Values are shared between callers, so store immutable values (numbers,
+    strings such as figure JSON, tuples) or treat them as read-only.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=3600.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] < time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return  # would evict everything else; not worth caching
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self.size += size
+            while self.size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, computing and storing it on a miss.
+
+        ``compute`` runs outside the lock, so two sessions missing on the same
+        key at once may both compute it; the second store simply wins.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.size -= size
@@ -0,0 +1,228 @@
+"""Calibrate funnel rates from observed campaign results.
+
+Each stage rate (e.g. signups / clicks) gets a Beta-Binomial posterior per
+client and segment. The prior is centred on the current assumption (a slider
+value or benchmark) with the weight of ``prior_strength`` observations, and
+observed stage counts are added on top. Only the running success and trial
+counts are stored, so new daily data is an in-place increment: nothing is
+refit, and re-sending a day that was already counted is ignored.
+
+Counts live in SQLite so every session and batch job sees the same posteriors.
+"""
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from .funnel import MODELS
+from .ingest import normalize_header
+
+PRIOR_STRENGTH = 20
+CREDIBLE_LEVEL = 0.9
+QUANTILE_DRAWS = 20_000
+
+# rate -> (trials stage, successes stage)
+RATE_STAGES = {
+    "webinar": {
+        "landing_cr": ("clicks", "signups"),
+        "attendance_rate": ("signups", "attendees"),
+        "lead_rate": ("attendees", "leads"),
+        "sales_rate": ("leads", "sales"),
+    },
+    "book_a_call": {
+        "landing_page_rate": ("clicks", "booked"),
+        "show_rate": ("booked", "showed"),
+        "close_rate": ("showed", "closed"),
+    },
+    "crm": {
+        "contact_rate": ("worked", "contacted"),
+        "booking_rate": ("contacted", "booked"),
+        "show_rate": ("booked", "showed"),
+        "close_rate": ("showed", "closed"),
+    },
+}
+STAGE_ALIASES = {
+    "registrations": "signups", "sign_ups": "signups", "attended": "attendees", "qualified_leads": "leads",
+    "purchases": "sales", "booked_calls": "booked", "calls_booked": "booked", "shows": "showed",
+    "showed_up": "showed", "closes": "closed", "won": "closed", "leads_worked": "worked", "day": "date",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_counts (
+    client TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    model TEXT NOT NULL,
+    rate TEXT NOT NULL,
+    successes REAL NOT NULL,
+    trials REAL NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (client, segment, model, rate)
+);
+CREATE TABLE IF NOT EXISTS calibration_days (
+    client TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    model TEXT NOT NULL,
+    day TEXT NOT NULL,
+    PRIMARY KEY (client, segment, model, day)
+);
+CREATE TABLE IF NOT EXISTS calibration_files (
+    client TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    model TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (client, segment, model, digest)
+);
+"""
+
+
+def _stage_frame(observations):
+    frame = observations.rename(columns=lambda c: normalize_header(c))
+    return frame.rename(columns=lambda c: STAGE_ALIASES.get(c, c))
+
+
+def _content_digest(frame):
+    return hashlib.sha256(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes()).hexdigest()
+
+
+class Calibrator:
+    """Beta-Binomial posteriors for funnel rates, persisted in SQLite."""
+
+    def __init__(self, path=":memory:", prior_strength=PRIOR_STRENGTH):
+        self.path = path
+        self.prior_strength = prior_strength
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def update(self, observations, model, client="", segment="", digest=None):
+        """Add observed stage counts to the posteriors.
+
+        ``observations`` has one row per day (or any period) with stage count
+        columns, e.g. clicks / signups / attendees / leads / sales for the
+        webinar model. Optional ``client``, ``segment`` and ``date`` columns
+        override the arguments per row. With a date, rows for the same day are
+        summed and days already counted for that client and segment are
+        skipped. Without one, the whole upload is counted once per client and
+        segment, recognised by ``digest`` (e.g. :func:`~forecasting.file_digest`
+        of the file) or else by a hash of its counts. Returns the number of
+        rows used.
+        """
+        stages = RATE_STAGES[model]
+        frame = _stage_frame(observations)
+        rates = {r: s for r, s in stages.items() if s[0] in frame and s[1] in frame}
+        if not rates:
+            needed = sorted({stage for pair in stages.values() for stage in pair})
+            raise ValueError(f"No complete stage pair found; expected columns among: {', '.join(needed)}")
+
+        frame = frame.assign(
+            client=frame["client"].fillna(client).astype(str) if "client" in frame else client,
+            segment=frame["segment"].fillna(segment).astype(str) if "segment" in frame else segment,
+        )
+        stage_columns = sorted({stage for pair in rates.values() for stage in pair})
+        if "date" in frame:
+            frame["day"] = pd.to_datetime(frame["date"], errors="coerce").dt.strftime("%Y-%m-%d")
+            frame = frame.dropna(subset=["day"])
+            table, key = "calibration_days", "day"
+        else:
+            frame["digest"] = digest or _content_digest(frame[stage_columns])
+            table, key = "calibration_files", "digest"
+        keys = ["client", "segment", key]
+        # Several rows for one day (e.g. one per campaign) add up before the dedupe
+        groups = frame.groupby(keys)
+        totals, used = groups[stage_columns].sum(), groups.size()
+
+        with self._lock, self._conn:
+            seen = self._conn.execute(f"SELECT client, segment, {key} FROM {table} WHERE model = ?", (model,))
+            new = ~totals.index.isin(list(seen))
+            totals, used = totals[new], used[new]
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO {table} (client, segment, model, {key}) VALUES (?, ?, ?, ?)",
+                [(c, s, model, k) for c, s, k in totals.index]
+            )
+            if totals.empty:
+                return 0
+
+            totals = totals.groupby(level=["client", "segment"]).sum()
+            now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            rows = []
+            for rate, (trial_stage, success_stage) in rates.items():
+                trials = totals[trial_stage].to_numpy(dtype=float)
+                # Data errors (more successes than trials) shouldn't push a rate above 100%
+                successes = np.minimum(totals[success_stage].to_numpy(dtype=float), trials)
+                rows.extend(
+                    (c, s, model, rate, k, n, now)
+                    for (c, s), k, n in zip(totals.index, successes, trials)
+                )
+            self._conn.executemany(
+                "INSERT INTO rate_counts (client, segment, model, rate, successes, trials, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (client, segment, model, rate) DO UPDATE SET"
+                " successes = successes + excluded.successes, trials = trials + excluded.trials,"
+                " updated_at = excluded.updated_at",
+                rows
+            )
+        return int(used.sum())
+
+    def posterior(self, model, client="", segment="", prior=None, level=CREDIBLE_LEVEL):
+        """Posterior summary per rate, in percent.
+
+        ``prior`` maps rates to prior means in percent (default: the model's
+        default inputs). Returns a DataFrame indexed by rate with the Beta
+        parameters, observed counts, posterior mean and sd, and the central
+        ``level`` credible interval (``lower`` / ``upper``).
+        """
+        rates = list(RATE_STAGES[model])
+        prior = {**MODELS[model][1], **(prior or {})}
+        with self._lock:
+            counts = pd.read_sql_query(
+                "SELECT rate, successes, trials FROM rate_counts WHERE model = ? AND client = ? AND segment = ?",
+                self._conn, params=[model, client, segment], index_col="rate"
+            ).reindex(rates).fillna(0.0)
+
+        successes = counts["successes"].to_numpy(dtype=float)
+        trials = counts["trials"].to_numpy(dtype=float)
+        prior_mean = np.clip(np.array([float(prior[r]) for r in rates]) / 100, 1e-6, 1 - 1e-6)
+        alpha = prior_mean * self.prior_strength + successes
+        beta = (1 - prior_mean) * self.prior_strength + trials - successes
+        mean = alpha / (alpha + beta)
+        sd = np.sqrt(alpha * beta / ((alpha + beta) ** 2 * (alpha + beta + 1)))
+
+        # Quantiles by sampling keep this dependency-free (no scipy) and are plenty accurate
+        draws = np.random.default_rng(0).beta(alpha[:, None], beta[:, None], size=(len(rates), QUANTILE_DRAWS))
+        lower, upper = np.quantile(draws, [(1 - level) / 2, (1 + level) / 2], axis=1)
+        return pd.DataFrame({
+            "alpha": alpha, "beta": beta,
+            "successes": successes, "trials": trials,
+            "prior": prior_mean * 100, "mean": mean * 100, "sd": sd * 100,
+            "lower": lower * 100, "upper": upper * 100,
+        }, index=pd.Index(rates, name="rate"))
+
+    def calibrated_inputs(self, model, client="", segment="", prior=None):
+        """Posterior mean rates (%) ready to pass to the model."""
+        return self.posterior(model, client, segment, prior)["mean"].to_dict()
+
+    def uncertainty(self, model, client="", segment="", prior=None):
+        """Posterior spread as a Monte Carlo uncertainty spec (see :func:`forecasting.simulate`)."""
+        sd = self.posterior(model, client, segment, prior)["sd"]
+        return {rate: ("beta", float(value)) for rate, value in sd.items()}
+
+    def segments(self, model=None):
+        """Client / segment pairs with observations, with their total trials."""
+        sql = "SELECT client, segment, model, SUM(trials) AS trials, MAX(updated_at) AS updated_at FROM rate_counts"
+        params = []
+        if model is not None:
+            sql += " WHERE model = ?"
+            params.append(model)
+        sql += " GROUP BY client, segment, model ORDER BY client, segment"
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,290 @@
+"""Server-side reduction of chart data before it is sent to the browser.
+
+Plotly ships every point of every trace as JSON, so a chart of an uploaded
+campaign export or a multi-year daily forecast can weigh megabytes and take
+seconds to draw. :func:`fit_figure` takes a figure dict
+(``json.loads(fig.to_json())``) and, trace by trace:
+
+- downsamples line traces with Largest-Triangle-Three-Buckets (LTTB), which
+  keeps the peaks and troughs a plain stride would drop;
+- thins marker-only scatters to one point per occupied cell of a 2-D grid;
+- averages heatmap cells in blocks;
+- pre-bins raw histogram data into bars;
+- switches scatters that still have many points to WebGL (``scattergl``).
+
+If the figure is still over the payload cap, the point budgets are halved
+until it fits. Arrays go back out in Plotly's compact base64 typed-array
+form. When a frame is known to be large, :func:`downsample_frame` applies
+the same LTTB reduction before the figure is built, which also skips
+serializing the full data.
+"""
+import base64
+import json
+import math
+
+import numpy as np
+
+MAX_POINTS = 4000
+MAX_CELLS = 40_000
+WEBGL_THRESHOLD = 1000
+MAX_PAYLOAD_BYTES = 1024 * 1024
+MIN_POINTS = 250
+MAX_HISTOGRAM_BINS = 200
+# Per-point arrays that may sit one level down in a trace
+NESTED_ARRAYS = {"marker": ("color", "size", "symbol", "opacity"), "error_x": ("array", "arrayminus"),
+                 "error_y": ("array", "arrayminus")}
+LINE_TRACES = ("scatter", "scattergl")
+
+
+def decode(value):
+    """A trace array as NumPy: plain lists, or Plotly's ``{"dtype", "bdata", "shape"}`` typed arrays."""
+    if isinstance(value, dict) and "bdata" in value:
+        array = np.frombuffer(base64.b64decode(value["bdata"]), dtype=np.dtype(value["dtype"]))
+        if "shape" in value:
+            array = array.reshape([int(n) for n in str(value["shape"]).split(",")])
+        return array
+    try:
+        return np.array(value, dtype=float)
+    except (TypeError, ValueError):
+        # Dates, categories and labels
+        return np.array(value, dtype=object)
+
+
+def encode(array):
+    """Numeric arrays as base64 typed arrays (about half the size of JSON numbers), anything else as a list."""
+    array = np.asarray(array)
+    if array.dtype.kind not in "biuf":
+        return array.tolist()
+    if array.dtype.kind == "b":
+        array = array.astype(np.uint8)
+    array = np.ascontiguousarray(array.astype(array.dtype.newbyteorder("<")))
+    encoded = {"dtype": array.dtype.str.lstrip("<|"), "bdata": base64.b64encode(array.tobytes()).decode("ascii")}
+    if array.ndim > 1:
+        encoded["shape"] = ", ".join(map(str, array.shape))
+    return encoded
+
+
+def _is_array(value):
+    return (isinstance(value, dict) and "bdata" in value) or isinstance(value, list)
+
+
+def numeric_axis(values):
+    """Decoded axis values as floats: numbers as-is, dates as nanoseconds, categories by position."""
+    if values.dtype.kind in "biuf":
+        return values.astype(float)
+    try:
+        return values.astype("datetime64[ns]").astype(np.int64).astype(float)
+    except (TypeError, ValueError):
+        return np.arange(len(values), dtype=float)
+
+
+def lttb(x, y, n_out):
+    """Indices of the ``n_out`` points Largest-Triangle-Three-Buckets keeps (always the first and last).
+
+    Each bucket keeps the point forming the largest triangle with the point
+    kept from the previous bucket and the mean of the next one. Bucket means
+    come from cumulative sums, so the loop only does one argmax per bucket.
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    y_filled = np.nan_to_num(y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    csx = np.concatenate([[0.0], np.cumsum(x)])
+    csy = np.concatenate([[0.0], np.cumsum(y_filled)])
+    # Mean of the bucket after each one; the last bucket looks at the final point
+    next_lo, next_hi = edges[1:], np.append(edges[2:], n)
+    counts = np.maximum(next_hi - next_lo, 1)
+    mean_x = (csx[next_hi] - csx[next_lo]) / counts
+    mean_y = (csy[next_hi] - csy[next_lo]) / counts
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        area = np.abs((x[a] - mean_x[i]) * (y_filled[lo:hi] - y_filled[a]) - (x[a] - x[lo:hi]) * (mean_y[i] - y_filled[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return np.unique(keep)
+
+
+def downsample_frame(frame, x, y, max_points=MAX_POINTS, by=None):
+    """Rows of ``frame`` to chart ``y`` (a column or list of columns) against ``x``, at most ``max_points`` per series.
+
+    Each ``by`` group (a line per color in Plotly Express) and each ``y``
+    column is reduced with :func:`lttb` and the kept rows are combined, so
+    every line keeps its own peaks. Rows must already be sorted by ``x``.
+    Use it before building a figure from a large frame, so the full data is
+    never serialized at all.
+    """
+    columns = [y] if isinstance(y, str) else list(y)
+    groups = frame.groupby(by, sort=False, observed=True).indices.values() if by else [np.arange(len(frame))]
+    keep = []
+    for rows in groups:
+        if len(rows) <= max_points:
+            keep.append(rows)
+            continue
+        x_values = numeric_axis(frame[x].to_numpy()[rows])
+        for column in columns:
+            keep.append(rows[lttb(x_values, frame[column].to_numpy(dtype=float)[rows], max_points)])
+    return frame.iloc[np.unique(np.concatenate(keep))] if keep else frame
+
+
+def grid_thin(x, y, n_out):
+    """Indices of one point (the first) per occupied cell of a ``√n_out × √n_out`` grid over the data."""
+    side = max(int(math.sqrt(n_out)), 1)
+    cells = []
+    for values in (np.asarray(x, dtype=float), np.asarray(y, dtype=float)):
+        lo, hi = np.nanmin(values), np.nanmax(values)
+        span = hi - lo if hi > lo else 1.0
+        cells.append(np.clip(((values - lo) / span * side).astype(np.int64), 0, side - 1))
+    _, first = np.unique(cells[1] * side + cells[0], return_index=True)
+    return np.sort(first)
+
+
+def block_mean(z, factor):
+    """Mean over ``factor × factor`` blocks of a 2-D grid (NaNs ignored; edge blocks may be partial)."""
+    z = np.asarray(z, dtype=float)
+    rows, cols = math.ceil(z.shape[0] / factor), math.ceil(z.shape[1] / factor)
+    padded = np.full((rows * factor, cols * factor), np.nan)
+    padded[:z.shape[0], :z.shape[1]] = z
+    blocks = padded.reshape(rows, factor, cols, factor)
+    with np.errstate(invalid="ignore"):
+        counts = np.sum(~np.isnan(blocks), axis=(1, 3))
+        return np.where(counts > 0, np.nansum(blocks, axis=(1, 3)) / np.maximum(counts, 1), np.nan)
+
+
+def _take(trace, keep, n, decoded):
+    """Keep only ``keep`` in every per-point array of ``trace`` (those with ``n`` entries)."""
+    def subset(container, key):
+        values = decoded.get(key) if container is trace else None
+        values = decode(container[key]) if values is None else values
+        if values.shape[:1] == (n,):
+            container[key] = encode(values[keep])
+
+    for key, value in list(trace.items()):
+        if _is_array(value):
+            subset(trace, key)
+    for parent, keys in NESTED_ARRAYS.items():
+        nested = trace.get(parent)
+        if isinstance(nested, dict):
+            for key in keys:
+                if _is_array(nested.get(key)):
+                    subset(nested, key)
+
+
+def _fit_scatter(trace, max_points):
+    y = decode(trace["y"]) if _is_array(trace.get("y")) else None
+    if y is None or y.ndim != 1:
+        return 0, 0
+    n = len(y)
+    if n > max_points:
+        decoded = {"y": y}
+        if _is_array(trace.get("x")):
+            decoded["x"] = decode(trace["x"])
+        x = numeric_axis(decoded["x"]) if "x" in decoded else np.arange(n, dtype=float)
+        if "lines" in trace.get("mode", "lines"):
+            keep = lttb(x, numeric_axis(y), max_points)
+        else:
+            keep = grid_thin(x, numeric_axis(y), max_points)
+        _take(trace, keep, n, decoded)
+        return n, len(keep)
+    return n, n
+
+
+def _fit_heatmap(trace, max_cells):
+    if not _is_array(trace.get("z")):
+        return 0, 0
+    z = decode(trace["z"])
+    if z.ndim != 2:
+        return 0, 0
+    if z.size <= max_cells:
+        return z.size, z.size
+    factor = math.ceil(math.sqrt(z.size / max_cells))
+    trace["z"] = encode(block_mean(z, factor))
+    for axis, length in (("x", z.shape[1]), ("y", z.shape[0])):
+        if _is_array(trace.get(axis)):
+            values = decode(trace[axis])
+            if values.dtype.kind in "iuf" and len(values) == length:
+                padded = np.full(math.ceil(length / factor) * factor, np.nan)
+                padded[:length] = values
+                trace[axis] = encode(np.nanmean(padded.reshape(-1, factor), axis=1))
+            else:
+                trace[axis] = encode(values[::factor])
+    for key in ("text", "customdata", "hovertext"):
+        if _is_array(trace.get(key)) and decode(trace[key]).shape[:2] == z.shape:
+            trace[key] = encode(decode(trace[key])[::factor, ::factor])
+    return z.size, decode(trace["z"]).size
+
+
+def _fit_histogram(trace, max_points):
+    """Raw histogram samples become a bar trace of counts (sample histograms only, not ``histfunc`` ones)."""
+    axis = "x" if _is_array(trace.get("x")) else "y"
+    if not _is_array(trace.get(axis)) or (_is_array(trace.get("x")) and _is_array(trace.get("y"))) or "histfunc" in trace:
+        return 0, 0
+    values = decode(trace[axis])
+    if len(values) <= max_points or values.dtype.kind not in "biuf":
+        return len(values), len(values)
+    values = values[~np.isnan(values.astype(float))]
+    requested = trace.get(f"nbins{axis}")
+    edges = np.histogram_bin_edges(values, bins=min(requested, MAX_HISTOGRAM_BINS) if requested else "auto")
+    if len(edges) > MAX_HISTOGRAM_BINS + 1:
+        edges = np.histogram_bin_edges(values, bins=MAX_HISTOGRAM_BINS)
+    counts, edges = np.histogram(values, bins=edges)
+    norm = trace.get("histnorm", "")
+    heights = counts.astype(float)
+    if norm in ("percent", "probability"):
+        heights = heights / max(counts.sum(), 1) * (100 if norm == "percent" else 1)
+    elif norm in ("density", "probability density"):
+        heights = heights / np.diff(edges) / (max(counts.sum(), 1) if norm == "probability density" else 1)
+    centers = (edges[:-1] + edges[1:]) / 2
+    other = "y" if axis == "x" else "x"
+    bar = {k: v for k, v in trace.items() if k in ("name", "marker", "opacity", "legendgroup", "showlegend",
+                                                    "xaxis", "yaxis", "offsetgroup", "alignmentgroup")}
+    bar.update({"type": "bar", axis: encode(centers), other: encode(heights), "width": encode(np.diff(edges)),
+                "orientation": "v" if axis == "x" else "h"})
+    trace.clear()
+    trace.update(bar)
+    return len(values), len(centers)
+
+
+def _fit(figure, max_points, max_cells, webgl_threshold):
+    points = kept = webgl = 0
+    for trace in figure.get("data", []):
+        kind = trace.get("type", "scatter")
+        if kind in LINE_TRACES:
+            before, after = _fit_scatter(trace, max_points)
+            if kind == "scatter" and after > webgl_threshold:
+                trace["type"] = "scattergl"
+                webgl += 1
+        elif kind == "heatmap":
+            before, after = _fit_heatmap(trace, max_cells)
+        elif kind == "histogram":
+            before, after = _fit_histogram(trace, max_points)
+        else:
+            continue
+        points += before
+        kept += after
+    return points, kept, webgl
+
+
+def fit_figure(figure, max_points=MAX_POINTS, max_cells=MAX_CELLS, webgl_threshold=WEBGL_THRESHOLD,
+               max_bytes=MAX_PAYLOAD_BYTES):
+    """Reduce a figure dict in place so it stays within ``max_points`` per trace and ``max_bytes`` of JSON.
+
+    ``max_points`` applies to each line, scatter and histogram trace and
+    ``max_cells`` to each heatmap; both are halved (down to ``MIN_POINTS``)
+    while the serialized figure is over ``max_bytes``. Returns the figure
+    and a report: ``points`` before, ``kept`` after, ``webgl`` traces
+    switched, payload ``bytes`` and whether it still ``over`` the cap.
+    """
+    points, kept, webgl = _fit(figure, max_points, max_cells, webgl_threshold)
+    size = len(json.dumps(figure))
+    while size > max_bytes and max_points > MIN_POINTS:
+        max_points, max_cells = max(max_points // 2, MIN_POINTS), max(max_cells // 2, MIN_POINTS)
+        _, kept, switched = _fit(figure, max_points, max_cells, webgl_threshold)
+        webgl += switched
+        size = len(json.dumps(figure))
+    return figure, {"points": points, "kept": kept, "webgl": webgl, "bytes": size, "over": size > max_bytes}
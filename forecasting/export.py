@@ -0,0 +1,273 @@
+"""Result exports: streaming writers for big result sets and multi-table bundles.
+
+:class:`ResultWriter` appends DataFrames chunk by chunk to a CSV, JSON-lines,
+Parquet or Excel file, so batch and sensitivity runs with millions of rows
+are written with flat memory: each chunk becomes a Parquet row group, a
+block of CSV lines, or rows streamed by xlsxwriter's constant-memory mode
+(spilling onto continuation sheets past Excel's row limit).
+
+:func:`write_tables` writes several named tables (inputs, outputs,
+benchmark deltas, ...) as one multi-sheet workbook, or as a zip with one
+file per table for the other formats. Parquet output is zstd-compressed
+with dictionary-encoded columns: the compact format to keep for reloading
+with :func:`read_export` and comparing later.
+"""
+import io
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+
+FORMATS = {
+    ".csv": "csv", ".txt": "csv", ".parquet": "parquet", ".pq": "parquet",
+    ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl", ".xlsx": "xlsx", ".zip": "zip",
+}
+EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "jsonl": ".jsonl", "xlsx": ".xlsx"}
+MIME_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "zip": "application/zip",
+}
+PARQUET_COMPRESSION = "zstd"
+EXCEL_MAX_ROWS = 1_048_576
+# Excel sheet names: at most 31 characters, none of []:*?/\
+EXCEL_BAD_CHARS = str.maketrans({c: " " for c in "[]:*?/\\"})
+
+
+def export_format(path):
+    suffix = Path(path).suffix.lower()
+    if suffix not in FORMATS:
+        raise ValueError(f"Unsupported export file type '{suffix}' (use .csv, .parquet, .jsonl or .xlsx)")
+    return FORMATS[suffix]
+
+
+def _sheet_name(name, part=1):
+    base = str(name).translate(EXCEL_BAD_CHARS).strip() or "Sheet"
+    suffix = f" ({part})" if part > 1 else ""
+    return base[:31 - len(suffix)] + suffix
+
+
+def _excel_book(target):
+    try:
+        import xlsxwriter
+    except ImportError as e:
+        raise ImportError("Excel export requires xlsxwriter") from e
+    # Constant-memory mode flushes each row to disk as soon as the next one starts,
+    # so cells must be written row by row, in order
+    return xlsxwriter.Workbook(target, {
+        "constant_memory": True, "default_date_format": "yyyy-mm-dd hh:mm:ss",
+        # Data, not markup: keep strings that look like URLs or formulas as text
+        "strings_to_urls": False, "strings_to_formulas": False,
+    })
+
+
+class _ExcelSheet:
+    """Sequential rows into one sheet of an open workbook, continuing on new sheets past the row limit."""
+
+    def __init__(self, book, name):
+        self.book, self.name = book, name
+        self.part, self.row = 1, 0
+        self._sheet = None
+
+    def _start(self, columns):
+        self._sheet = self.book.add_worksheet(_sheet_name(self.name, self.part))
+        self._sheet.write_row(0, 0, [str(c) for c in columns])
+        self.row = 1
+
+    def write(self, frame):
+        if self._sheet is None:
+            # The header goes in even for an empty table, so it still shows its columns
+            self._start(frame.columns)
+        # Python scalars, with missing values as blank cells
+        values = frame.astype(object).where(frame.notna(), None)
+        for record in values.itertuples(index=False, name=None):
+            if self.row >= EXCEL_MAX_ROWS:
+                self.part += 1
+                self._start(frame.columns)
+            self._sheet.write_row(self.row, 0, record)
+            self.row += 1
+
+
+class ResultWriter:
+    """Append DataFrames to one result file without holding the whole result.
+
+    ``target`` is a path or a writable binary file object (then ``fmt`` is
+    required). Every chunk should have the same columns as the first.
+    Parquet chunks are cast to the first chunk's schema; ``dtypes`` (column
+    -> pandas dtype, applied to every chunk) fixes column types up front so
+    that schema doesn't depend on what the first chunk happens to hold. Use
+    as a context manager, or call :meth:`close`.
+    """
+
+    def __init__(self, target, fmt=None, sheet="Results", dtypes=None):
+        self.fmt = fmt or export_format(target)
+        if self.fmt not in EXTENSIONS:
+            raise ValueError(f"Unsupported export format '{self.fmt}'")
+        self.target, self.sheet = target, sheet
+        self.dtypes = {c: t for c, t in (dtypes or {}).items() if t is not None}
+        self.rows = 0
+        self._sink = None
+        self._schema = None
+        self._owned = None
+
+    def _handle(self):
+        if hasattr(self.target, "write"):
+            return self.target
+        self._owned = open(self.target, "wb")
+        return self._owned
+
+    def write(self, frame):
+        if self.fmt == "parquet":
+            self._write_parquet(frame)
+        elif self.fmt == "xlsx":
+            if self._sink is None:
+                self._book = _excel_book(self.target)
+                self._sink = _ExcelSheet(self._book, self.sheet)
+            self._sink.write(frame)
+        else:
+            if self._sink is None:
+                self._sink = self._handle()
+                if self.fmt == "csv":
+                    self._sink.write(frame.iloc[:0].to_csv(index=False).encode("utf-8"))
+            if len(frame):
+                if self.fmt == "csv":
+                    text = frame.to_csv(index=False, header=False)
+                else:
+                    text = frame.to_json(orient="records", lines=True, date_format="iso").rstrip("\n") + "\n"
+                self._sink.write(text.encode("utf-8"))
+        self.rows += len(frame)
+        return self
+
+    def _write_parquet(self, frame):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet export requires pyarrow") from e
+        if self.dtypes:
+            frame = frame.astype({c: t for c, t in self.dtypes.items() if c in frame})
+        table = pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False)
+        if self._sink is None:
+            self._schema = table.schema
+            self._sink = pq.ParquetWriter(
+                self._handle(), self._schema, compression=PARQUET_COMPRESSION, use_dictionary=True
+            )
+        # One row group per chunk keeps the writer's buffer to a single chunk
+        self._sink.write_table(table, row_group_size=max(len(frame), 1))
+
+    def close(self):
+        if self._sink is None and self.rows == 0:
+            # Nothing was written: still leave a valid, empty file behind
+            self._sink = self._handle() if self.fmt in ("csv", "jsonl") else None
+        if self.fmt == "xlsx" and self._sink is not None:
+            self._book.close()
+        elif self.fmt == "parquet" and self._sink is not None:
+            self._sink.close()
+        if self._owned is not None:
+            self._owned.close()
+        self._sink = self._owned = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def scenario_tables(inputs, results, benchmarks=None):
+    """One forecast as long tables: ``Inputs``, ``Outputs`` and, given ``benchmarks``, ``Benchmark Deltas``.
+
+    ``benchmarks`` maps metric names (keys of ``results`` or ``inputs``) to
+    reference values; each delta row has yours, the benchmark, the difference
+    and the difference as a % of the benchmark.
+    """
+    tables = {
+        "Inputs": pd.DataFrame({"input": list(inputs), "value": [float(v) for v in inputs.values()]}),
+        "Outputs": pd.DataFrame({"metric": list(results), "value": [float(v) for v in results.values()]}),
+    }
+    if benchmarks:
+        values = {**inputs, **results}
+        deltas = pd.DataFrame({
+            "metric": list(benchmarks),
+            "yours": [float(values[m]) for m in benchmarks],
+            "benchmark": [float(b) for b in benchmarks.values()],
+        })
+        deltas["delta"] = deltas["yours"] - deltas["benchmark"]
+        deltas["delta_pct"] = deltas["delta"] / deltas["benchmark"].where(deltas["benchmark"] != 0) * 100
+        tables["Benchmark Deltas"] = deltas
+    return tables
+
+
+def _chunks(table):
+    return [table] if isinstance(table, pd.DataFrame) else table
+
+
+def write_tables(target, tables, fmt="xlsx"):
+    """Write named tables as one workbook (``xlsx``) or a zip of one file per table.
+
+    ``tables`` maps names to DataFrames or to iterables of DataFrame chunks,
+    which are streamed. ``target`` is a path or a writable binary file object.
+    Returns the number of rows written per table.
+    """
+    rows = {}
+    if fmt == "xlsx":
+        book = _excel_book(target)
+        try:
+            for name, table in tables.items():
+                sheet = _ExcelSheet(book, name)
+                rows[name] = 0
+                for chunk in _chunks(table):
+                    sheet.write(chunk)
+                    rows[name] += len(chunk)
+                if sheet.row == 0:
+                    sheet.write(pd.DataFrame())
+        finally:
+            book.close()
+        return rows
+
+    if fmt not in EXTENSIONS:
+        raise ValueError(f"Unsupported export format '{fmt}'")
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, table in tables.items():
+            with archive.open(f"{name}{EXTENSIONS[fmt]}", "w") as entry, ResultWriter(entry, fmt) as writer:
+                for chunk in _chunks(table):
+                    writer.write(chunk)
+            rows[name] = writer.rows
+    return rows
+
+
+def export_bytes(tables, fmt="xlsx"):
+    """:func:`write_tables` into memory, for download buttons. Returns (bytes, file extension, MIME type)."""
+    buffer = io.BytesIO()
+    write_tables(buffer, tables, fmt)
+    kind = "xlsx" if fmt == "xlsx" else "zip"
+    return buffer.getvalue(), f".{kind}", MIME_TYPES[kind]
+
+
+def read_export(path):
+    """Reload an export: a DataFrame for single-table files, a dict of DataFrames for workbooks and zips."""
+    fmt = export_format(path)
+    if fmt == "parquet":
+        return pd.read_parquet(path)
+    if fmt == "csv":
+        return pd.read_csv(path)
+    if fmt == "jsonl":
+        return pd.read_json(path, lines=True)
+    if fmt == "xlsx":
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError as e:
+            raise ImportError("Reading Excel exports requires openpyxl") from e
+        return pd.read_excel(path, sheet_name=None, engine="openpyxl")
+    tables = {}
+    with zipfile.ZipFile(path) as archive:
+        for name in archive.namelist():
+            stem, suffix = Path(name).stem, Path(name).suffix.lower()
+            with archive.open(name) as fh:
+                data = io.BytesIO(fh.read())
+            if FORMATS.get(suffix) == "parquet":
+                tables[stem] = pd.read_parquet(data)
+            elif FORMATS.get(suffix) == "jsonl":
+                tables[stem] = pd.read_json(data, lines=True)
+            else:
+                tables[stem] = pd.read_csv(data)
+    return tables
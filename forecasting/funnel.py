@@ -0,0 +1,181 @@
+"""Vectorized funnel math shared by the three forecast tabs.
+
+Every model takes scalars, NumPy arrays or pandas Series and broadcasts them
+against each other, so one call can price a single slider configuration or a
+million scenarios at once. Rates are percentages (0-100), the same unit the
+sidebar sliders use. Division guards are applied element-wise: wherever the
+denominator is zero the ratio is reported as 0, matching the app's behaviour.
+"""
+import numpy as np
+import pandas as pd
+
+# Default inputs. The app's widgets start from these; the webinar rates also
+# equal the all-segment medians in data/benchmarks.csv
+WEBINAR_DEFAULTS = {
+    "budget": 1000.0, "cpc": 1.5, "landing_cr": 25, "attendance_rate": 40,
+    "lead_rate": 25, "sales_rate": 15, "avg_deal_value": 500.0,
+    "cogs_per_sale": 100.0, "treat_all_as_leads": False,
+}
+BOOK_A_CALL_DEFAULTS = {
+    "ad_spend": 3000.0, "cpc": 2.5, "landing_page_rate": 10, "show_rate": 70,
+    "close_rate": 20, "client_value": 1500.0,
+}
+CRM_DEFAULTS = {
+    "total_crm_leads": 2000, "active_leads": 500, "contact_rate": 70,
+    "booking_rate": 30, "show_rate": 75, "close_rate": 20, "client_value": 1500.0,
+    "monthly_tech_stack": 900.0, "team_members": 2, "monthly_salary": 5000.0,
+    "existing_overhead": 0.0, "months": 1,
+}
+
+# Share of the full ROI realised under each execution level
+ROI_TIERS = {"Light": 0.25, "Moderate": 0.5, "Aggressive": 1.0}
+
+
+def _arr(x):
+    return np.asarray(x, dtype=float)
+
+
+def _unwrap(result):
+    # 0-d arrays come back as NumPy scalars so single-scenario callers can format them directly
+    return {k: (v[()] if isinstance(v, np.ndarray) and v.ndim == 0 else v) for k, v in result.items()}
+
+
+def safe_div(num, den, positive=False):
+    """Element-wise ``num / den`` that yields 0 where the guard fails.
+
+    With ``positive=True`` the guard is ``den > 0``, otherwise ``den != 0``.
+    """
+    num, den = np.broadcast_arrays(_arr(num), _arr(den))
+    mask = den > 0 if positive else den != 0
+    return np.divide(num, den, out=np.zeros(num.shape), where=mask)
+
+
+def roi_tiers(base_roi):
+    """Light / Moderate / Aggressive ROI (%) for a base ROI expressed as a ratio."""
+    base_roi = _arr(base_roi)
+    return _unwrap({f"{name.lower()}_roi": base_roi * share * 100 for name, share in ROI_TIERS.items()})
+
+
+def compound_roi(monthly_roi, mode="Aggressive", months=12):
+    """Compounded ROI (%) of reinvesting ``ROI_TIERS[mode]`` of a monthly ROI ratio."""
+    r = _arr(monthly_roi) * ROI_TIERS[mode]
+    return np.where(r > -1, ((1 + r) ** months - 1) * 100, 0.0)[()]
+
+
+def webinar_forecast(budget, cpc, landing_cr, attendance_rate, lead_rate, sales_rate,
+                     avg_deal_value, cogs_per_sale, treat_all_as_leads=False):
+    """Webinar funnel: clicks → signups → attendees → leads → sales → profit."""
+    budget = _arr(budget)
+    clicks = safe_div(budget, cpc, positive=True)
+    signups = clicks * (_arr(landing_cr) / 100)
+    attendees = signups * (_arr(attendance_rate) / 100)
+    leads = np.where(np.asarray(treat_all_as_leads, dtype=bool), attendees, attendees * (_arr(lead_rate) / 100))
+    sales = leads * (_arr(sales_rate) / 100)
+    revenue = sales * _arr(avg_deal_value)
+    total_cogs = sales * _arr(cogs_per_sale)
+    gross_profit = revenue - total_cogs
+    net_profit = gross_profit - budget
+    return _unwrap({
+        "clicks": clicks,
+        "signups": signups,
+        "attendees": attendees,
+        "leads": leads,
+        "sales": sales,
+        "revenue": revenue,
+        "roas": safe_div(revenue, budget, positive=True),
+        "cost_per_attendee": safe_div(budget, attendees, positive=True),
+        "cost_per_lead": safe_div(budget, leads, positive=True),
+        "total_cogs": total_cogs,
+        "gross_profit": gross_profit,
+        "net_profit": net_profit,
+        "profit_margin": safe_div(net_profit, revenue, positive=True) * 100,
+    })
+
+
+def book_a_call_forecast(ad_spend, cpc, landing_page_rate, show_rate, close_rate, client_value):
+    """Book-a-call funnel: clicks → booked calls → showed → closed → revenue."""
+    ad_spend = _arr(ad_spend)
+    clicks = safe_div(ad_spend, cpc, positive=True)
+    booked_calls = clicks * (_arr(landing_page_rate) / 100)
+    showed = booked_calls * (_arr(show_rate) / 100)
+    closed = showed * (_arr(close_rate) / 100)
+    revenue = closed * _arr(client_value)
+    net_profit = revenue - ad_spend
+    base_roi = safe_div(net_profit, ad_spend)
+    return _unwrap({
+        "clicks": clicks,
+        "booked_calls": booked_calls,
+        "showed": showed,
+        "closed": closed,
+        "revenue": revenue,
+        "net_profit": net_profit,
+        "roi": base_roi * 100,
+        "roas": safe_div(revenue, ad_spend),
+        **roi_tiers(base_roi),
+    })
+
+
+def crm_forecast(total_crm_leads, active_leads, contact_rate, booking_rate, show_rate, close_rate,
+                 client_value, monthly_tech_stack, team_members, monthly_salary,
+                 existing_overhead=0.0, months=1):
+    """CRM re-engagement funnel: contacted → booked → showed → closed, over ``months``."""
+    months = _arr(months)
+    leads_to_reengage = _arr(total_crm_leads) - _arr(active_leads)
+    contacted = leads_to_reengage * (_arr(contact_rate) / 100)
+    booked = contacted * (_arr(booking_rate) / 100)
+    showed = booked * (_arr(show_rate) / 100)
+    closed = showed * (_arr(close_rate) / 100)
+    revenue = closed * _arr(client_value) * months
+    tech_cost = _arr(monthly_tech_stack) * months
+    salary_cost = _arr(team_members) * _arr(monthly_salary) * months
+    overhead_cost = _arr(existing_overhead) * months
+    total_cost = tech_cost + salary_cost + overhead_cost
+    net_profit = revenue - total_cost
+    base_roi = safe_div(net_profit, total_cost)
+    return _unwrap({
+        "leads_to_reengage": leads_to_reengage,
+        "contacted": contacted,
+        "booked": booked,
+        "showed": showed,
+        "closed": closed,
+        "revenue": revenue,
+        "tech_cost": tech_cost,
+        "salary_cost": salary_cost,
+        "overhead_cost": overhead_cost,
+        "total_cost": total_cost,
+        "net_profit": net_profit,
+        "roi": base_roi * 100,
+        # Per-month ROI ratio, the base for the realisation tiers and compounding
+        "monthly_roi": safe_div(net_profit, total_cost * months),
+    })
+
+
+MODELS = {
+    "webinar": (webinar_forecast, WEBINAR_DEFAULTS),
+    "book_a_call": (book_a_call_forecast, BOOK_A_CALL_DEFAULTS),
+    "crm": (crm_forecast, CRM_DEFAULTS),
+}
+
+
+def run_model(model, inputs, **overrides):
+    """Evaluate ``model`` over a DataFrame (or dict of columns) of scenarios.
+
+    Missing input columns fall back to the model defaults, ``overrides`` win
+    over both. Returns the inputs and outputs side by side as a DataFrame.
+    """
+    func, defaults = MODELS[model]
+    frame = pd.DataFrame(inputs) if not isinstance(inputs, pd.DataFrame) else inputs
+    kwargs = {}
+    for name, default in defaults.items():
+        if name in overrides:
+            kwargs[name] = overrides[name]
+        elif name in frame.columns:
+            kwargs[name] = frame[name].to_numpy()
+        else:
+            kwargs[name] = default
+    outputs = func(**kwargs)
+    n = len(frame)
+    result = pd.DataFrame({k: np.broadcast_to(v, (n,)) for k, v in kwargs.items()}, index=frame.index)
+    for k, v in outputs.items():
+        result[k] = np.broadcast_to(v, (n,))
+    return result
@@ -0,0 +1,110 @@
+"""Goal seek: the input value needed to hit a target outcome.
+
+The webinar and book-a-call funnels are linear in budget, rates and deal
+value and linear in ``1 / cpc``, and the CRM funnel is linear in its lead
+count and rates. For those, two evaluations of the model give slope and
+intercept and the inversion is closed form. Non-linear targets such as the
+simulated cumulative CRM ROI use a vectorized bisection. Everything broadcasts,
+so one call solves for a whole array of targets or scenarios. Targets that
+can't be reached within an input's valid range come back as NaN.
+"""
+import numpy as np
+
+from .funnel import MODELS
+
+# Unknowns each model is linear in. "reciprocal" marks inputs that enter as 1 / x.
+LINEAR_UNKNOWNS = {
+    "webinar": {
+        "budget": "linear", "cpc": "reciprocal", "landing_cr": "linear", "attendance_rate": "linear",
+        "lead_rate": "linear", "sales_rate": "linear", "avg_deal_value": "linear", "cogs_per_sale": "linear",
+    },
+    "book_a_call": {
+        "ad_spend": "linear", "cpc": "reciprocal", "landing_page_rate": "linear", "show_rate": "linear",
+        "close_rate": "linear", "client_value": "linear",
+    },
+    "crm": {
+        "total_crm_leads": "linear", "active_leads": "linear", "contact_rate": "linear", "booking_rate": "linear",
+        "show_rate": "linear", "close_rate": "linear", "client_value": "linear",
+    },
+}
+SPEND_INPUTS = {"budget", "ad_spend"}
+# Ratios to spend don't move with spend in a linear funnel, so spend can't be solved for them
+RATIO_METRICS = {"roas", "roi"}
+RATE_UNKNOWNS = {
+    "landing_cr", "attendance_rate", "lead_rate", "sales_rate", "landing_page_rate",
+    "contact_rate", "booking_rate", "show_rate", "close_rate",
+}
+
+
+def solve_for(model, inputs, unknown, metric, target):
+    """Closed-form value of ``unknown`` that makes ``metric`` equal ``target``.
+
+    ``inputs`` holds the other inputs (model defaults fill the gaps); any of
+    them, and ``target``, may be arrays. Raises ``ValueError`` when the metric
+    isn't linear in the unknown.
+    """
+    func, defaults = MODELS[model]
+    kind = LINEAR_UNKNOWNS[model].get(unknown)
+    if kind is None or (unknown in SPEND_INPUTS and metric in RATIO_METRICS):
+        raise ValueError(f"{metric} is not linear in {unknown} for the {model} model")
+
+    kwargs = {**defaults, **inputs}
+    # Evaluate at u = 1 and u = 2, where u is the unknown (or its reciprocal)
+    m1 = np.asarray(func(**{**kwargs, unknown: 1.0})[metric], dtype=float)
+    m2 = np.asarray(func(**{**kwargs, unknown: 0.5 if kind == "reciprocal" else 2.0})[metric], dtype=float)
+    slope = m2 - m1
+    target = np.asarray(target, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = 1.0 + (target - m1) / slope
+        value = 1.0 / u if kind == "reciprocal" else u
+
+    feasible = (slope != 0) & np.isfinite(value)
+    if kind == "reciprocal":
+        feasible &= u > 0
+    else:
+        feasible &= value >= 0
+    if unknown in RATE_UNKNOWNS:
+        feasible &= value <= 100
+    return np.where(feasible, value, np.nan)[()]
+
+
+def bisect(func, target, lo, hi, iters=60):
+    """Vectorized bisection for an increasing ``func`` on ``[lo, hi]``.
+
+    Returns NaN where ``target`` isn't bracketed by ``func(lo)`` and ``func(hi)``.
+    """
+    target, lo, hi = (a.astype(float) for a in np.broadcast_arrays(target, lo, hi))
+    bracketed = (func(lo) <= target) & (func(hi) >= target)
+    for _ in range(iters):
+        mid = (lo + hi) / 2
+        above = func(mid) >= target
+        hi = np.where(above, mid, hi)
+        lo = np.where(above, lo, mid)
+    return np.where(bracketed, (lo + hi) / 2, np.nan)[()]
+
+
+def leads_for_roi(inputs, target_roi):
+    """Leads to re-engage so the CRM funnel reaches ``target_roi`` (%) over ``inputs["months"]``, in closed form.
+
+    For the cumulative ROI of the month-by-month reinvestment simulation use
+    :func:`~forecasting.reinvestment.leads_for_cumulative_roi`.
+    """
+    kwargs = {**MODELS["crm"][1], **inputs}
+    active = np.asarray(kwargs["active_leads"], dtype=float)
+    return (solve_for("crm", kwargs, "total_crm_leads", "roi", target_roi) - active)[()]
+
+
+def solve_increasing(func, target, lo=0.0, hi=1_000.0, max_doublings=40):
+    """Bisection for an increasing ``func`` on ``[lo, ∞)``.
+
+    The upper bracket starts at ``hi`` and doubles until it covers the target
+    (or clearly can't), so callers don't need to know the scale of the answer.
+    """
+    target = np.asarray(target, dtype=float)
+    hi = np.full(target.shape, float(hi))
+    for _ in range(max_doublings):
+        short = func(hi) < target
+        if not short.any():
+            break
+        hi = np.where(short, hi * 2, hi)
+    return bisect(func, target, lo, hi)
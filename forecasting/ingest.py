@@ -0,0 +1,111 @@
+"""Chunked ingestion of campaign exports for the Webinar forecast.
+
+Ad-platform exports are read ``chunksize`` rows at a time with explicit
+dtypes, and only the funnel columns are kept. Totals (and a per-day rollup
+when the export has a date column) are accumulated chunk by chunk, so memory
+use depends on the chunk size and the number of days, never on file size.
+"""
+import hashlib
+import re
+
+import pandas as pd
+
+from .funnel import safe_div
+
+CHUNKSIZE = 200_000
+REQUIRED_COLUMNS = ("spend", "clicks", "signups", "attendees", "sales")
+NUMERIC_COLUMNS = REQUIRED_COLUMNS + ("leads", "revenue")
+
+# Normalised export header -> canonical column
+COLUMN_ALIASES = {
+    "spend": "spend", "amount_spent": "spend", "amount_spent_usd": "spend", "cost": "spend", "ad_spend": "spend",
+    "clicks": "clicks", "link_clicks": "clicks", "clicks_all": "clicks",
+    "signups": "signups", "sign_ups": "signups", "registrations": "signups", "registrants": "signups",
+    "attendees": "attendees", "attended": "attendees", "webinar_attendees": "attendees",
+    "leads": "leads", "qualified_leads": "leads",
+    "sales": "sales", "purchases": "sales", "closed": "sales",
+    "revenue": "revenue", "purchase_value": "revenue", "purchases_conversion_value": "revenue",
+    "date": "date", "day": "date", "reporting_starts": "date",
+}
+
+
+def normalize_header(name):
+    return re.sub(r"[^a-z0-9]+", "_", str(name).strip().lower()).strip("_")
+
+
+def resolve_columns(header):
+    """Map raw export headers to canonical names, first match wins."""
+    mapping = {}
+    for raw in header:
+        canonical = COLUMN_ALIASES.get(normalize_header(raw))
+        if canonical and canonical not in mapping.values():
+            mapping[raw] = canonical
+    return mapping
+
+
+def file_digest(source, block_size=1 << 20):
+    """SHA-256 of a path or binary file object, read in blocks."""
+    digest = hashlib.sha256()
+    if hasattr(source, "read"):
+        source.seek(0)
+        for block in iter(lambda: source.read(block_size), b""):
+            digest.update(block)
+        source.seek(0)
+    else:
+        with open(source, "rb") as fh:
+            for block in iter(lambda: fh.read(block_size), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def read_campaign_csv(source, chunksize=CHUNKSIZE):
+    """Aggregate a campaign export incrementally.
+
+    Returns a dict with ``rows`` (data rows read), ``totals`` (column sums)
+    and ``daily`` (per-day sums, or ``None`` without a date column). Raises
+    ``ValueError`` if a required funnel column is missing.
+    """
+    header = pd.read_csv(source, nrows=0).columns
+    if hasattr(source, "seek"):
+        source.seek(0)
+    mapping = resolve_columns(header)
+    missing = [c for c in REQUIRED_COLUMNS if c not in mapping.values()]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+    numeric = [c for c in NUMERIC_COLUMNS if c in mapping.values()]
+    dtypes = {raw: ("string" if canonical == "date" else "float64") for raw, canonical in mapping.items()}
+    reader = pd.read_csv(source, usecols=list(mapping), dtype=dtypes, thousands=",", chunksize=chunksize)
+
+    totals = dict.fromkeys(numeric, 0.0)
+    daily = None
+    rows = 0
+    for chunk in reader:
+        chunk = chunk.rename(columns=mapping)
+        rows += len(chunk)
+        sums = chunk[numeric].sum()
+        for col in numeric:
+            totals[col] += float(sums[col])
+        if "date" in chunk:
+            day = pd.to_datetime(chunk["date"], errors="coerce").dt.normalize().rename("date")
+            part = chunk[numeric].groupby(day).sum()
+            daily = part if daily is None else daily.add(part, fill_value=0)
+    if daily is not None:
+        daily = daily.sort_index()
+    return {"rows": rows, "totals": totals, "daily": daily}
+
+
+def campaign_inputs(totals):
+    """Webinar model inputs (CPC and stage rates in %) implied by uploaded totals.
+
+    Without a leads column every attendee is treated as a qualified lead.
+    """
+    leads = totals.get("leads", totals["attendees"])
+    return {
+        "budget": totals["spend"],
+        "cpc": float(safe_div(totals["spend"], totals["clicks"], positive=True)),
+        "landing_cr": float(safe_div(totals["signups"], totals["clicks"], positive=True)) * 100,
+        "attendance_rate": float(safe_div(totals["attendees"], totals["signups"], positive=True)) * 100,
+        "lead_rate": float(safe_div(leads, totals["attendees"], positive=True)) * 100,
+        "sales_rate": float(safe_div(totals["sales"], leads, positive=True)) * 100,
+    }
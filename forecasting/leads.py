@@ -0,0 +1,193 @@
+"""Lead-level CRM exports for the re-engagement (CRM ROI) forecast.
+
+A CRM export has one row per lead with its source, age (or created date),
+last-touch date and pipeline stage. It is read column-wise in chunks with
+``source`` and ``stage`` as categoricals, and each chunk is reduced to stage
+counts per segment (source x lead age bucket) with a single groupby. Only
+those counts are kept, so memory use is bounded by the chunk size, which is
+derived from a memory budget, not by the number of leads.
+"""
+import numpy as np
+import pandas as pd
+
+from .ingest import normalize_header
+
+MEMORY_BUDGET = 256 * 1024 * 1024
+MIN_CHUNKSIZE = 10_000
+SAMPLE_ROWS = 10_000
+# Parsing, date conversion and grouping hold a few temporaries per column
+WORKING_SET_FACTOR = 4
+ACTIVE_DAYS = 30
+SMOOTHING = 20
+
+AGE_BINS = [-np.inf, 30, 90, 180, 365, np.inf]
+AGE_LABELS = ["0-30d", "31-90d", "91-180d", "181-365d", "365d+"]
+
+# Stage columns in funnel order; a lead at a stage has reached every earlier one
+STAGES = ("contacted", "booked", "showed", "closed")
+RATES = ("contact_rate", "booking_rate", "show_rate", "close_rate")
+COUNT_COLUMNS = ("leads", "active") + STAGES
+
+# Normalised CRM stage label -> number of funnel stages reached (0 = never contacted)
+STAGE_LEVELS = {
+    "new": 0, "open": 0, "unworked": 0, "uncontacted": 0, "attempted": 0, "no_answer": 0, "unqualified": 0,
+    "contacted": 1, "engaged": 1, "working": 1, "replied": 1, "nurture": 1, "qualified": 1,
+    "booked": 2, "scheduled": 2, "appointment_set": 2, "meeting_booked": 2, "no_show": 2,
+    "showed": 3, "attended": 3, "met": 3, "proposal": 3, "negotiation": 3, "closed_lost": 3, "lost": 3,
+    "closed": 4, "won": 4, "closed_won": 4, "customer": 4,
+}
+
+COLUMN_ALIASES = {
+    "source": "source", "lead_source": "source", "original_source": "source", "channel": "source",
+    "stage": "stage", "lead_status": "stage", "status": "stage", "pipeline_stage": "stage", "lifecycle_stage": "stage",
+    "age_days": "age_days", "lead_age": "age_days", "lead_age_days": "age_days", "age": "age_days",
+    "created": "created", "created_at": "created", "create_date": "created", "created_date": "created",
+    "last_touch": "last_touch", "last_touch_date": "last_touch", "last_activity": "last_touch",
+    "last_activity_date": "last_touch", "last_contacted": "last_touch",
+}
+
+
+def resolve_columns(header):
+    """Map raw CRM headers to canonical names, first match wins."""
+    mapping = {}
+    for raw in header:
+        canonical = COLUMN_ALIASES.get(normalize_header(raw))
+        if canonical and canonical not in mapping.values():
+            mapping[raw] = canonical
+    return mapping
+
+
+def _dtypes(mapping):
+    kinds = {"source": "category", "stage": "category", "age_days": "float64"}
+    return {raw: kinds.get(canonical, "string") for raw, canonical in mapping.items()}
+
+
+def chunksize_for(source, mapping, memory_budget=MEMORY_BUDGET):
+    """Rows per chunk that keep one parsed chunk (and its temporaries) within ``memory_budget`` bytes."""
+    sample = pd.read_csv(source, usecols=list(mapping), dtype=_dtypes(mapping), nrows=SAMPLE_ROWS)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    row_bytes = sample.memory_usage(deep=True, index=False).sum() / max(len(sample), 1)
+    return max(MIN_CHUNKSIZE, int(memory_budget / (max(row_bytes, 1.0) * WORKING_SET_FACTOR)))
+
+
+def _stage_levels(stage):
+    """Funnel level per row from a categorical stage column (unknown labels count as not contacted)."""
+    levels = np.array([STAGE_LEVELS.get(normalize_header(c), 0) for c in stage.cat.categories] + [0], dtype=np.int8)
+    # Code -1 (missing) picks the trailing 0
+    return levels[stage.cat.codes.to_numpy()]
+
+
+def _fill_unknown(values):
+    """Missing labels become "Unknown", which the export may already use as a label itself."""
+    values = pd.Categorical(values)
+    if "Unknown" not in values.categories:
+        values = values.add_categories("Unknown")
+    return values.fillna("Unknown")
+
+
+def _segment_counts(chunk, as_of, active_days):
+    n = len(chunk)
+    source = _fill_unknown(chunk["source"]) if "source" in chunk else pd.Categorical(["All"] * n)
+    if "age_days" in chunk:
+        age = chunk["age_days"].to_numpy()
+    elif "created" in chunk:
+        age = (as_of - pd.to_datetime(chunk["created"], errors="coerce")).dt.days.to_numpy(dtype=float)
+    else:
+        age = np.full(n, np.nan)
+    bucket = pd.cut(age, AGE_BINS, labels=AGE_LABELS)
+
+    level = _stage_levels(chunk["stage"]) if "stage" in chunk else np.zeros(n, dtype=np.int8)
+    counts = {"leads": np.ones(n, dtype=np.int64)}
+    if "last_touch" in chunk:
+        touched = (as_of - pd.to_datetime(chunk["last_touch"], errors="coerce")).dt.days.to_numpy(dtype=float)
+        counts["active"] = (touched <= active_days) & (level < len(STAGES))
+    else:
+        counts["active"] = np.zeros(n, dtype=bool)
+    for i, stage in enumerate(STAGES, start=1):
+        counts[stage] = level >= i
+
+    # Fresh 0..n-1 labels on every key: chunk row labels don't start at 0 after the first chunk
+    keys = [
+        pd.Series(source, name="source"),
+        pd.Series(_fill_unknown(bucket), name="age_bucket"),
+    ]
+    return pd.DataFrame(counts).groupby(keys, observed=True).sum()
+
+
+def read_crm_leads(source, memory_budget=MEMORY_BUDGET, as_of=None, active_days=ACTIVE_DAYS):
+    """Stage counts per segment from a lead-level CRM export.
+
+    Returns a dict with ``rows`` (leads read), ``chunksize`` and ``segments``:
+    a DataFrame indexed by (source, age_bucket) with ``leads``, ``active``
+    (touched within ``active_days`` of ``as_of`` and not closed) and the
+    number of leads that reached each funnel stage. Ages come from an age
+    column or, failing that, the created date. Raises ``ValueError`` when the
+    export has no stage column.
+    """
+    header = pd.read_csv(source, nrows=0).columns
+    if hasattr(source, "seek"):
+        source.seek(0)
+    mapping = resolve_columns(header)
+    if "stage" not in mapping.values():
+        raise ValueError("Missing a stage / lead status column")
+    as_of = pd.Timestamp(as_of if as_of is not None else pd.Timestamp.now()).normalize()
+
+    chunksize = chunksize_for(source, mapping, memory_budget)
+    reader = pd.read_csv(source, usecols=list(mapping), dtype=_dtypes(mapping), chunksize=chunksize)
+    parts = []
+    rows = 0
+    for chunk in reader:
+        chunk = chunk.rename(columns=mapping)
+        rows += len(chunk)
+        # Segment counts are tiny next to a chunk; combine them as they arrive so the list stays short
+        parts.append(_segment_counts(chunk, as_of, active_days))
+        if len(parts) > 16:
+            parts = [pd.concat(parts).groupby(level=[0, 1], observed=True).sum()]
+    if parts:
+        segments = pd.concat(parts).groupby(level=[0, 1], observed=True).sum()
+    else:
+        segments = pd.DataFrame(columns=list(COUNT_COLUMNS), index=pd.MultiIndex.from_tuples([], names=["source", "age_bucket"]))
+    return {"rows": rows, "chunksize": chunksize, "segments": segments.astype(np.int64).sort_index()}
+
+
+def segment_funnel(segments, smoothing=SMOOTHING):
+    """Empirical rates and re-engagement forecast per segment.
+
+    Each stage rate is the share of leads at the previous stage that reached
+    it, shrunk towards the all-segment rate by ``smoothing`` pseudo-leads so
+    small segments don't swing to 0% or 100%. The re-engagement pool is every
+    lead that is neither active nor closed; the forecast runs that pool
+    through the segment's own rates. Rates are in percent.
+    """
+    counts = segments[list(COUNT_COLUMNS)].astype(float)
+    reached = counts[["leads", *STAGES]].to_numpy()
+    trials, successes = reached[:, :-1], reached[:, 1:]
+    overall = successes.sum(axis=0) / np.maximum(trials.sum(axis=0), 1)
+    rates = (successes + smoothing * overall) / (trials + smoothing)
+
+    out = counts.copy()
+    out["pool"] = counts["leads"] - counts["active"] - counts["closed"]
+    for i, rate in enumerate(RATES):
+        out[rate] = rates[:, i] * 100
+    expected = out["pool"].to_numpy()[:, None] * np.cumprod(rates, axis=1)
+    for i, stage in enumerate(STAGES):
+        out[f"forecast_{stage}"] = expected[:, i]
+    return out
+
+
+def segment_inputs(funnel):
+    """CRM model inputs equivalent to running every segment through its own rates.
+
+    Pool-weighted effective rates reproduce the summed per-segment stage
+    forecasts exactly, so :func:`forecasting.crm_forecast` (and everything
+    built on it) can take the place of the global sliders.
+    """
+    pool = float(funnel["pool"].sum())
+    reached = [pool] + [float(funnel[f"forecast_{stage}"].sum()) for stage in STAGES]
+    rates = {
+        rate: (reached[i + 1] / reached[i] * 100 if reached[i] > 0 else 0.0)
+        for i, rate in enumerate(RATES)
+    }
+    total = int(funnel["leads"].sum())
+    return {"total_crm_leads": total, "active_leads": total - int(pool), **rates}
@@ -0,0 +1,135 @@
+"""Rerun profiling: timed sections collected per session and appended to a JSON-lines log.
+
+A :class:`Profiler` times named sections (``with profiler.section(...)``)
+and buffers one record per section; :meth:`Profiler.flush` appends the
+buffered records to a shared :class:`ProfileLog`. Because every session in
+every process appends to the same file, :func:`summarize_profile` over the
+log gives p50 / p95 per section across sessions (see
+``benchmarks/profile_report.py``).
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+RECENT_RECORDS = 500
+# Records the debug panel reads from the end of the shared log
+PANEL_RECORDS = 20_000
+TAIL_BLOCK = 1 << 16
+
+
+class ProfileLog:
+    """Append-only JSON-lines file, safe to share between threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, records):
+        if not records:
+            return
+        lines = "".join(json.dumps(r, default=float) + "\n" for r in records)
+        with self._lock, open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(lines)
+
+
+class Profiler:
+    """Section timings for one session.
+
+    ``recent`` keeps the last ``RECENT_RECORDS`` records for a debug panel;
+    ``flush`` hands pending records to the log (when there is one).
+    """
+
+    def __init__(self, log=None, session=None):
+        self.log = log
+        self.session = session or uuid.uuid4().hex[:8]
+        self.recent = deque(maxlen=RECENT_RECORDS)
+        self._pending = []
+
+    def record(self, section, seconds, kind="section", **extra):
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "session": self.session, "kind": kind, "section": section,
+            "ms": round(seconds * 1000, 3), **extra,
+        }
+        self.recent.append(entry)
+        self._pending.append(entry)
+        return entry
+
+    @contextmanager
+    def section(self, section, kind="section", **extra):
+        """Time the body; yields a dict whose items are added to the record (e.g. payload ``bytes``)."""
+        start = time.perf_counter()
+        details = dict(extra)
+        try:
+            yield details
+        finally:
+            self.record(section, time.perf_counter() - start, kind, **details)
+
+    def flush(self):
+        pending, self._pending = self._pending, []
+        if self.log is not None:
+            self.log.append(pending)
+        return len(pending)
+
+
+def _tail_lines(fh, count):
+    """Last ``count`` lines of a binary file, read backwards in blocks so the cost doesn't grow with the file."""
+    end = fh.seek(0, os.SEEK_END)
+    blocks, newlines = [], 0
+    # One newline more than needed guarantees the first kept line is whole
+    while end > 0 and newlines <= count:
+        start = max(end - TAIL_BLOCK, 0)
+        fh.seek(start)
+        block = fh.read(end - start)
+        blocks.append(block)
+        newlines += block.count(b"\n")
+        end = start
+    return b"".join(reversed(blocks)).splitlines()[-count:]
+
+
+def read_profile_log(path, last=None):
+    """Profile log as a DataFrame (empty when the file doesn't exist yet); malformed lines are skipped.
+
+    With ``last``, only the final ``last`` records are read, from the end of the file.
+    """
+    rows = []
+    try:
+        with open(path, "rb") as fh:
+            lines = fh if last is None else _tail_lines(fh, last)
+            for line in lines:
+                try:
+                    rows.append(json.loads(line))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+    except FileNotFoundError:
+        pass
+    return pd.DataFrame(rows, columns=None if rows else ["kind", "section", "ms"])
+
+
+def summarize_profile(records):
+    """p50 / p95 / max milliseconds (and payload KB where recorded) per kind and section.
+
+    ``records`` is a DataFrame from :func:`read_profile_log` or any iterable of
+    record dicts. Sorted by p95, slowest first.
+    """
+    frame = records if isinstance(records, pd.DataFrame) else pd.DataFrame(list(records))
+    if frame.empty:
+        return pd.DataFrame(columns=["kind", "section", "count", "p50_ms", "p95_ms", "max_ms", "p50_kb", "p95_kb"])
+    if "bytes" not in frame:
+        frame = frame.assign(bytes=np.nan)
+
+    grouped = frame.groupby(["kind", "section"], sort=False)
+    summary = grouped["ms"].agg(
+        count="count", p50_ms=lambda s: s.quantile(0.5), p95_ms=lambda s: s.quantile(0.95), max_ms="max"
+    )
+    kb = grouped["bytes"].agg(p50_kb=lambda s: s.quantile(0.5), p95_kb=lambda s: s.quantile(0.95)) / 1024
+    return summary.join(kb).reset_index().sort_values("p95_ms", ascending=False, ignore_index=True)
+
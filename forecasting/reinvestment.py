@@ -0,0 +1,145 @@
+"""Month-by-month reinvestment simulator for the yearly CRM view.
+
+Instead of compounding a fixed monthly ROI, each month is stepped forward:
+the team works as many leads as its capacity allows, worked leads leave the
+re-engagement pool, fresh and purchased leads refill it, and a share of each
+month's profit (set by the Light / Moderate / Aggressive reinvestment mode)
+is reinvested in buying leads or, while leads are waiting, adding team
+capacity for the next month.
+Cash is carried forward as the running sum of net profit.
+
+All three modes and any number of scenarios are advanced together, so a
+simulation costs one array operation per month regardless of how many
+scenarios it covers.
+"""
+import numpy as np
+import pandas as pd
+
+from .funnel import CRM_DEFAULTS, ROI_TIERS, safe_div
+from .goalseek import solve_increasing
+
+REINVESTMENT_DEFAULTS = {
+    "leads_per_member": 750,       # leads one team member can work per month
+    "new_leads_per_month": 100,    # organic leads entering the CRM each month
+    "cost_per_new_lead": 25.0,     # acquisition cost of a purchased lead
+    "reinvest_to_leads": 50,       # % of reinvested profit spent on leads; the rest adds staff
+    "starting_cash": 0.0,
+}
+SERIES = (
+    "pool", "worked", "closed", "revenue", "salary_cost", "lead_cost", "total_cost", "net_profit",
+    "reinvested", "team_members", "cash", "cumulative_roi",
+)
+
+
+def simulate_reinvestment(inputs=None, horizon=12, modes=tuple(ROI_TIERS)):
+    """Step the CRM funnel forward ``horizon`` months under each reinvestment mode.
+
+    ``inputs`` takes the CRM model inputs plus :data:`REINVESTMENT_DEFAULTS`;
+    any of them may be arrays, which are broadcast into a scenario shape.
+    Returns a dict mapping each name in :data:`SERIES` to an array of shape
+    ``(horizon, len(modes), *scenario_shape)``.
+    """
+    p = {**CRM_DEFAULTS, **REINVESTMENT_DEFAULTS, **(inputs or {})}
+    p.pop("months", None)
+    shape = np.broadcast(*(np.asarray(v, dtype=float) for v in p.values())).shape
+    # Leading mode axis, broadcast against the scenario axes
+    share = np.array([ROI_TIERS[m] for m in modes], dtype=float).reshape((-1,) + (1,) * len(shape))
+    state_shape = (len(modes),) + shape
+
+    def get(name):
+        return np.broadcast_to(np.asarray(p[name], dtype=float), shape)
+
+    close_per_lead = get("contact_rate") * get("booking_rate") * get("show_rate") * get("close_rate") / 100 ** 4
+    client_value, salary = get("client_value"), get("monthly_salary")
+    fixed_cost = get("monthly_tech_stack") + get("existing_overhead")
+    lead_share = get("reinvest_to_leads") / 100
+    capacity_per_member, new_leads = get("leads_per_member"), get("new_leads_per_month")
+
+    pool = np.broadcast_to(get("total_crm_leads") - get("active_leads"), state_shape).copy()
+    team = np.broadcast_to(get("team_members"), state_shape).copy()
+    cash = np.broadcast_to(get("starting_cash"), state_shape).copy()
+    acquisition = np.zeros(state_shape)
+    total_profit = np.zeros(state_shape)
+    total_cost = np.zeros(state_shape)
+    out = {name: np.empty((horizon,) + state_shape) for name in SERIES}
+
+    for month in range(horizon):
+        # Last month's reinvested acquisition spend delivers its leads now
+        pool += new_leads + safe_div(acquisition, get("cost_per_new_lead"), positive=True)
+        worked = np.minimum(pool, team * capacity_per_member)
+        pool -= worked
+        closed = worked * close_per_lead
+        revenue = closed * client_value
+        salary_cost, lead_cost = team * salary, acquisition
+        cost = fixed_cost + salary_cost + lead_cost
+        profit = revenue - cost
+        cash += profit
+        total_profit += profit
+        total_cost += cost
+
+        budget = np.maximum(profit, 0) * share
+        acquisition = budget * lead_share
+        # Only hire for leads that are waiting; unused staff budget stays in cash
+        hires = np.minimum(
+            safe_div(budget * (1 - lead_share), salary, positive=True),
+            safe_div(pool, capacity_per_member, positive=True),
+        )
+        team = team + hires
+        reinvested = acquisition + hires * salary
+
+        for name, value in (
+            ("pool", pool), ("worked", worked), ("closed", closed), ("revenue", revenue),
+            ("salary_cost", salary_cost), ("lead_cost", lead_cost), ("total_cost", cost), ("net_profit", profit), ("reinvested", reinvested),
+            ("team_members", team), ("cash", cash), ("cumulative_roi", safe_div(total_profit, total_cost) * 100),
+        ):
+            out[name][month] = value
+    return out
+
+
+def reinvestment_frame(result, modes=tuple(ROI_TIERS)):
+    """Long-format DataFrame (month, mode[, scenario], series...) of a simulation."""
+    horizon, n_modes = result["cash"].shape[:2]
+    n_scenarios = int(np.prod(result["cash"].shape[2:], dtype=int))
+    frame = pd.DataFrame({
+        "month": np.repeat(np.arange(1, horizon + 1), n_modes * n_scenarios),
+        "mode": np.tile(np.repeat(list(modes), n_scenarios), horizon),
+    })
+    if n_scenarios > 1:
+        frame["scenario"] = np.tile(np.arange(n_scenarios), horizon * n_modes)
+    for name in SERIES:
+        frame[name] = result[name].reshape(-1)
+    return frame
+
+
+def reinvestment_totals(frame, inputs, mode="Aggressive", months=12):
+    """Funnel and financial totals of ``mode`` over the first ``months`` of a single-scenario frame.
+
+    Keys match :func:`~forecasting.funnel.crm_forecast`, plus ``lead_cost``
+    for reinvested lead purchases, so the yearly view can show the simulated
+    year in place of twelve copies of one month.
+    """
+    p = {**CRM_DEFAULTS, **inputs}
+    rows = frame[(frame["mode"] == mode) & (frame["month"] <= months)]
+    contacted = rows["worked"].sum() * p["contact_rate"] / 100
+    booked = contacted * p["booking_rate"] / 100
+    revenue, total_cost = rows["revenue"].sum(), rows["total_cost"].sum()
+    return {
+        "contacted": contacted, "booked": booked, "showed": booked * p["show_rate"] / 100,
+        "closed": rows["closed"].sum(), "revenue": revenue,
+        "tech_cost": p["monthly_tech_stack"] * len(rows), "salary_cost": rows["salary_cost"].sum(),
+        "overhead_cost": p["existing_overhead"] * len(rows), "lead_cost": rows["lead_cost"].sum(),
+        "total_cost": total_cost, "net_profit": revenue - total_cost,
+        "roi": float(safe_div(revenue - total_cost, total_cost)) * 100,
+    }
+
+
+def leads_for_cumulative_roi(inputs, target_roi, mode="Aggressive", horizon=12):
+    """Leads to re-engage so the simulated cumulative ROI after ``horizon`` months hits ``target_roi`` (%)."""
+    active = np.asarray({**CRM_DEFAULTS, **inputs}["active_leads"], dtype=float)
+
+    def cumulative_roi(leads):
+        result = simulate_reinvestment({**inputs, "total_crm_leads": active + leads}, horizon, (mode,))
+        return result["cumulative_roi"][-1, 0]
+
+    target = np.asarray(target_roi, dtype=float)
+    return solve_increasing(cumulative_roi, np.broadcast_to(target, np.broadcast(target, active).shape))
@@ -0,0 +1,103 @@
+"""Sensitivity analysis: 2-D parameter sweeps and one-at-a-time tornado data.
+
+Both are evaluated as single broadcasted calls into the funnel models; a
+200x200 grid is one array expression, not 40,000 Python-level forecasts.
+"""
+import numpy as np
+import pandas as pd
+
+from .funnel import MODELS, run_model
+
+# Inputs that are percentages and must stay within 0-100
+RATE_INPUTS = {
+    "landing_cr", "attendance_rate", "lead_rate", "sales_rate", "landing_page_rate",
+    "contact_rate", "booking_rate", "show_rate", "close_rate",
+}
+# Inputs that are switches or view settings rather than quantities to sweep
+FIXED_INPUTS = {"treat_all_as_leads", "months"}
+# Grid rows (y values) per block when a sweep is streamed in long form
+SWEEP_CHUNK_ROWS = 64
+
+
+def sweepable_inputs(model):
+    _, defaults = MODELS[model]
+    return [name for name in defaults if name not in FIXED_INPUTS]
+
+
+def sweep_range(name, value, rel=0.5, num=200):
+    """``num`` evenly spaced values within ±``rel`` of ``value``.
+
+    A zero value gets an absolute span (``rel`` × 100 points for rates, ``rel``
+    otherwise) so the sweep is never degenerate. Rates are clipped to 0-100 and
+    everything else to non-negative values.
+    """
+    value = float(value)
+    span = abs(value) * rel or (100 * rel if name in RATE_INPUTS else rel)
+    lo, hi = max(value - span, 0.0), value + span
+    if name in RATE_INPUTS:
+        hi = min(hi, 100.0)
+    return np.linspace(lo, hi, num)
+
+
+def sweep_2d(model, inputs, x, y, metric="net_profit"):
+    """Evaluate ``metric`` over the grid ``x`` × ``y``.
+
+    ``x`` and ``y`` are ``(input name, values)`` pairs. Returns an array of
+    shape ``(len(y values), len(x values))``, ready for a heatmap.
+    """
+    func, defaults = MODELS[model]
+    (x_name, x_values), (y_name, y_values) = x, y
+    if x_name == y_name:
+        raise ValueError("Pick two different inputs to sweep")
+    kwargs = {**defaults, **inputs}
+    kwargs[x_name] = np.asarray(x_values, dtype=float)[np.newaxis, :]
+    kwargs[y_name] = np.asarray(y_values, dtype=float)[:, np.newaxis]
+    grid = func(**kwargs)[metric]
+    return np.broadcast_to(grid, (len(y_values), len(x_values)))
+
+
+def sweep_frames(model, inputs, x, y, metric="net_profit", rows=SWEEP_CHUNK_ROWS):
+    """:func:`sweep_2d` in long form (one row per grid point), yielded ``rows`` y values at a time.
+
+    Only one block of the grid exists at once, so very fine sweeps can be
+    streamed to an export without materializing the whole grid.
+    """
+    (x_name, x_values), (y_name, y_values) = x, y
+    x_values, y_values = np.asarray(x_values, dtype=float), np.asarray(y_values, dtype=float)
+    for start in range(0, len(y_values), rows):
+        block = y_values[start:start + rows]
+        grid = sweep_2d(model, inputs, (x_name, x_values), (y_name, block), metric)
+        yield pd.DataFrame({
+            y_name: np.repeat(block, len(x_values)), x_name: np.tile(x_values, len(block)), metric: grid.ravel()
+        })
+
+
+def tornado(model, inputs, metric="net_profit", rel=0.2):
+    """One-at-a-time swing of ``metric`` when each input moves ±``rel``.
+
+    All low/high scenarios are evaluated in one batch. Returns one row per
+    input, sorted by the absolute swing (largest first).
+    """
+    _, defaults = MODELS[model]
+    point = {**defaults, **inputs}
+    names = sweepable_inputs(model)
+    bounds = {name: sweep_range(name, point[name], rel, num=2) for name in names}
+
+    # Row 0 is the base case, then a low and a high row per input
+    rows = 1 + 2 * len(names)
+    scenarios = {name: np.full(rows, float(point[name])) for name in names}
+    for i, name in enumerate(names):
+        scenarios[name][1 + 2 * i: 3 + 2 * i] = bounds[name]
+    fixed = {k: v for k, v in point.items() if k not in scenarios}
+    values = run_model(model, pd.DataFrame(scenarios), **fixed)[metric].to_numpy()
+
+    result = pd.DataFrame({
+        "input": names,
+        "low_value": [bounds[n][0] for n in names],
+        "high_value": [bounds[n][1] for n in names],
+        "low_metric": values[1::2],
+        "high_metric": values[2::2],
+    })
+    result["base_metric"] = values[0]
+    result["swing"] = (result["high_metric"] - result["low_metric"]).abs()
+    return result.sort_values("swing", ascending=False, ignore_index=True)
@@ -0,0 +1,92 @@
+"""Monte Carlo uncertainty mode for the funnel models.
+
+Each uncertain input gets a distribution centred on its slider value: rates
+(percentages) are drawn from a Beta distribution with a given standard
+deviation in percentage points, and costs such as CPC from a lognormal whose
+median is the slider value. The draws for one input are cached on
+``(distribution, parameters, n, seed, input name)``, so moving a single slider
+only regenerates the draws of that input. The cache is bounded by bytes
+(``DRAW_CACHE_BYTES``), not by entry count, since one entry can be a million
+draws.
+"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from .cache import ResultCache, canonical_key
+from .funnel import MODELS, run_model
+
+DEFAULT_DRAWS = 100_000
+DEFAULT_SEED = 42
+SUMMARY_METRICS = ("revenue", "net_profit", "roas")
+PERCENTILES = (10, 50, 90)
+# 64 MB holds eight inputs at a million draws each
+DRAW_CACHE_BYTES = 64 * 1024 * 1024
+DRAW_CACHE = ResultCache(max_bytes=DRAW_CACHE_BYTES, ttl=float("inf"))
+
+
+def _rng(seed, name):
+    # Independent, reproducible stream per input so cached draws don't correlate
+    return np.random.default_rng([seed, zlib.crc32(name.encode())])
+
+
+def _beta_draws(mean_pct, sd_pct, n, seed, name):
+    m, s = mean_pct / 100, sd_pct / 100
+    if s <= 0 or m <= 0 or m >= 1:
+        draws = np.full(n, float(mean_pct))
+    else:
+        # Method of moments; cap the spread so both shape parameters stay positive
+        kappa = max(m * (1 - m) / s ** 2 - 1, 1e-3)
+        draws = _rng(seed, name).beta(m * kappa, (1 - m) * kappa, n) * 100
+    draws.flags.writeable = False
+    return draws
+
+
+def _lognormal_draws(median, sigma, n, seed, name):
+    if sigma <= 0 or median <= 0:
+        draws = np.full(n, float(median))
+    else:
+        draws = median * np.exp(sigma * _rng(seed, name).standard_normal(n))
+    draws.flags.writeable = False
+    return draws
+
+
+def draw(name, value, spec, n=DEFAULT_DRAWS, seed=DEFAULT_SEED):
+    """Draw ``n`` samples of input ``name`` centred on ``value``.
+
+    ``spec`` is ``("beta", sd_pct)`` for rates or ``("lognormal", sigma)`` for
+    strictly positive costs. The returned array is read-only and shared.
+    """
+    dist, spread = spec
+    generators = {"beta": _beta_draws, "lognormal": _lognormal_draws}
+    if dist not in generators:
+        raise ValueError(f"Unknown distribution '{dist}' for input '{name}'")
+    args = (float(value), float(spread), int(n), int(seed), name)
+    return DRAW_CACHE.get_or_compute(canonical_key(f"draws:{dist}", args), lambda: generators[dist](*args))
+
+
+def simulate(model, inputs, uncertainty, n=DEFAULT_DRAWS, seed=DEFAULT_SEED):
+    """Run ``model`` over ``n`` joint draws of the uncertain inputs.
+
+    ``inputs`` holds the point values (missing ones use the model defaults) and
+    ``uncertainty`` maps input names to a distribution spec, see :func:`draw`.
+    Inputs without a spec are held fixed. Returns one row per draw.
+    """
+    _, defaults = MODELS[model]
+    point = {**defaults, **inputs}
+    columns = {name: draw(name, point[name], spec, n, seed) for name, spec in uncertainty.items()}
+    fixed = {k: v for k, v in point.items() if k not in columns}
+    return run_model(model, pd.DataFrame(columns, index=pd.RangeIndex(n)), **fixed)
+
+
+def summarize(outcomes, metrics=SUMMARY_METRICS, percentiles=PERCENTILES):
+    """Percentile bands of ``metrics`` plus the probability of a net loss.
+
+    Returns ``(bands, prob_loss)`` where ``bands`` has one row per metric and
+    one ``P<q>`` column per percentile.
+    """
+    values = np.percentile(outcomes[list(metrics)].to_numpy(), percentiles, axis=0)
+    bands = pd.DataFrame(values.T, index=list(metrics), columns=[f"P{q}" for q in percentiles])
+    prob_loss = float((outcomes["net_profit"].to_numpy() < 0).mean()) if len(outcomes) else 0.0
+    return bands, prob_loss
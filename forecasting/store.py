@@ -0,0 +1,203 @@
+"""SQLite-backed store of saved forecast scenarios.
+
+Each scenario keeps its name, client, model, creation time, and the full
+inputs and results as JSON. The headline metrics are also kept in their own
+columns, indexed per client, so queries like "top 50 scenarios by ROAS for
+client X" are served from an index rather than by decoding JSON.
+"""
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from .funnel import MODELS
+
+HEADLINE_METRICS = ("revenue", "net_profit", "roas", "roi")
+ORDER_COLUMNS = ("created_at", "name", "client", "model") + HEADLINE_METRICS
+INSERT_CHUNK = 50_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    client TEXT NOT NULL DEFAULT '',
+    model TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    results TEXT NOT NULL,
+    revenue REAL,
+    net_profit REAL,
+    roas REAL,
+    roi REAL
+);
+CREATE INDEX IF NOT EXISTS idx_scenarios_client_model_created ON scenarios (client, model, created_at);
+CREATE INDEX IF NOT EXISTS idx_scenarios_model_created ON scenarios (model, created_at);
+CREATE INDEX IF NOT EXISTS idx_scenarios_created ON scenarios (created_at);
+CREATE INDEX IF NOT EXISTS idx_scenarios_client_roas ON scenarios (client, roas);
+CREATE INDEX IF NOT EXISTS idx_scenarios_client_net_profit ON scenarios (client, net_profit);
+CREATE INDEX IF NOT EXISTS idx_scenarios_client_roi ON scenarios (client, roi);
+"""
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Can't store {type(value).__name__} in a scenario")
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _metric(results, name):
+    value = results.get(name)
+    return None if value is None else float(value)
+
+
+def model_outputs(model):
+    """Names of the values ``model`` computes (as opposed to its inputs)."""
+    func, defaults = MODELS[model]
+    return list(func(**defaults))
+
+
+class ScenarioStore:
+    """Saved scenarios in a local SQLite file (``":memory:"`` works for tests).
+
+    One connection is shared behind a lock so the store can be used from
+    several Streamlit sessions at once.
+    """
+
+    def __init__(self, path="scenarios.db"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def save(self, name, model, inputs, results, client=""):
+        """Save one scenario and return its id."""
+        if model not in MODELS:
+            raise ValueError(f"Unknown model '{model}'")
+        row = (
+            name, client or "", model, _now(),
+            json.dumps(inputs, default=_json_default), json.dumps(results, default=_json_default),
+            *(_metric(results, m) for m in HEADLINE_METRICS),
+        )
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO scenarios (name, client, model, created_at, inputs, results, revenue, net_profit, roas, roi)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row
+            )
+        return cursor.lastrowid
+
+    def save_many(self, frame, model=None):
+        """Bulk-insert batch engine output (see :func:`forecasting.run_batch`).
+
+        Rows are split by their ``model`` column unless ``model`` is given;
+        optional ``name`` and ``client`` columns label them. Returns the
+        number of rows inserted.
+        """
+        groups = [(model, frame)] if model is not None else frame.groupby("model", sort=False)
+        created_at = _now()
+        inserted = 0
+        with self._lock, self._conn:
+            for name, group in groups:
+                inputs = [c for c in MODELS[name][1] if c in group.columns]
+                outputs = [c for c in model_outputs(name) if c in group.columns]
+                for start in range(0, len(group), INSERT_CHUNK):
+                    chunk = group.iloc[start:start + INSERT_CHUNK]
+                    labels = chunk["name"].astype(str) if "name" in chunk else name + " #" + chunk.index.astype(str)
+                    clients = chunk["client"].astype(str) if "client" in chunk else pd.Series("", index=chunk.index)
+                    metrics = [
+                        chunk[m].astype(float).tolist() if m in chunk else [None] * len(chunk) for m in HEADLINE_METRICS
+                    ]
+                    rows = zip(
+                        labels, clients, [name] * len(chunk), [created_at] * len(chunk),
+                        chunk[inputs].to_json(orient="records", lines=True).splitlines(),
+                        chunk[outputs].to_json(orient="records", lines=True).splitlines(),
+                        *metrics,
+                    )
+                    self._conn.executemany(
+                        "INSERT INTO scenarios (name, client, model, created_at, inputs, results, revenue, net_profit, roas, roi)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                    )
+                    inserted += len(chunk)
+        return inserted
+
+    def query(self, client=None, model=None, since=None, until=None, order_by="created_at",
+              descending=True, limit=50, expand=False):
+        """Saved scenarios as a DataFrame, filtered and sorted in SQL.
+
+        ``model`` may be a name or a list of names; ``since`` / ``until`` are
+        ISO timestamps or dates. With ``expand=True`` the stored inputs and
+        results are decoded into ``input.*`` / ``result.*`` columns.
+        """
+        if order_by not in ORDER_COLUMNS:
+            raise ValueError(f"Can't sort by '{order_by}' (expected one of {', '.join(ORDER_COLUMNS)})")
+        clauses, params = [], []
+        if client is not None:
+            clauses.append("client = ?")
+            params.append(client)
+        if model is not None:
+            models = [model] if isinstance(model, str) else list(model)
+            clauses.append(f"model IN ({', '.join('?' * len(models))})")
+            params.extend(models)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(str(since))
+        if until is not None:
+            clauses.append("created_at <= ?")
+            params.append(str(until))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        # NULL metrics (e.g. ROI for webinar scenarios) sort last either way; plain DESC
+        # already does that and keeps the (client, metric) index usable for the sort
+        order = f"{order_by} DESC" if descending else f"{order_by} ASC NULLS LAST"
+        columns = "id, name, client, model, created_at, " + ", ".join(HEADLINE_METRICS)
+        if expand:
+            columns += ", inputs, results"
+        sql = f"SELECT {columns} FROM scenarios {where} ORDER BY {order} LIMIT ?"
+        with self._lock:
+            frame = pd.read_sql_query(sql, self._conn, params=params + [int(limit)])
+        if expand:
+            frame = self._expand(frame)
+        return frame
+
+    def load(self, ids):
+        """Scenarios by id, with inputs and results decoded into columns."""
+        ids = [int(i) for i in ids]
+        if not ids:
+            return pd.DataFrame()
+        sql = (
+            "SELECT id, name, client, model, created_at, " + ", ".join(HEADLINE_METRICS) + ", inputs, results"
+            f" FROM scenarios WHERE id IN ({', '.join('?' * len(ids))})"
+        )
+        with self._lock:
+            frame = pd.read_sql_query(sql, self._conn, params=ids)
+        return self._expand(frame)
+
+    def clients(self):
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT DISTINCT client FROM scenarios ORDER BY client")]
+
+    def delete(self, ids):
+        ids = [int(i) for i in ids]
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM scenarios WHERE id IN ({', '.join('?' * len(ids))})", ids)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _expand(frame):
+        parts = [frame.drop(columns=["inputs", "results"])]
+        for column in ("inputs", "results"):
+            decoded = pd.json_normalize([json.loads(v) for v in frame[column]]).add_prefix(f"{column[:-1]}.")
+            decoded.index = frame.index
+            parts.append(decoded)
+        return pd.concat(parts, axis=1)
@@ -1,106 +1,782 @@
+import time
+
+_script_start = time.perf_counter()
+
+import os
+import sys
+import json
+import functools
+from contextlib import contextmanager, nullcontext
+
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-import io
 
 st.set_page_config(page_title="Campaign Planning Suite", layout="wide")
 
-# ==== BRANDING: Logo + CSS Styling ====
-from PIL import Image
-import os
 
+# ==== Startup timing (STARTUP_TIMING=1 or ?startup_timing=1) and rerun profiler (PROFILE=1 or ?profile=1) ====
+# The profiler appends to PROFILE_LOG (default profile.jsonl)
+PROFILING = os.environ.get("PROFILE") == "1" or st.query_params.get("profile") == "1"
+# Sections timed before the profiler exists (the imports) wait here for it
+_early_sections = []
+
+
+@st.cache_resource
+def startup_timings():
+    # Process-wide, so first-import and first-render costs survive later reruns
+    return {}
+
+
+@contextmanager
+def timed(label, kind="startup", **extra):
+    """Time the body for the startup report and, when profiling, for the rerun profile.
+
+    Yields a dict; items added to it (e.g. payload ``bytes``) go into the profile record.
+    """
+    start = time.perf_counter()
+    details = dict(extra)
+    yield details
+    elapsed = time.perf_counter() - start
+    if kind == "startup":
+        startup_timings().setdefault(label, elapsed)
+    if PROFILING:
+        profiler = st.session_state.get("_profiler")
+        if profiler is None:
+            _early_sections.append((label, elapsed, kind, details))
+        else:
+            profiler.record(label, elapsed, kind, **details)
+
+
+with timed("import pandas, numpy"):
+    import pandas as pd
+    import numpy as np
+    import io
+
+with timed("import forecasting"):
+    from forecasting import book_a_call_forecast, crm_forecast, roi_tiers, webinar_forecast
+    from forecasting import WEBINAR_DEFAULTS
+    from forecasting import DEFAULT_DRAWS, DRAW_CACHE, simulate, summarize
+    from forecasting import campaign_inputs, file_digest, read_campaign_csv
+    from forecasting import read_crm_leads, segment_funnel, segment_inputs
+    from forecasting import sweep_2d, sweep_frames, sweep_range, sweepable_inputs, tornado
+    from forecasting import leads_for_roi, solve_for
+    from forecasting import allocate, marginal_curves
+    from forecasting import cohort_timeline, lag_distribution, payback_period, timeline_frame
+    from forecasting import REINVESTMENT_DEFAULTS, leads_for_cumulative_roi, simulate_reinvestment
+    from forecasting import reinvestment_frame, reinvestment_totals
+    from forecasting import ResultCache, canonical_key
+    from forecasting import ScenarioStore
+    from forecasting import export_bytes, scenario_tables
+    from forecasting import BenchmarkSet
+    from forecasting import PANEL_RECORDS, ProfileLog, Profiler, read_profile_log, summarize_profile
+    from forecasting import downsample_frame, fit_figure
+    from forecasting import Calibrator
+
+
+@st.cache_resource
+def profile_log():
+    return ProfileLog(os.environ.get("PROFILE_LOG", "profile.jsonl"))
+
+
+if PROFILING:
+    if "_profiler" not in st.session_state:
+        st.session_state._profiler = Profiler(profile_log())
+    for label, elapsed, kind, details in _early_sections:
+        st.session_state._profiler.record(label, elapsed, kind, **details)
+
+
+def flush_profile():
+    if PROFILING:
+        st.session_state._profiler.flush()
+
+
+def profiled_tab(label):
+    """Time a tab's whole render; fragment reruns skip the end of the script, so flush here too."""
+    def decorate(render):
+        @functools.wraps(render)
+        def run():
+            with timed(label, "tab"):
+                render()
+            flush_profile()
+        return run
+    return decorate
+
+
+def plotly_modules():
+    """Import plotly on first use; nothing needs it until the first chart is built."""
+    with timed("import plotly"):
+        import plotly.express as px
+        import plotly.graph_objects as go
+    return px, go
+
+
+# ==== Result cache shared by every session in the process ====
+@st.cache_resource
+def result_cache():
+    return ResultCache(
+        max_bytes=int(float(os.environ.get("RESULT_CACHE_MAX_MB", 64)) * 1024 * 1024),
+        ttl=float(os.environ.get("RESULT_CACHE_TTL", 3600)),
+    )
+
+
+def cached_forecast(model, forecast, inputs):
+    with timed(model, "forecast"):
+        return dict(result_cache().get_or_compute(canonical_key(f"metrics:{model}", inputs), lambda: forecast(**inputs)))
+
+
+# ==== Charts: reduced server-side before they reach the browser ====
+CHART_MAX_BYTES = int(float(os.environ.get("CHART_MAX_KB", 1024)) * 1024)
+
+
+def fitted_figure(name, build):
+    """Build a figure and reduce it (downsampling, WebGL, payload cap) as a dict; the report rides along under ``_fit``."""
+    with timed(name, "figure_build") as details:
+        figure, report = fit_figure(json.loads(build().to_json()), max_bytes=CHART_MAX_BYTES)
+        details.update(report)
+    figure["_fit"] = report
+    return figure
+
+
+def cached_figure(name, inputs, build):
+    """Figure for ``inputs``, built once and stored as JSON so sessions can't mutate each other's copy."""
+    fig_json = result_cache().get_or_compute(
+        canonical_key(f"figure:{name}", inputs), lambda: json.dumps(fitted_figure(name, build))
+    )
+    return json.loads(fig_json)
+
+
+def plotly_chart(name, figure, **kwargs):
+    """``st.plotly_chart`` for a :func:`cached_figure` or a zero-argument builder.
+
+    Builders go through :func:`fitted_figure` too, so every chart is capped. Notes how many points are
+    shown when the data was reduced and, when profiling, records the payload size per chart.
+    """
+    if callable(figure):
+        figure = fitted_figure(name, figure)
+    report = figure.pop("_fit", None)
+    if not PROFILING:
+        chart = st.plotly_chart(figure, **kwargs)
+    else:
+        with timed(name, "chart", bytes=len(json.dumps(figure).encode("utf-8"))):
+            chart = st.plotly_chart(figure, **kwargs)
+    if report and report["kept"] < report["points"]:
+        st.caption(f"Showing {report['kept']:,} of {report['points']:,} points, reduced server-side for display.")
+    return chart
+
+
+# ==== Saved scenarios (SQLite, one file per deployment) ====
+@st.cache_resource
+def scenario_store():
+    return ScenarioStore(os.environ.get("SCENARIO_DB", "scenarios.db"))
+
+
+def render_save_scenario(model, inputs, results, key):
+    with st.expander("💾 Save Scenario"):
+        c1, c2 = st.columns(2)
+        client = c1.text_input("Client", key=f"save_client_{key}")
+        name = c2.text_input("Scenario Name", key=f"save_name_{key}")
+        if st.button("Save Scenario", key=f"save_button_{key}"):
+            if not name.strip():
+                st.error("Give the scenario a name first.")
+            else:
+                scenario_store().save(name.strip(), model, inputs, results, client=client.strip())
+                st.success(f"Saved '{name.strip()}'. Compare it in the Saved Scenarios tab.")
+
+
+# ==== Exports (all tabs) ====
+EXPORT_FORMATS = {"Excel workbook (.xlsx)": "xlsx", "Parquet (.zip)": "parquet", "CSV (.zip)": "csv"}
+
+
+def render_export(tables, key, file_stem, title="📤 Export"):
+    """Download ``tables`` (name -> DataFrame or chunks) as one workbook or zip.
+
+    ``tables`` may be a zero-argument builder; nothing is built until the user asks for the file.
+    With ``title=None`` the controls render in place (e.g. inside another expander).
+    """
+    with st.expander(title) if title else nullcontext():
+        c1, c2 = st.columns(2)
+        label = c1.selectbox("Format", list(EXPORT_FORMATS), key=f"export_format_{key}")
+        fmt = EXPORT_FORMATS[label]
+        if c2.toggle("Prepare file", key=f"export_prepare_{key}"):
+            with timed(file_stem, "export", format=fmt) as details:
+                data, ext, mime = export_bytes(tables() if callable(tables) else tables, fmt)
+                details["bytes"] = len(data)
+            st.download_button(
+                f"Download {ext} ({len(data) / 1024:,.1f} KB)", data, file_name=f"{file_stem}{ext}", mime=mime,
+                key=f"export_download_{key}"
+            )
+
+
+# ==== Industry benchmarks (all tabs) ====
+@st.cache_resource
+def benchmark_set():
+    """Loaded (and memory-mapped) once per process."""
+    return BenchmarkSet.load(os.environ.get("BENCHMARKS_PATH", os.path.join("data", "benchmarks.csv")))
+
+
+def benchmark_text(value, prefix="", suffix=""):
+    """A benchmark median for display, or "n/a" when the segment has none."""
+    return "n/a" if np.isnan(value) else f"{prefix}{value:g}{suffix}"
+
+
+BENCHMARK_KEYS = {"industry": "Industry", "region": "Region", "channel": "Channel", "deal_size": "Deal Size"}
+BENCHMARK_METRICS = {
+    "webinar": ["landing_cr", "attendance_rate", "lead_rate", "sales_rate", "cpc", "roas", "cost_per_lead", "profit_margin"],
+    "book_a_call": ["landing_page_rate", "show_rate", "close_rate", "cpc", "roas"],
+    "crm": ["contact_rate", "booking_rate", "show_rate", "close_rate", "roi"],
+}
+METRIC_LABELS = {
+    "roas": "ROAS (x)", "roi": "ROI (%)", "cost_per_lead": "Cost per Lead ($)", "profit_margin": "Profit Margin (%)",
+}
+
+
+def benchmark_segment(model, key):
+    """Segment pickers for the keys the benchmark data actually varies for ``model``."""
+    segment = {}
+    for name, label in BENCHMARK_KEYS.items():
+        options = benchmark_set().options(name, model)
+        if len(options) > 1:
+            segment[name] = st.selectbox(label, options, key=f"bm_{name}_{key}")
+    return segment
+
+
+def describe_segment(row):
+    keys = [row[k] for k in BENCHMARK_KEYS if row[k] != "All"]
+    return " × ".join(keys) if keys else "All segments"
+
+
+def render_benchmark_ranks(model, values, segment):
+    """Percentile of each value within its matched benchmark segment; returns the rank table for exports."""
+    ranks = benchmark_set().percentile_ranks(
+        model, {m: values[m] for m in BENCHMARK_METRICS[model] if m in values}, **segment
+    )
+    with st.expander("📏 Benchmark Percentiles"):
+        if ranks.empty:
+            st.info("No benchmark data for this forecast type yet.")
+            return ranks
+        st.dataframe(pd.DataFrame({
+            "Metric": [INPUT_LABELS.get(m) or METRIC_LABELS.get(m, m) for m in ranks.index],
+            "Yours": ranks["value"], "p25": ranks["p25"], "Median": ranks["p50"], "p75": ranks["p75"],
+            "Percentile": ranks["percentile"], "Better Than (%)": ranks["better_than"],
+            "Benchmark Segment": ranks.apply(describe_segment, axis=1),
+        }).round(2), hide_index=True, use_container_width=True)
+        if not ranks["exact"].all():
+            st.caption("Segments without data for a metric fall back to the nearest segment that has it.")
+    return ranks
+
+
+# ==== BRANDING: Logo + CSS Styling ====
 logo_path = "evenshore agency logo (2).png"
-if os.path.exists(logo_path):
-    logo = Image.open(logo_path)
-    st.image(logo, width=200)
-else:
-    st.warning("⚠️ Branding logo not found. Please upload 'evenshore_agency_logo.png' to the app directory.")
-
-st.markdown("""
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;600&display=swap');
-
-        html, body, [class*="css"] {
-            font-family: 'Inter', sans-serif;
-        }
+css_path = os.path.join("assets", "app.css")
+LOGO_WIDTH = 200
+
+
+@st.cache_resource
+def load_logo(path, width=LOGO_WIDTH):
+    # Resized and encoded once per process, so reruns send ready-made PNG bytes
+    with timed("load logo"):
+        from PIL import Image
+
+        logo = Image.open(path)
+        if logo.width > width:
+            logo = logo.resize((width, round(logo.height * width / logo.width)), Image.LANCZOS)
+        buffer = io.BytesIO()
+        logo.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+@st.cache_resource
+def load_css(path):
+    # Read and whitespace-collapsed once per process
+    with open(path, encoding="utf-8") as fh:
+        css = " ".join(fh.read().split())
+    return f"<style>{css}</style>"
+
+
+with timed("branding (logo + CSS)"):
+    if os.path.exists(logo_path):
+        st.image(load_logo(logo_path), width=LOGO_WIDTH)
+    else:
+        st.warning("⚠️ Branding logo not found. Please upload 'evenshore_agency_logo.png' to the app directory.")
+    st.markdown(load_css(css_path), unsafe_allow_html=True)
+
+
+# ==== Monte Carlo simulation mode (shared by the Webinar and Book A Call tabs) ====
+def uncertainty_inputs(key, cost_field, rates, calibrated=None):
+    """Sidebar controls for simulation mode. Returns (uncertainty spec, draws) or None when off.
+
+    Rates in ``calibrated`` (an uncertainty spec from the calibrator) use their posterior spread instead of a slider.
+    """
+    with st.expander("🎲 Uncertainty (Monte Carlo)"):
+        enabled = st.checkbox("Enable simulation mode", key=f"mc_on_{key}")
+        n_draws = st.number_input(
+            "Simulation draws", min_value=1_000, max_value=1_000_000, value=DEFAULT_DRAWS, step=10_000,
+            key=f"mc_draws_{key}"
+        )
+        cpc_sigma = st.slider("CPC volatility (σ, %)", 0, 100, 25, key=f"mc_{cost_field}_{key}")
+        uncertainty = {cost_field: ("lognormal", cpc_sigma / 100)}
+        for field, label in rates.items():
+            if calibrated and field in calibrated:
+                st.caption(f"{label} uncertainty: ± {calibrated[field][1]:.2f} pts (calibrated)")
+                uncertainty[field] = calibrated[field]
+                continue
+            sd = st.slider(f"{label} uncertainty (± pts)", 0, 25, 5, key=f"mc_{field}_{key}")
+            uncertainty[field] = ("beta", sd)
+    return (uncertainty, int(n_draws)) if enabled else None
+
+
+@st.cache_data(max_entries=32)
+def simulation_summary(model, inputs, uncertainty, n_draws):
+    outcomes = simulate(model, inputs, uncertainty, n_draws)
+    bands, prob_loss = summarize(outcomes)
+    # Bin server-side so the chart payload doesn't grow with the draw count
+    counts, edges = np.histogram(outcomes["net_profit"], bins=50)
+    hist_df = pd.DataFrame({"Net Profit ($)": (edges[:-1] + edges[1:]) / 2, "Share of Draws": counts / n_draws})
+    return bands, prob_loss, hist_df
+
+
+def render_simulation(model, inputs, uncertainty, n_draws):
+    px, _ = plotly_modules()
+    bands, prob_loss, hist_df = simulation_summary(model, inputs, uncertainty, n_draws)
+
+    st.subheader(f"🎲 Simulated Outcome Range ({n_draws:,} draws)")
+    c1, c2, c3 = st.columns(3)
+    for col, q in zip((c1, c2, c3), bands.columns):
+        col.metric(f"{q} Revenue", f"${bands.loc['revenue', q]:,.2f}")
+        col.metric(f"{q} Net Profit", f"${bands.loc['net_profit', q]:,.2f}")
+        col.metric(f"{q} ROAS", f"{bands.loc['roas', q]:.2f}x")
+    st.metric("Probability of Loss", f"{prob_loss:.1%}")
+
+    def build_histogram():
+        hist_fig = px.bar(hist_df, x="Net Profit ($)", y="Share of Draws", title="Net Profit Distribution")
+        hist_fig.add_vline(x=0, line_color="red", line_dash="dash")
+        return hist_fig
+
+    plotly_chart("simulation_histogram", build_histogram, use_container_width=True)
+
+
+# ==== Sensitivity analysis (all tabs) ====
+INPUT_LABELS = {
+    "budget": "Ad Budget ($)", "ad_spend": "Ad Spend ($)", "cpc": "CPC ($)",
+    "landing_cr": "Landing Page CR (%)", "attendance_rate": "Attendance Rate (%)", "lead_rate": "Lead Rate (%)",
+    "sales_rate": "Sales Rate (%)", "avg_deal_value": "Avg Deal Value ($)", "cogs_per_sale": "COGS per Sale ($)",
+    "landing_page_rate": "Booking Rate (%)", "total_crm_leads": "Total CRM Leads", "active_leads": "Active Leads",
+    "contact_rate": "Contact Rate (%)", "booking_rate": "Booking Rate (%)", "show_rate": "Show Rate (%)",
+    "close_rate": "Close Rate (%)", "client_value": "Client Value ($)", "monthly_tech_stack": "Tech Stack ($/mo)",
+    "team_members": "Team Members", "monthly_salary": "Salary ($/mo)", "existing_overhead": "Overhead ($/mo)",
+}
+SENSITIVITY_METRICS = {
+    "webinar": {"Net Profit ($)": "net_profit", "ROAS (x)": "roas", "Profit Margin (%)": "profit_margin"},
+    "book_a_call": {"Net Profit ($)": "net_profit", "ROI (%)": "roi", "ROAS (x)": "roas"},
+    "crm": {"Net Profit ($)": "net_profit", "ROI (%)": "roi"},
+}
+SENSITIVITY_DEFAULT_AXES = {
+    "webinar": ("landing_cr", "cpc"), "book_a_call": ("landing_page_rate", "cpc"), "crm": ("booking_rate", "close_rate"),
+}
+
+
+def render_sensitivity(model, inputs, key):
+    _, go = plotly_modules()
+    with st.expander("🔬 Sensitivity Analysis"):
+        names = sweepable_inputs(model)
+        x_default, y_default = SENSITIVITY_DEFAULT_AXES[model]
+        c1, c2, c3 = st.columns(3)
+        x_name = c1.selectbox("X axis", names, index=names.index(x_default), format_func=INPUT_LABELS.get, key=f"sens_x_{key}")
+        y_name = c2.selectbox("Y axis", names, index=names.index(y_default), format_func=INPUT_LABELS.get, key=f"sens_y_{key}")
+        metric_label = c3.selectbox("Metric", list(SENSITIVITY_METRICS[model]), key=f"sens_metric_{key}")
+        metric = SENSITIVITY_METRICS[model][metric_label]
+        c1, c2 = st.columns(2)
+        spread = c1.slider("Sweep range (± % of current value)", 5, 100, 50, key=f"sens_range_{key}") / 100
+        resolution = c2.select_slider("Grid resolution", [50, 100, 200, 400], value=200, key=f"sens_res_{key}")
+
+        if x_name == y_name:
+            st.info("Pick two different inputs to sweep.")
+        else:
+            def build_heatmap():
+                x_values = sweep_range(x_name, inputs[x_name], spread, resolution)
+                y_values = sweep_range(y_name, inputs[y_name], spread, resolution)
+                grid = sweep_2d(model, inputs, (x_name, x_values), (y_name, y_values), metric)
+                heatmap = go.Figure(go.Heatmap(
+                    x=x_values, y=y_values, z=grid, colorscale="RdYlGn", zmid=0 if metric != "roas" else 1,
+                    colorbar={"title": metric_label}
+                ))
+                heatmap.add_trace(go.Scatter(
+                    x=[inputs[x_name]], y=[inputs[y_name]], mode="markers", name="Current",
+                    marker={"symbol": "x", "size": 12, "color": "black"}
+                ))
+                heatmap.update_layout(
+                    title=f"{metric_label}: {INPUT_LABELS[x_name]} × {INPUT_LABELS[y_name]}",
+                    xaxis_title=INPUT_LABELS[x_name], yaxis_title=INPUT_LABELS[y_name]
+                )
+                return heatmap
+
+            heatmap_key = {"model": model, "inputs": inputs, "axes": [x_name, y_name], "metric": metric,
+                           "spread": spread, "resolution": resolution}
+            plotly_chart("sensitivity_heatmap", cached_figure("sensitivity_heatmap", heatmap_key, build_heatmap), use_container_width=True)
+
+            st.markdown("**Export Sweep Grid**")
+            c1, c2 = st.columns(2)
+            export_res = c1.select_slider(
+                "Export resolution", [resolution, 500, 1000, 2000], value=resolution, key=f"sens_export_res_{key}",
+                help="Grid points per axis in the exported file; a 2000 × 2000 sweep is 4 million rows."
+            )
+            c2.caption(f"{export_res ** 2:,} rows, streamed to the file a block of the grid at a time.")
+            render_export(lambda: {"Sweep": sweep_frames(
+                model, inputs, (x_name, sweep_range(x_name, inputs[x_name], spread, export_res)),
+                (y_name, sweep_range(y_name, inputs[y_name], spread, export_res)), metric
+            )}, f"sens_{key}", f"{model}_sensitivity", title=None)
+
+        swing = st.slider("Tornado swing (± % per input)", 5, 50, 20, key=f"sens_swing_{key}") / 100
+
+        def build_tornado():
+            bars = tornado(model, inputs, metric, swing).iloc[::-1]
+            labels = [INPUT_LABELS[n] for n in bars["input"]]
+            base = bars["base_metric"].iloc[0]
+            tornado_fig = go.Figure([
+                go.Bar(y=labels, x=bars["low_metric"] - base, base=base, orientation="h", name=f"-{swing:.0%}"),
+                go.Bar(y=labels, x=bars["high_metric"] - base, base=base, orientation="h", name=f"+{swing:.0%}"),
+            ])
+            tornado_fig.update_layout(
+                barmode="overlay", title=f"Tornado: {metric_label} (one input at a time)", xaxis_title=metric_label
+            )
+            return tornado_fig
+
+        tornado_key = {"model": model, "inputs": inputs, "metric": metric, "swing": swing}
+        plotly_chart("sensitivity_tornado", cached_figure("sensitivity_tornado", tornado_key, build_tornado), use_container_width=True)
+
+
+# ==== Goal seek (all tabs) ====
+GOAL_SEEK_UNKNOWNS = {
+    "webinar": ["budget", "cpc", "landing_cr", "sales_rate", "avg_deal_value"],
+    "book_a_call": ["ad_spend", "cpc", "landing_page_rate", "close_rate", "client_value"],
+}
+GOAL_SEEK_TARGETS = {"Net Profit ($)": ("net_profit", "5000, 10000, 25000"), "ROAS (x)": ("roas", "2, 3, 5")}
+
+
+def parse_targets(text):
+    try:
+        return [float(t) for t in text.replace(" ", "").split(",") if t]
+    except ValueError:
+        st.error("Targets must be numbers separated by commas.")
+        return []
+
+
+def format_required(name, value):
+    if np.isnan(value):
+        return "Not reachable"
+    if name in ("budget", "ad_spend", "cpc", "avg_deal_value", "client_value"):
+        return f"${value:,.2f}"
+    return f"{value:.2f}%"
+
+
+def render_goal_seek(model, inputs, key):
+    with st.expander("🎯 Goal Seek"):
+        c1, c2 = st.columns(2)
+        target_label = c1.selectbox("Target", list(GOAL_SEEK_TARGETS), key=f"goal_metric_{key}")
+        metric, default_targets = GOAL_SEEK_TARGETS[target_label]
+        targets = parse_targets(c2.text_input("Target values (comma-separated)", default_targets, key=f"goal_values_{key}_{metric}"))
+        if not targets:
+            return
+
+        rows = []
+        for name in GOAL_SEEK_UNKNOWNS[model]:
+            if name in ("budget", "ad_spend") and metric == "roas":
+                continue  # ROAS doesn't depend on spend when every other input is fixed
+            required = np.atleast_1d(solve_for(model, inputs, name, metric, targets))
+            row = {"Input": INPUT_LABELS[name], "Current": format_required(name, float(inputs[name]))}
+            row.update({f"{target_label.split(' (')[0]} = {t:,g}": format_required(name, v) for t, v in zip(targets, required)})
+            rows.append(row)
+        st.caption("Each row solves for one input with all other inputs held at their current values.")
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
+
+def render_crm_goal_seek(inputs, sim_inputs=None, reinvest_mode=None, horizon=12, key="crm"):
+    """Monthly view solves the plain ROI; the yearly view solves the simulated cumulative ROI."""
+    with st.expander("🎯 Goal Seek"):
+        simulated = sim_inputs is not None
+        label = f"Cumulative ROI ({horizon} mo) targets (%)" if simulated else "ROI targets (%)"
+        targets = parse_targets(st.text_input(label, "100, 250, 500", key=f"goal_values_{key}_{simulated}"))
+        if not targets:
+            return
+        if simulated:
+            needed = np.atleast_1d(leads_for_cumulative_roi(sim_inputs, targets, reinvest_mode, horizon))
+        else:
+            needed = np.atleast_1d(leads_for_roi(inputs, targets))
+        current = inputs["total_crm_leads"] - inputs["active_leads"]
+        st.dataframe(pd.DataFrame({
+            "Target ROI (%)": targets,
+            "Leads to Re-engage": ["Not reachable" if np.isnan(n) else f"{np.ceil(n):,.0f}" for n in needed],
+            "Change vs Current": ["—" if np.isnan(n) else f"{np.ceil(n) - current:+,.0f}" for n in needed],
+        }), hide_index=True, use_container_width=True)
+        st.caption(f"Currently re-engaging {current:,} leads; all other inputs held at their current values.")
+
+
+# ==== Multi-channel budget allocation (shared by the Webinar and Book A Call tabs) ====
+CHANNEL_COLUMNS = {
+    "name": "Channel", "base_cpc": "Base CPC ($)", "elasticity": "CPC Elasticity",
+    "saturation_spend": "Saturation Spend ($)", "conversion": "Click → Sale (%)",
+}
+# Starting mix relative to the tab's own CPC, conversion and budget
+CHANNEL_PRESETS = [
+    ("Meta", 1.0, 0.5, 1.0, 1.0),
+    ("Google Search", 1.6, 0.3, 0.5, 1.5),
+    ("LinkedIn", 3.0, 0.4, 0.3, 2.0),
+    ("YouTube", 0.6, 0.6, 0.5, 0.5),
+]
+CONSTRAINT_NOTES = {
+    "profit": "Spend stops where the next dollar no longer pays for itself.",
+    "budget": "The whole budget is spent.",
+    "roas_floor": "Spend stops where blended ROAS would fall below the floor.",
+    "infeasible": "No allocation reaches the ROAS floor; even the best channel's first dollar falls short.",
+}
+
+
+def render_budget_allocator(key, budget, cpc, conversion, deal_value, cogs_per_sale=0.0):
+    """Split a budget across channels whose CPC rises with spend.
+
+    ``conversion`` is the tab's click-to-sale rate (%), used with ``cpc`` and ``budget`` to seed the channel table.
+    """
+    with st.expander("📊 Multi-Channel Budget Allocation"):
+        channels = pd.DataFrame([
+            {"name": name, "base_cpc": round(cpc * c, 2), "elasticity": e,
+             "saturation_spend": round(max(budget, 100) * k, -1), "conversion": round(conversion * v, 3)}
+            for name, c, e, k, v in CHANNEL_PRESETS
+        ]).rename(columns=CHANNEL_COLUMNS)
+        edited = st.data_editor(
+            channels, num_rows="dynamic", hide_index=True, use_container_width=True, key=f"alloc_channels_{key}",
+            column_config={
+                CHANNEL_COLUMNS["elasticity"]: st.column_config.NumberColumn(
+                    min_value=0.01, max_value=1.0, step=0.05,
+                    help="How fast CPC rises with spend: at the saturation spend, CPC is 2^elasticity times the base CPC."
+                ),
+                CHANNEL_COLUMNS["base_cpc"]: st.column_config.NumberColumn(min_value=0.01),
+                CHANNEL_COLUMNS["saturation_spend"]: st.column_config.NumberColumn(min_value=1.0),
+                CHANNEL_COLUMNS["conversion"]: st.column_config.NumberColumn(min_value=0.0, max_value=100.0),
+            }
+        ).rename(columns={v: k for k, v in CHANNEL_COLUMNS.items()}).dropna()
 
-        .block-container {
-            padding-top: 2rem;
-            padding-bottom: 2rem;
-            padding-left: 2rem;
-            padding-right: 2rem;
-            max-width: 1500px;
-            margin: auto;
-        }
+        c1, c2, c3 = st.columns(3)
+        total_budget = c1.number_input("Total Budget ($)", min_value=0.0, value=float(budget), key=f"alloc_budget_{key}")
+        objective = c2.radio(
+            "Objective", ["Max Net Profit", "Spend Full Budget"], key=f"alloc_objective_{key}",
+            help="Max Net Profit may leave budget unspent when the next dollar would lose money."
+        )
+        roas_floor = c3.number_input("ROAS Floor (0 = none)", min_value=0.0, value=0.0, step=0.5, key=f"alloc_floor_{key}")
+        try:
+            result = allocate(
+                edited, total_budget, deal_value, cogs_per_sale,
+                "net_profit" if objective == "Max Net Profit" else "revenue", roas_floor or None
+            )
+        except ValueError as e:
+            st.error(str(e))
+            return
+
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Allocated", f"${result['spend']:,.2f}", delta=f"${result['unspent']:,.2f} unspent", delta_color="off")
+        c2.metric("Revenue", f"${result['revenue']:,.2f}")
+        c3.metric("Net Profit", f"${result['net_profit']:,.2f}")
+        c4.metric("Blended ROAS", f"{result['roas']:.2f}x")
+        note = CONSTRAINT_NOTES[result["constraint"]]
+        if result["constraint"] == "budget" and result["unspent"] > 1e-3 * total_budget:
+            note = (
+                f"${result['unspent']:,.2f} of the budget is left unspent: "
+                "past that point the channels return next to nothing per extra dollar."
+            )
+        if result["constraint"] == "infeasible":
+            st.warning(note)
+        else:
+            st.caption(f"{note} Every funded channel ends at a marginal ROAS of {result['threshold']:.2f}x.")
+
+        st.dataframe(
+            result["channels"][["name", "spend", "share", "cpc", "clicks", "sales", "revenue", "roas", "marginal_roas"]]
+            .rename(columns={
+                "name": "Channel", "spend": "Spend ($)", "share": "Share (%)", "cpc": "CPC at Spend ($)",
+                "clicks": "Clicks", "sales": "Sales", "revenue": "Revenue ($)", "roas": "ROAS", "marginal_roas": "Marginal ROAS",
+            }).round(2),
+            hide_index=True, use_container_width=True
+        )
 
-        .stButton>button {
-            background: linear-gradient(90deg, #FDBB2D, #F25C26);
-            border: none;
-            color: white;
-            border-radius: 8px;
-            padding: 0.5rem 1rem;
-            font-weight: 600;
-        }
+        px, _ = plotly_modules()
+        curves = marginal_curves(edited, deal_value, max(total_budget, result["spend"], 1.0))
 
-        .stDownloadButton>button {
-            background: #F25C26;
-            border: none;
-            color: white;
-            border-radius: 6px;
-        }
+        def build_curves():
+            fig = px.line(
+                curves, x="spend", y="marginal_roas", color="name",
+                labels={"spend": "Channel Spend ($)", "marginal_roas": "Marginal ROAS (revenue per extra $)", "name": "Channel"},
+                title="Marginal Return per Channel"
+            )
+            if np.isfinite(result["threshold"]):
+                fig.add_hline(y=result["threshold"], line_dash="dash", annotation_text="Allocation threshold")
+            return fig
 
-        .stMetric {
-            background: #fff3e6;
-            border-radius: 12px;
-            padding: 0.75rem;
-        }
+        plotly_chart("allocation_marginal_returns", build_curves, use_container_width=True)
 
-        h1, h2, h3 {
-            color: #F25C26;
-        }
 
-        .stTabs [role="tablist"] > div[aria-selected="true"] {
-            border-bottom: 3px solid #F25C26;
-            color: #F25C26;
-        }
-    </style>
-""", unsafe_allow_html=True)
+# ==== Attribution lag: revenue and cash by spend cohort (shared by the Webinar and Book A Call tabs) ====
+LAG_LABELS = {"Exponential": "exponential", "Gamma (delayed peak)": "gamma", "Uniform": "uniform", "Immediate": "immediate"}
 
 
+def render_attribution_timeline(key, spend, sales_per_dollar, deal_value, cogs_per_sale=0.0, per_month=True):
+    """Spread each period's sales over a lag distribution and show revenue, cash flow and payback.
+
+    ``spend`` is per month, or with ``per_month=False`` a campaign total spread evenly over the months of spend.
+    """
+    with st.expander("⏳ Attribution Lag & Cash Flow"):
+        c1, c2, c3 = st.columns(3)
+        granularity = c1.radio("Granularity", ["Daily", "Weekly"], key=f"lag_period_{key}")
+        months = c2.number_input("Months of Spend", min_value=1, max_value=60, value=6, key=f"lag_months_{key}")
+        if per_month:
+            spend_per_month = c3.number_input(
+                "Spend per Month ($)", min_value=0.0, value=float(spend), key=f"lag_spend_{key}"
+            )
+        else:
+            spend_per_month = c3.number_input(
+                "Total Spend ($)", min_value=0.0, value=float(spend), key=f"lag_total_{key}",
+                help="Spread evenly over the months of spend."
+            ) / months
+        c1, c2, c3 = st.columns(3)
+        lag_kind = LAG_LABELS[c1.selectbox("Lag Distribution", list(LAG_LABELS), key=f"lag_kind_{key}")]
+        mean_days = c2.number_input("Average Lag (days)", min_value=0.0, value=21.0, step=1.0, key=f"lag_mean_{key}")
+        collection_days = c3.number_input(
+            "Payment Collected After (days)", min_value=0, value=0, step=7, key=f"lag_collect_{key}"
+        )
+        shape = st.slider("Gamma Shape", 1.0, 10.0, 2.0, 0.5, key=f"lag_shape_{key}") if lag_kind == "gamma" else 2.0
+
+        period = granularity.lower()
+        step = 1 if period == "daily" else 7
+        periods = round(months * 365 / 12 / step)
+        spend = np.full(periods, spend_per_month * 12 / 365 * step)
+        lag = lag_distribution(lag_kind, mean_days, shape, period)
+        timeline = timeline_frame(cohort_timeline(
+            spend, sales_per_dollar, deal_value, lag, cogs_per_sale, round(collection_days / step)
+        ), period, pd.Timestamp.today().normalize())
+        payback = payback_period(timeline["cumulative_cash"].to_numpy())
+
+        unit = "days" if period == "daily" else "weeks"
+        in_window = timeline["period"] < periods
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Payback Period", "Not reached" if np.isnan(payback) else f"{payback:.0f} {unit}")
+        c2.metric(
+            "Revenue Booked During Spend", f"${timeline.loc[in_window, 'revenue'].sum():,.2f}",
+            delta=f"${timeline.loc[~in_window, 'revenue'].sum():,.2f} arrives after spend ends", delta_color="off"
+        )
+        # + 0.0 turns a rounded -0.0 into 0.0
+        c3.metric("Ending Cash Position", f"${round(timeline['cumulative_cash'].iloc[-1], 2) + 0.0:,.2f}")
+        st.caption(
+            f"{len(lag)} {unit} lag window. Revenue and COGS are booked when each sale lands; "
+            "the same-month view above books everything in the month of spend."
+        )
+
+        _, go = plotly_modules()
+
+        def build_timeline():
+            fig = go.Figure([
+                go.Bar(x=timeline["date"], y=timeline["spend"], name="Spend", marker_color="lightgray"),
+                go.Bar(x=timeline["date"], y=timeline["revenue"], name="Revenue", marker_color="royalblue"),
+                go.Scatter(x=timeline["date"], y=timeline["cumulative_cash"], name="Cumulative Cash", yaxis="y2"),
+            ])
+            fig.update_layout(
+                barmode="overlay", title=f"{granularity} Revenue and Cash Flow",
+                yaxis={"title": "$ per period"}, yaxis2={"title": "Cumulative cash ($)", "overlaying": "y", "side": "right"},
+                legend={"orientation": "h"}
+            )
+            return fig
+
+        plotly_chart("attribution_timeline", build_timeline, use_container_width=True)
+
+
+# ==== CSV upload: parsed once per file content, not on every slider move ====
+@st.cache_data(show_spinner="Parsing campaign export...", max_entries=8)
+def load_campaign_upload(digest, _uploaded_file):
+    return read_campaign_csv(_uploaded_file)
+
+
+def upload_digest(uploaded_file):
+    # Hash each upload once per session; the digest is the cache key for the parsed result
+    digest_key = f"upload_digest_{uploaded_file.file_id}"
+    if digest_key not in st.session_state:
+        st.session_state[digest_key] = file_digest(uploaded_file)
+    return st.session_state[digest_key]
+
+
+def uploaded_campaign(uploaded_file):
+    try:
+        return load_campaign_upload(upload_digest(uploaded_file), uploaded_file)
+    except ValueError as e:
+        st.error(f"Couldn't read this export: {e}")
+        return None
+
+
+@st.cache_data(show_spinner="Reading CRM export...", max_entries=4)
+def load_crm_upload(digest, _uploaded_file, as_of, active_days):
+    return read_crm_leads(_uploaded_file, as_of=as_of, active_days=active_days)
+
+
+def uploaded_crm_leads(uploaded_file, as_of, active_days):
+    try:
+        return load_crm_upload(upload_digest(uploaded_file), uploaded_file, as_of, active_days)
+    except ValueError as e:
+        st.error(f"Couldn't read this CRM export: {e}")
+        return None
+
+
+# ==== Rate calibration from observed results (shares the scenario database) ====
+@st.cache_resource
+def calibrator():
+    return Calibrator(os.environ.get("SCENARIO_DB", "scenarios.db"))
+
+
+def render_calibration(model, prior, key):
+    """Sidebar controls for calibrated rates.
+
+    ``prior`` holds the current rate assumptions (%), used as the prior mean. Returns
+    ``(rates, uncertainty)`` when calibrated rates are switched on, otherwise None.
+    """
+    with st.expander("📐 Calibrate from Campaign Results"):
+        c1, c2 = st.columns(2)
+        client = c1.text_input("Client", key=f"calib_client_{key}").strip()
+        segment = c2.text_input("Segment", key=f"calib_segment_{key}", help="e.g. channel or audience").strip()
+        results_file = st.file_uploader(
+            "Daily stage counts (CSV)", type="csv", key=f"calib_file_{key}",
+            help="One row per day with stage counts (and optionally a date column); days already added are skipped, and a file without dates is only added once."
+        )
+        if results_file is not None and st.button("Add to calibration", key=f"calib_add_{key}"):
+            try:
+                added = calibrator().update(
+                    pd.read_csv(results_file), model, client, segment, digest=upload_digest(results_file)
+                )
+                st.success(f"Added {added:,} new rows.")
+            except ValueError as e:
+                st.error(str(e))
+
+        posterior = calibrator().posterior(model, client, segment, prior)
+        if not posterior["trials"].any():
+            st.caption("No results recorded for this client and segment yet.")
+            return None
+        st.dataframe(
+            posterior[["trials", "prior", "mean", "lower", "upper"]].rename(columns={
+                "trials": "Trials", "prior": "Prior %", "mean": "Calibrated %", "lower": "90% low", "upper": "90% high"
+            }).round(2),
+            use_container_width=True
+        )
+        if not st.checkbox("Use calibrated rates", key=f"calib_on_{key}"):
+            return None
+    rates = posterior["mean"].to_dict()
+    uncertainty = {rate: ("beta", float(sd)) for rate, sd in posterior["sd"].items()}
+    return rates, uncertainty
+
 
-# Inject layout styling for full-width and padding
-st.markdown("""
-    <style>
-        .block-container {
-            padding-top: 2rem;
-            padding-bottom: 2rem;
-            padding-left: 2rem;
-            padding-right: 2rem;
-            max-width: 1500px;
-            margin: auto;
-        }
-        .element-container:has(.stRadio) {
-            margin-bottom: 0.5rem !important;
-        }
-        .stRadio > div {
-            flex-direction: row;
-        }
-        .stMetric {
-            margin-bottom: 1rem !important;
-        }
-    </style>
-""", unsafe_allow_html=True)
 st.markdown("# Campaign Planning Suite")
 st.markdown("Use this tool to forecast webinar campaign outcomes and profitability based on ad spend, conversion rates, and product details.")
 
-# Tabs
-backend_tab, forecast_tab, book_a_call_tab = st.tabs(["CRM ROI Forecast", "Webinar Forecast", "Book A Call Forecast"])
+# Each tab is a fragment: a widget change reruns only that tab, not the whole script.
 
 # --------------------------
 # TAB 1: Backend System ROI Forecast
 # --------------------------
-with backend_tab:
+@st.fragment
+@profiled_tab("CRM ROI Forecast")
+def render_crm_roi_tab():
+    px, _ = plotly_modules()
     sidebar, main = st.columns([1, 3])
 
     with sidebar:
@@ -113,19 +789,54 @@ with backend_tab:
         if time_view == "Yearly":
             st.markdown("### Reinvestment Style")
             reinvest_mode = st.radio("Compounding Mode", ["Light", "Moderate", "Aggressive"])
+            horizon = st.slider("Simulation Horizon (months)", 12, 60, 12, step=6)
 
         # CRM Lead Inputs
         st.markdown("### Backend Funnel Assumptions")
-        total_crm_leads = st.number_input("Total Leads in CRM", value=2000, step=1)
-        active_leads = st.number_input("Currently Engaged or Booked Leads", value=500, step=1)
+        lead_upload = None
+        with st.expander("📂 Lead-Level CRM Export"):
+            leads_file = st.file_uploader(
+                "CRM export (CSV)", type="csv", key="crm_leads_file",
+                help="One row per lead with a stage / status column; lead source, created date (or age in days) "
+                     "and last activity date are used when present."
+            )
+            c1, c2 = st.columns(2)
+            as_of = c1.date_input("As of", key="crm_leads_as_of")
+            active_days = c2.number_input("Active if touched within (days)", min_value=0, value=30, key="crm_active_days")
+            if leads_file is not None:
+                lead_upload = uploaded_crm_leads(leads_file, as_of, int(active_days))
+        segments = segment_funnel(lead_upload["segments"]) if lead_upload else None
+
+        if segments is not None:
+            measured = segment_inputs(segments)
+            total_crm_leads, active_leads = measured["total_crm_leads"], measured["active_leads"]
+            st.caption(f"Measured from {lead_upload['rows']:,} leads in {len(segments)} segments.")
+            st.markdown(f"**Total Leads in CRM:** {total_crm_leads:,}")
+            st.markdown(f"**Active or Closed Leads:** {active_leads:,}")
+        else:
+            total_crm_leads = st.number_input("Total Leads in CRM", value=2000, step=1)
+            active_leads = st.number_input("Currently Engaged or Booked Leads", value=500, step=1)
         leads_to_reengage = total_crm_leads - active_leads
 
         # Funnel Rates
         st.markdown("### Funnel Conversion Rates")
-        contact_rate = st.slider("Contact Rate (%)", 0, 100, 70)
-        booking_rate = st.slider("Booking Rate (%)", 0, 100, 30)
-        show_rate = st.slider("Show Rate (%)", 0, 100, 75)
-        close_rate = st.slider("Close Rate (%)", 0, 100, 20)
+        if segments is not None:
+            # Pool-weighted across segments, so the totals match the per-segment forecast (only the display is rounded)
+            contact_rate, booking_rate, show_rate, close_rate = (
+                measured[k] for k in ("contact_rate", "booking_rate", "show_rate", "close_rate")
+            )
+            st.markdown(f"**Contact Rate:** {contact_rate:.2f}%")
+            st.markdown(f"**Booking Rate:** {booking_rate:.2f}%")
+            st.markdown(f"**Show Rate:** {show_rate:.2f}%")
+            st.markdown(f"**Close Rate:** {close_rate:.2f}%")
+        else:
+            contact_rate = st.slider("Contact Rate (%)", 0, 100, 70)
+            booking_rate = st.slider("Booking Rate (%)", 0, 100, 30)
+            show_rate = st.slider("Show Rate (%)", 0, 100, 75)
+            close_rate = st.slider("Close Rate (%)", 0, 100, 20)
+
+        with st.expander("🏷 Benchmark Segment"):
+            segment = benchmark_segment("crm", "crm")
 
         # Financial Assumptions
         st.markdown("### Revenue & Operational Costs")
@@ -137,21 +848,45 @@ with backend_tab:
         use_overhead = st.checkbox("Include Existing Overhead?")
         existing_overhead = st.number_input("Monthly Overhead ($)", value=2000) if use_overhead else 0
 
+        if time_view == "Yearly":
+            with st.expander("Reinvestment Assumptions"):
+                reinvestment = {
+                    "leads_per_member": st.number_input(
+                        "Leads Worked per Member per Month", min_value=1,
+                        value=REINVESTMENT_DEFAULTS["leads_per_member"], step=50
+                    ),
+                    "new_leads_per_month": st.number_input(
+                        "New Leads Entering CRM per Month", min_value=0,
+                        value=REINVESTMENT_DEFAULTS["new_leads_per_month"], step=10
+                    ),
+                    "cost_per_new_lead": st.number_input(
+                        "Cost per Purchased Lead ($)", min_value=0.0, value=REINVESTMENT_DEFAULTS["cost_per_new_lead"]
+                    ),
+                    "reinvest_to_leads": st.slider(
+                        "Reinvestment into Leads vs Staff (%)", 0, 100, REINVESTMENT_DEFAULTS["reinvest_to_leads"],
+                        help="Share of reinvested profit spent buying leads; the rest adds team capacity."
+                    ),
+                    "starting_cash": st.number_input("Starting Cash ($)", value=REINVESTMENT_DEFAULTS["starting_cash"]),
+                }
+
     with main:
-        # Funnel Math
-        contacted = leads_to_reengage * (contact_rate / 100)
-        booked = contacted * (booking_rate / 100)
-        showed = booked * (show_rate / 100)
-        closed = showed * (close_rate / 100)
-
-        # Financial Math
-        revenue = closed * client_value * multiplier
-        tech_cost = monthly_tech_stack * multiplier
-        salary_cost = team_members * monthly_salary * multiplier
-        overhead_cost = existing_overhead * multiplier
-        total_cost = tech_cost + salary_cost + overhead_cost
-        net_profit = revenue - total_cost
-        roi = (net_profit / total_cost * 100) if total_cost else 0
+        # Funnel & Financial Math
+        inputs = {
+            "total_crm_leads": total_crm_leads, "active_leads": active_leads, "contact_rate": contact_rate,
+            "booking_rate": booking_rate, "show_rate": show_rate, "close_rate": close_rate,
+            "client_value": client_value, "monthly_tech_stack": monthly_tech_stack, "team_members": team_members,
+            "monthly_salary": monthly_salary, "existing_overhead": existing_overhead, "months": multiplier
+        }
+        crm = cached_forecast("crm", crm_forecast, inputs)
+        if time_view == "Yearly":
+            # The yearly top line is the first 12 simulated months of the chosen mode, not 12 × one month
+            sim_inputs = {**inputs, **reinvestment}
+            timeline = reinvestment_frame(simulate_reinvestment(sim_inputs, horizon))
+            crm = {**crm, **reinvestment_totals(timeline, inputs, reinvest_mode)}
+        figure_inputs = {**sim_inputs, "mode": reinvest_mode} if time_view == "Yearly" else inputs
+        contacted, booked, showed, closed = crm["contacted"], crm["booked"], crm["showed"], crm["closed"]
+        revenue, total_cost, net_profit, roi = crm["revenue"], crm["total_cost"], crm["net_profit"], crm["roi"]
+        tech_cost, salary_cost, overhead_cost = crm["tech_cost"], crm["salary_cost"], crm["overhead_cost"]
 
         # Funnel Summary
         st.subheader(f"\U0001F4CA Re-engagement Funnel Results ({time_view} View)")
@@ -170,12 +905,31 @@ with backend_tab:
         c3.metric("Net Profit", f"${net_profit:,.2f}")
         st.metric("ROI", f"{roi:.2f}%")
 
+        if segments is not None:
+            st.subheader("🧩 Per-Segment Funnel (Source × Lead Age)")
+            segment_df = segments.reset_index()
+            segment_df["forecast_revenue"] = segment_df["forecast_closed"] * client_value * multiplier
+            segment_df = segment_df.astype({"leads": int, "pool": int})
+            st.dataframe(
+                segment_df[[
+                    "source", "age_bucket", "leads", "pool", "contact_rate", "booking_rate", "show_rate", "close_rate",
+                    "forecast_closed", "forecast_revenue",
+                ]].rename(columns={
+                    "source": "Source", "age_bucket": "Lead Age", "leads": "Leads", "pool": "Re-engagement Pool",
+                    "contact_rate": "Contact %", "booking_rate": "Booking %", "show_rate": "Show %",
+                    "close_rate": "Close %", "forecast_closed": "Closed", "forecast_revenue": "Revenue ($)",
+                }).round(2),
+                use_container_width=True, hide_index=True
+            )
+            plotly_chart("crm_segments", lambda: px.bar(
+                segment_df, x="source", y="forecast_revenue", color="age_bucket",
+                labels={"source": "Source", "forecast_revenue": "Forecast Revenue ($)", "age_bucket": "Lead Age"}
+            ), use_container_width=True)
+
         # Monthly ROI Tiers
         if time_view == "Monthly":
-            base_monthly_roi = (net_profit / total_cost) if total_cost else 0
-            light_roi = base_monthly_roi * 0.25 * 100
-            moderate_roi = base_monthly_roi * 0.5 * 100
-            aggressive_roi = base_monthly_roi * 100
+            tiers = roi_tiers(crm["monthly_roi"])
+            light_roi, moderate_roi, aggressive_roi = tiers["light_roi"], tiers["moderate_roi"], tiers["aggressive_roi"]
 
             st.subheader("📊 Monthly ROI Range (Realization Levels)")
             c1, c2, c3 = st.columns(3)
@@ -187,10 +941,10 @@ with backend_tab:
                 st.markdown(f"""
                 ### 📈 Funnel Logic Based on Your Inputs
                 With your current funnel settings:
-                - **Contact Rate:** {contact_rate}%  
-                - **Booking Rate:** {booking_rate}%  
-                - **Show Rate:** {show_rate}%  
-                - **Close Rate:** {close_rate}%  
+                - **Contact Rate:** {contact_rate:g}%  
+                - **Booking Rate:** {booking_rate:g}%  
+                - **Show Rate:** {show_rate:g}%  
+                - **Close Rate:** {close_rate:g}%  
 
                 Out of **{leads_to_reengage:,} leads**, you're projected to contact **{int(contacted):,}**, book **{int(booked):,}**,  
                 have **{int(showed):,}** show up, and close **{int(closed):,}** — leading to **${revenue:,.2f}** in revenue and a base ROI of **{roi:.2f}%**.
@@ -213,54 +967,69 @@ with backend_tab:
                 - **Aggressive**: White-glove experience, high-quality bookings, trained closers  
                 """)
 
-        # Yearly Compounded ROI
+        # Yearly: month-by-month reinvestment simulation
         if time_view == "Yearly":
-            base_monthly_roi = (net_profit / total_cost / 12) if total_cost else 0
-            if reinvest_mode == "Light":
-                r = base_monthly_roi * 0.25
-            elif reinvest_mode == "Moderate":
-                r = base_monthly_roi * 0.5
-            else:
-                r = base_monthly_roi
-
-            compound_roi = ((1 + r) ** 12 - 1) * 100 if r > -1 else 0
+            final = timeline[timeline["month"] == horizon].set_index("mode")
+            compound_roi = final.loc[reinvest_mode, "cumulative_roi"]
 
-            st.metric("Compounded ROI (12 mo)", f"{compound_roi:.2f}%")
-            st.markdown("ℹ️ **What this means:** This assumes you reinvest part or all of your monthly profit every month for 12 months.")
-            st.markdown("""
-            **Formula:**  
-            Compounded ROI = ((1 + monthly ROI) ^ 12 - 1) × 100  
-            
-            **Example:**  
-            If monthly ROI = 25%  
-            Compounded ROI = ((1 + 0.25) ^ 12 - 1) × 100 = ~1188%
-            """)
+            st.subheader(f"🔁 Reinvestment Simulation ({horizon} Months)")
+            c1, c2, c3 = st.columns(3)
+            c1.metric(f"Cumulative ROI ({reinvest_mode})", f"{compound_roi:.2f}%")
+            c2.metric("Ending Cash Balance", f"${final.loc[reinvest_mode, 'cash']:,.2f}")
+            c3.metric("Ending Team Size", f"{final.loc[reinvest_mode, 'team_members']:.1f}")
+            st.markdown(
+                "ℹ️ **What this means:** Each month the team works the leads its capacity allows, worked leads leave "
+                "the re-engagement pool, and part of the month's profit (by mode) buys new leads or adds staff "
+                "for the next month. Cash carries forward month to month."
+            )
+
+            series = {
+                "Cash Balance ($)": "cash", "Net Profit ($)": "net_profit", "Revenue ($)": "revenue",
+                "Lead Pool": "pool", "Team Members": "team_members", "Cumulative ROI (%)": "cumulative_roi",
+            }
+            series_label = st.selectbox("Timeline", list(series))
+            plotly_chart("crm_timeline", cached_figure(
+                "crm_timeline", {"inputs": sim_inputs, "horizon": horizon, "series": series_label},
+                lambda: px.line(
+                    timeline, x="month", y=series[series_label], color="mode", markers=True,
+                    labels={"month": "Month", series[series_label]: series_label, "mode": "Reinvestment Mode"}
+                )
+            ), use_container_width=True)
 
         # Funnel Chart
         st.markdown("### Funnel Drop-Off Chart")
-        funnel_df = pd.DataFrame({
-            "Stage": ["Re-engagement Pool", "Contacted", "Booked", "Showed", "Closed"],
-            "Volume": [leads_to_reengage, contacted, booked, showed, closed]
-        })
-        funnel_fig = px.bar(funnel_df, x="Stage", y="Volume", text_auto=True)
-        st.plotly_chart(funnel_fig, use_container_width=True)
+
+        def build_funnel():
+            funnel_df = pd.DataFrame({
+                "Stage": ["Re-engagement Pool", "Contacted", "Booked", "Showed", "Closed"],
+                "Volume": [leads_to_reengage, contacted, booked, showed, closed]
+            })
+            return px.bar(funnel_df, x="Stage", y="Volume", text_auto=True)
+
+        plotly_chart("crm_funnel", cached_figure("crm_funnel", figure_inputs, build_funnel), use_container_width=True)
 
         # Revenue Breakdown Chart
         st.markdown("### Revenue Breakdown: Cost vs Net Profit")
-        breakdown_df = pd.DataFrame({
-            "Component": ["Tech Stack", "Salaries", "Overhead", "Net Profit"],
-            "Value": [tech_cost, salary_cost, overhead_cost, net_profit]
-        })
-        stacked_fig = px.bar(
-            breakdown_df,
-            x=["Revenue"] * 4,
-            y="Value",
-            color="Component",
-            text="Value",
-            title="Revenue Allocation"
-        )
-        stacked_fig.update_layout(barmode="stack", xaxis_title=None, yaxis_title="$ Amount")
-        st.plotly_chart(stacked_fig, use_container_width=True)
+
+        def build_breakdown():
+            breakdown_df = pd.DataFrame({
+                "Component": ["Tech Stack", "Salaries", "Overhead", "Lead Purchases", "Net Profit"],
+                "Value": [tech_cost, salary_cost, overhead_cost, crm.get("lead_cost", 0.0), net_profit]
+            })
+            # Lead purchases only happen in the yearly reinvestment simulation
+            breakdown_df = breakdown_df[(breakdown_df["Component"] != "Lead Purchases") | (breakdown_df["Value"] > 0)]
+            stacked_fig = px.bar(
+                breakdown_df,
+                x=["Revenue"] * len(breakdown_df),
+                y="Value",
+                color="Component",
+                text="Value",
+                title="Revenue Allocation"
+            )
+            stacked_fig.update_layout(barmode="stack", xaxis_title=None, yaxis_title="$ Amount")
+            return stacked_fig
+
+        plotly_chart("crm_breakdown", cached_figure("crm_breakdown", figure_inputs, build_breakdown), use_container_width=True)
 
         # Strategy Summary
         if st.checkbox("Show Strategy Summary"):
@@ -270,74 +1039,116 @@ with backend_tab:
                 Through the backend funnel:
                 - **{int(contacted):,}** contacted → **{int(booked):,}** booked → **{int(showed):,}** showed → **{int(closed):,}** clients closed
                 - Revenue: **${revenue:,.2f}**, Cost: **${total_cost:,.2f}**, Net Profit: **${net_profit:,.2f}**, ROI: **{roi:.2f}%**
-                {"- Compounded ROI (12 mo): **{:.2f}%**".format(compound_roi) if time_view == "Yearly" else ""}
+                {"- Cumulative ROI ({} mo, {}): **{:.2f}%**".format(horizon, reinvest_mode, compound_roi) if time_view == "Yearly" else ""}
             """)
+
+        ranks = render_benchmark_ranks("crm", {**inputs, **crm}, segment)
+        render_save_scenario("crm", inputs, crm, "crm")
+        render_export(lambda: {
+            **scenario_tables(inputs, crm, ranks["p50"].to_dict()),
+            "Benchmark Percentiles": ranks.reset_index(),
+            **({"Segments": segment_df} if segments is not None else {}),
+            **({"Reinvestment Timeline": timeline} if time_view == "Yearly" else {}),
+        }, "crm", "crm_forecast")
+        if time_view == "Yearly":
+            render_crm_goal_seek(inputs, sim_inputs, reinvest_mode, horizon)
+        else:
+            render_crm_goal_seek(inputs)
+        render_sensitivity("crm", inputs, "crm")
 # --------------------------
 # TAB 2: Webinar Forecast (Your Full Original Code)
 # --------------------------
-with forecast_tab:
+@st.fragment
+@profiled_tab("Webinar Forecast")
+def render_webinar_tab():
+    px, go = plotly_modules()
     sidebar, main = st.columns([1, 3])
 
     with sidebar:
         st.markdown("### Configure Your Campaign")
         mode = st.radio("Input Method", ["Manual Input", "Upload CSV Data"])
 
-        benchmarks = {
-            "landing_cr": 25, "attendance_rate": 40, "lead_rate": 25,
-            "sales_rate": 15, "roas": 3.0, "cpl": 30, "profit_margin": 25
-        }
-        industry_benchmarks = {
-            "SaaS": {"landing_cr": 25, "attendance_rate": 50, "lead_rate": 30, "sales_rate": 15, "cpc": 3.5},
-            "Education": {"landing_cr": 20, "attendance_rate": 40, "lead_rate": 25, "sales_rate": 8, "cpc": 2.75},
-            "Healthcare": {"landing_cr": 15, "attendance_rate": 35, "lead_rate": 20, "sales_rate": 10, "cpc": 4.25},
-            "Consulting": {"landing_cr": 30, "attendance_rate": 60, "lead_rate": 35, "sales_rate": 25, "cpc": 3.0}
-        }
+        upload = None
+        if mode == "Upload CSV Data":
+            uploaded_file = st.file_uploader(
+                "Campaign export (CSV)", type="csv",
+                help="Per-ad or per-day rows with spend, clicks, signups, attendees and sales columns "
+                     "(leads, revenue and date are optional)."
+            )
+            if uploaded_file is not None:
+                upload = uploaded_campaign(uploaded_file)
+        historical = campaign_inputs(upload["totals"]) if upload else None
 
         with st.expander("Look up Industry Benchmarks"):
-            selected_industry = st.selectbox("Select your industry:", list(industry_benchmarks.keys()))
-            if selected_industry:
-                bm = industry_benchmarks[selected_industry]
-                st.markdown(f"**Landing Page CR:** {bm['landing_cr']}%")
-                st.markdown(f"**Attendance Rate:** {bm['attendance_rate']}%")
-                st.markdown(f"**Lead Rate:** {bm['lead_rate']}%")
-                st.markdown(f"**Sales Rate:** {bm['sales_rate']}%")
-                st.markdown(f"**Avg CPC:** ${bm['cpc']}")
-                if st.button("Use these benchmarks"):
-                    st.session_state.use_benchmarks = True
-                    st.session_state.benchmark_values = bm
+            segment = benchmark_segment("webinar", "webinar")
+            # Medians of the matched segment; the comparisons below use the same segment
+            benchmarks = {m: np.nan for m in BENCHMARK_METRICS["webinar"]} | benchmark_set().medians("webinar", **segment)
+            st.markdown(f"**Landing Page CR:** {benchmark_text(benchmarks['landing_cr'], suffix='%')}")
+            st.markdown(f"**Attendance Rate:** {benchmark_text(benchmarks['attendance_rate'], suffix='%')}")
+            st.markdown(f"**Lead Rate:** {benchmark_text(benchmarks['lead_rate'], suffix='%')}")
+            st.markdown(f"**Sales Rate:** {benchmark_text(benchmarks['sales_rate'], suffix='%')}")
+            st.markdown(f"**Avg CPC:** {benchmark_text(benchmarks['cpc'], prefix='$')}")
+            if st.button("Use these benchmarks"):
+                st.session_state.use_benchmarks = True
+                st.session_state.benchmark_values = {k: v for k, v in benchmarks.items() if not np.isnan(v)}
 
         use_benchmarks = st.session_state.get("use_benchmarks", False)
-        bm_values = st.session_state.get("benchmark_values", benchmarks)
+        # Until a segment is applied, defaults come from the all-segment medians
+        bm_values = st.session_state.get("benchmark_values") or benchmark_set().medians("webinar")
 
         with st.expander("Budget & Cost"):
-            budget = st.number_input("Total Ad Budget ($)", min_value=0.0, value=1000.0)
-            cpc = st.number_input("Estimated Cost Per Click ($)", min_value=0.01, value=bm_values.get("cpc", 1.5))
-
-        with st.expander("Funnel Conversion Rates"):
-            landing_cr = st.slider("Landing Page Conversion Rate (%)", 0, 100, bm_values.get("landing_cr", 25))
-            attendance_rate = st.slider("Signup to Attendee Rate (%)", 0, 100, bm_values.get("attendance_rate", 50))
-            lead_rate = st.slider("Attendee to Qualified Lead Rate (%)", 0, 100, bm_values.get("lead_rate", 30))
-            sales_rate = st.slider("Lead to Sale Conversion Rate (%)", 0, 100, bm_values.get("sales_rate", 20))
-            treat_all_as_leads = st.checkbox("Treat all webinar attendees as qualified leads?", value=False)
+            budget = st.number_input("Total Ad Budget ($)", min_value=0.0, value=historical["budget"] if historical else WEBINAR_DEFAULTS["budget"])
+            cpc = st.number_input(
+                "Estimated Cost Per Click ($)", min_value=0.01,
+                value=max(historical["cpc"], 0.01) if historical else bm_values.get("cpc", WEBINAR_DEFAULTS["cpc"])
+            )
+
+        with st.expander("Funnel Conversion Rates", expanded=historical is not None):
+            if historical:
+                landing_cr, attendance_rate, lead_rate, sales_rate = (
+                    historical[k] for k in ("landing_cr", "attendance_rate", "lead_rate", "sales_rate")
+                )
+                # Measured rates feed the forecast unrounded; only the display is rounded
+                st.caption(f"Measured from {upload['rows']:,} uploaded rows.")
+                st.markdown(f"**Landing Page CR:** {round(landing_cr, 2)}%")
+                st.markdown(f"**Attendance Rate:** {round(attendance_rate, 2)}%")
+                st.markdown(f"**Lead Rate:** {round(lead_rate, 2)}%")
+                st.markdown(f"**Sales Rate:** {round(sales_rate, 2)}%")
+            else:
+                landing_cr = st.slider("Landing Page Conversion Rate (%)", 0, 100, round(bm_values.get("landing_cr", WEBINAR_DEFAULTS["landing_cr"])))
+                attendance_rate = st.slider("Signup to Attendee Rate (%)", 0, 100, round(bm_values.get("attendance_rate", WEBINAR_DEFAULTS["attendance_rate"])))
+                lead_rate = st.slider("Attendee to Qualified Lead Rate (%)", 0, 100, round(bm_values.get("lead_rate", WEBINAR_DEFAULTS["lead_rate"])))
+                sales_rate = st.slider("Lead to Sale Conversion Rate (%)", 0, 100, round(bm_values.get("sales_rate", WEBINAR_DEFAULTS["sales_rate"])))
+            treat_all_as_leads = st.checkbox("Treat all webinar attendees as qualified leads?", value=WEBINAR_DEFAULTS["treat_all_as_leads"])
+
+        calibrated = render_calibration("webinar", {
+            "landing_cr": landing_cr, "attendance_rate": attendance_rate, "lead_rate": lead_rate, "sales_rate": sales_rate
+        }, "webinar")
+        if calibrated:
+            landing_cr, attendance_rate, lead_rate, sales_rate = (
+                calibrated[0][k] for k in ("landing_cr", "attendance_rate", "lead_rate", "sales_rate")
+            )
 
         with st.expander("Product Details"):
-            avg_deal_value = st.number_input("Average Deal Value ($)", min_value=0.0, value=500.0)
-            cogs_per_sale = st.number_input("Cost of Goods per Sale ($)", min_value=0.0, value=100.0)
+            avg_deal_value = st.number_input("Average Deal Value ($)", min_value=0.0, value=WEBINAR_DEFAULTS["avg_deal_value"])
+            cogs_per_sale = st.number_input("Cost of Goods per Sale ($)", min_value=0.0, value=WEBINAR_DEFAULTS["cogs_per_sale"])
+
+        simulation = uncertainty_inputs("webinar", "cpc", {
+            "landing_cr": "Landing Page CR", "attendance_rate": "Attendance Rate",
+            "lead_rate": "Lead Rate", "sales_rate": "Sales Rate"
+        }, calibrated[1] if calibrated else None)
 
     with main:
-        clicks = budget / cpc
-        signups = clicks * (landing_cr / 100)
-        attendees = signups * (attendance_rate / 100)
-        leads = attendees if treat_all_as_leads else attendees * (lead_rate / 100)
-        sales = leads * (sales_rate / 100)
-        revenue = sales * avg_deal_value
-        roas = revenue / budget if budget > 0 else 0
-        cost_per_attendee = budget / attendees if attendees > 0 else 0
-        cost_per_lead = budget / leads if leads > 0 else 0
-        total_cogs = sales * cogs_per_sale
-        gross_profit = revenue - total_cogs
-        net_profit = gross_profit - budget
-        profit_margin = (net_profit / revenue * 100) if revenue > 0 else 0
+        inputs = {
+            "budget": budget, "cpc": cpc, "landing_cr": landing_cr, "attendance_rate": attendance_rate,
+            "lead_rate": lead_rate, "sales_rate": sales_rate, "avg_deal_value": avg_deal_value,
+            "cogs_per_sale": cogs_per_sale, "treat_all_as_leads": treat_all_as_leads
+        }
+        wf = cached_forecast("webinar", webinar_forecast, inputs)
+        clicks, signups, attendees, leads, sales = wf["clicks"], wf["signups"], wf["attendees"], wf["leads"], wf["sales"]
+        revenue, roas, total_cogs = wf["revenue"], wf["roas"], wf["total_cogs"]
+        cost_per_attendee, cost_per_lead = wf["cost_per_attendee"], wf["cost_per_lead"]
+        gross_profit, net_profit, profit_margin = wf["gross_profit"], wf["net_profit"], wf["profit_margin"]
 
         data = {
             "Clicks": clicks,
@@ -364,18 +1175,30 @@ with forecast_tab:
         col2.metric("Sales", f"{sales:.0f}")
         col3.metric("Estimated Revenue", f"${revenue:,.2f}")
         col1.metric("Cost per Attendee", f"${cost_per_attendee:.2f}")
-        col2.metric("Cost per Lead", f"${cost_per_lead:.2f}", delta=f"vs benchmark: ${benchmarks['cpl']}")
+        # A segment without a benchmark for a metric gets no comparison
+        has_benchmark = {m: not np.isnan(v) for m, v in benchmarks.items()}
+        col2.metric(
+            "Cost per Lead", f"${cost_per_lead:.2f}",
+            delta=f"vs benchmark: ${benchmarks['cost_per_lead']:g}" if has_benchmark["cost_per_lead"] else None
+        )
         col3.metric("ROAS", f"{roas:.2f}x")
         col1.metric("Total COGS", f"${total_cogs:.2f}")
         col2.metric("Gross Profit", f"${gross_profit:.2f}")
         col3.metric("Net Profit", f"${net_profit:.2f}")
-        st.metric("Profit Margin", f"{profit_margin:.2f}%", delta=f"vs benchmark: {benchmarks['profit_margin']}%")
+        st.metric(
+            "Profit Margin", f"{profit_margin:.2f}%",
+            delta=f"vs benchmark: {benchmarks['profit_margin']:g}%" if has_benchmark["profit_margin"] else None
+        )
+
+        if simulation:
+            render_simulation("webinar", inputs, *simulation)
 
         st.markdown("### Funnel Visualization")
         funnel_stages = ["Clicks", "Signups", "Attendees", "Qualified Leads", "Sales"]
         funnel_values = [clicks, signups, attendees, leads, sales]
-        fig = go.Figure(go.Funnel(y=funnel_stages, x=funnel_values, textinfo="value+percent previous", marker={"color": "royalblue"}))
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart("webinar_funnel", cached_figure("webinar_funnel", inputs, lambda: go.Figure(go.Funnel(
+            y=funnel_stages, x=funnel_values, textinfo="value+percent previous", marker={"color": "royalblue"}
+        ))), use_container_width=True)
 
         st.markdown("### Conversion Rates vs Benchmarks")
         chart_df = pd.DataFrame({
@@ -383,29 +1206,49 @@ with forecast_tab:
             "Your Rates (%)": [landing_cr, attendance_rate, 100 if treat_all_as_leads else lead_rate, sales_rate],
             "Benchmark (%)": [benchmarks['landing_cr'], benchmarks['attendance_rate'], benchmarks['lead_rate'], benchmarks['sales_rate']]
         })
-        st.plotly_chart(px.bar(chart_df, x="Stage", y=["Your Rates (%)", "Benchmark (%)"], barmode="group"), use_container_width=True)
+        figure_inputs = {**inputs, "benchmarks": benchmarks}
+        plotly_chart("webinar_rates", cached_figure(
+            "webinar_rates", figure_inputs, lambda: px.bar(chart_df, x="Stage", y=["Your Rates (%)", "Benchmark (%)"], barmode="group")
+        ), use_container_width=True)
 
         st.markdown("### ROAS Performance")
-        gauge = go.Figure(go.Indicator(
-            mode="gauge+number+delta",
-            value=roas,
-            delta={'reference': benchmarks['roas']},
-            gauge={
-                'axis': {'range': [0, max(roas * 1.5, 5)]},
-                'bar': {'color': "darkblue"},
-                'steps': [
-                    {'range': [0, benchmarks['roas']], 'color': "lightgray"},
-                    {'range': [benchmarks['roas'], roas], 'color': "lightgreen"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': benchmarks['roas']
-                }
-            },
-            title={'text': "Return on Ad Spend (ROAS)"}
-        ))
-        st.plotly_chart(gauge, use_container_width=True)
+        def build_gauge():
+            gauge = {'axis': {'range': [0, max(roas * 1.5, 5)]}, 'bar': {'color': "darkblue"}}
+            if not has_benchmark["roas"]:
+                return go.Figure(go.Indicator(
+                    mode="gauge+number", value=roas, gauge=gauge, title={'text': "Return on Ad Spend (ROAS)"}
+                ))
+            return go.Figure(go.Indicator(
+                mode="gauge+number+delta",
+                value=roas,
+                delta={'reference': benchmarks['roas']},
+                gauge={
+                    **gauge,
+                    'steps': [
+                        {'range': [0, benchmarks['roas']], 'color': "lightgray"},
+                        {'range': [benchmarks['roas'], roas], 'color': "lightgreen"}
+                    ],
+                    'threshold': {
+                        'line': {'color': "red", 'width': 4},
+                        'thickness': 0.75,
+                        'value': benchmarks['roas']
+                    }
+                },
+                title={'text': "Return on Ad Spend (ROAS)"}
+            ))
+
+        plotly_chart("webinar_gauge", cached_figure("webinar_gauge", figure_inputs, build_gauge), use_container_width=True)
+
+        if upload and upload["daily"] is not None:
+            st.markdown("### Uploaded Campaign History")
+            history_df = downsample_frame(
+                upload["daily"].reset_index(), "date", [c for c in ("spend", "sales") if c in upload["daily"]]
+            )
+            plotly_chart(
+                "webinar_history",
+                lambda: px.line(history_df, x="date", y=[c for c in ("spend", "sales") if c in history_df], title="Daily Spend & Sales"),
+                use_container_width=True
+            )
 
         st.download_button(
             "Download Forecast as CSV",
@@ -413,11 +1256,29 @@ with forecast_tab:
             file_name="webinar_forecast.csv"
         )
 
+        ranks = render_benchmark_ranks("webinar", {**inputs, **wf}, segment)
+        render_save_scenario("webinar", inputs, wf, "webinar")
+        render_export(lambda: {
+            **scenario_tables(inputs, wf, ranks["p50"].to_dict()),
+            "Benchmark Percentiles": ranks.reset_index(),
+            **({"Campaign History": upload["daily"].reset_index()} if upload and upload["daily"] is not None else {}),
+        }, "webinar", "webinar_forecast")
+        render_goal_seek("webinar", inputs, "webinar")
+        render_budget_allocator(
+            "webinar", budget, cpc, sales / clicks * 100 if clicks else 0.0, avg_deal_value, cogs_per_sale
+        )
+        render_attribution_timeline(
+            "webinar", budget, sales / budget if budget else 0.0, avg_deal_value, cogs_per_sale, per_month=False
+        )
+        render_sensitivity("webinar", inputs, "webinar")
+
 
 # --------------------------
 # TAB 3: Book A Call Forecast
 # --------------------------
-with book_a_call_tab:
+@st.fragment
+@profiled_tab("Book A Call Forecast")
+def render_book_a_call_tab():
     sidebar, main = st.columns([1, 3])
 
     with sidebar:
@@ -434,6 +1295,21 @@ with book_a_call_tab:
         with st.expander("Product & Revenue Details"):
             client_value = st.number_input("Client Value ($)", value=1500, key="client_value_book")
 
+        calibrated = render_calibration("book_a_call", {
+            "landing_page_rate": landing_page_rate, "show_rate": show_rate, "close_rate": close_rate
+        }, "book")
+        if calibrated:
+            landing_page_rate, show_rate, close_rate = (
+                calibrated[0][k] for k in ("landing_page_rate", "show_rate", "close_rate")
+            )
+
+        with st.expander("🏷 Benchmark Segment"):
+            segment = benchmark_segment("book_a_call", "book")
+
+        simulation = uncertainty_inputs("book", "cpc", {
+            "landing_page_rate": "Booking Rate", "show_rate": "Show Rate", "close_rate": "Close Rate"
+        }, calibrated[1] if calibrated else None)
+
         with st.expander("📌 Forecast Accuracy Disclaimer", expanded=True):
             st.markdown("""
             #### ⚠️ Important Note on Forecast Accuracy
@@ -443,7 +1319,7 @@ with book_a_call_tab:
             - 📈 Seasonality or platform shifts
             - 🧪 Creative performance and ad fatigue
             - ⚙️ Booking system UX and mobile friendliness
-            - ⏱ Attribution lag (leads convert after the month ends)
+            - ⏱ Attribution lag (leads convert after the month ends — see *Attribution Lag & Cash Flow*)
 
             **Why use this tool anyway?**
             - Creates directional models to guide spend and goals
@@ -455,21 +1331,16 @@ with book_a_call_tab:
 
     with main:
         # Funnel logic
-        clicks = ad_spend / cost_per_click
-        booked_calls = clicks * (landing_page_rate / 100)
-        showed = booked_calls * (show_rate / 100)
-        closed = showed * (close_rate / 100)
-
-        revenue = closed * client_value
-        net_profit = revenue - ad_spend
-        roi = (net_profit / ad_spend * 100) if ad_spend else 0
-        roas = revenue / ad_spend if ad_spend else 0
+        inputs = {
+            "ad_spend": ad_spend, "cpc": cost_per_click, "landing_page_rate": landing_page_rate,
+            "show_rate": show_rate, "close_rate": close_rate, "client_value": client_value
+        }
+        bc = cached_forecast("book_a_call", book_a_call_forecast, inputs)
+        clicks, booked_calls, showed, closed = bc["clicks"], bc["booked_calls"], bc["showed"], bc["closed"]
+        revenue, net_profit, roi, roas = bc["revenue"], bc["net_profit"], bc["roi"], bc["roas"]
 
         # ROI tiers
-        base_monthly_roi = net_profit / ad_spend if ad_spend else 0
-        light_roi = base_monthly_roi * 0.25 * 100
-        moderate_roi = base_monthly_roi * 0.5 * 100
-        aggressive_roi = base_monthly_roi * 100
+        light_roi, moderate_roi, aggressive_roi = bc["light_roi"], bc["moderate_roi"], bc["aggressive_roi"]
 
         st.subheader("📈 Forecast Summary")
         col1, col2, col3 = st.columns(3)
@@ -481,6 +1352,9 @@ with book_a_call_tab:
         col3.metric("ROI", f"{roi:.2f}%")
         st.metric("ROAS", f"{roas:.2f}x")
 
+        if simulation:
+            render_simulation("book_a_call", inputs, *simulation)
+
         st.subheader("📊 Monthly ROI Range (Realization Levels)")
         c1, c2, c3 = st.columns(3)
         c1.metric("Light (25%)", f"{light_roi:.2f}%")
@@ -500,3 +1374,133 @@ with book_a_call_tab:
             - **{int(showed):,} showed** → **{int(closed):,} closed**
             - Full ROI: **{roi:.2f}%** | Realistic Range: **{light_roi:.2f}%–{aggressive_roi:.2f}%**
             """)
+
+        ranks = render_benchmark_ranks("book_a_call", {**inputs, **bc}, segment)
+        render_save_scenario("book_a_call", inputs, bc, "book")
+        render_export(lambda: {
+            **scenario_tables(inputs, bc, ranks["p50"].to_dict()), "Benchmark Percentiles": ranks.reset_index(),
+        }, "book", "book_a_call_forecast")
+        render_goal_seek("book_a_call", inputs, "book")
+        render_budget_allocator("book", ad_spend, cost_per_click, closed / clicks * 100 if clicks else 0.0, client_value)
+        render_attribution_timeline("book", ad_spend, closed / ad_spend if ad_spend else 0.0, client_value)
+        render_sensitivity("book_a_call", inputs, "book")
+
+
+# --------------------------
+# TAB 4: Saved Scenarios
+# --------------------------
+MODEL_LABELS = {"crm": "CRM ROI", "webinar": "Webinar", "book_a_call": "Book A Call"}
+SORT_OPTIONS = {
+    "Newest": ("created_at", True), "ROAS": ("roas", True), "Net Profit": ("net_profit", True),
+    "ROI": ("roi", True), "Revenue": ("revenue", True), "Name": ("name", False),
+}
+
+
+@st.fragment
+@profiled_tab("Saved Scenarios")
+def render_saved_scenarios_tab():
+    px, _ = plotly_modules()
+    store = scenario_store()
+    # Saves happen in other tabs' fragments, which don't rerun this one
+    st.button("🔄 Refresh", key="saved_refresh")
+    clients = store.clients()
+    if not clients:
+        st.info("No saved scenarios yet. Use 💾 Save Scenario in any forecast tab to store one here.")
+        return
+
+    c1, c2, c3, c4 = st.columns(4)
+    client = c1.selectbox("Client", ["All clients"] + [c or "(no client)" for c in clients])
+    models = c2.multiselect("Forecast Type", list(MODEL_LABELS), format_func=MODEL_LABELS.get)
+    sort_label = c3.selectbox("Sort By", list(SORT_OPTIONS))
+    limit = c4.number_input("Show Top", min_value=10, max_value=5000, value=200, step=50)
+
+    order_by, descending = SORT_OPTIONS[sort_label]
+    saved = store.query(
+        client=None if client == "All clients" else ("" if client == "(no client)" else client),
+        model=models or None, order_by=order_by, descending=descending, limit=limit, expand=True
+    )
+    st.caption(f"{len(saved):,} saved scenarios loaded from the store (no recomputation).")
+    st.dataframe(saved, hide_index=True, use_container_width=True)
+
+    metric = order_by if order_by in ("roas", "net_profit", "roi", "revenue") else "net_profit"
+    chart_df = saved.dropna(subset=[metric]).head(50)
+    if len(chart_df):
+        plotly_chart("saved_scenarios", lambda: px.bar(
+            chart_df, x="name", y=metric, color="model", hover_data=["client", "created_at"],
+            title=f"{metric.replace('_', ' ').title()} by Scenario (top {len(chart_df)})"
+        ), use_container_width=True)
+    st.download_button(
+        "Download Comparison as CSV", saved.to_csv(index=False).encode("utf-8"), file_name="saved_scenarios.csv"
+    )
+
+
+# Tabs
+backend_tab, forecast_tab, book_a_call_tab, saved_tab = st.tabs(
+    ["CRM ROI Forecast", "Webinar Forecast", "Book A Call Forecast", "Saved Scenarios"]
+)
+
+with backend_tab:
+    render_crm_roi_tab()
+with forecast_tab:
+    render_webinar_tab()
+with book_a_call_tab:
+    render_book_a_call_tab()
+with saved_tab:
+    render_saved_scenarios_tab()
+
+
+# ==== Startup timing report ====
+timings = startup_timings()
+if "first render" not in timings:
+    timings["first render"] = time.perf_counter() - _script_start
+    if os.environ.get("STARTUP_TIMING") == "1":
+        print(json.dumps({"startup_timings_s": timings}), file=sys.stderr)
+if os.environ.get("STARTUP_TIMING") == "1" or st.query_params.get("startup_timing") == "1":
+    with st.expander("⏱ Startup Timings"):
+        st.caption("First-in-process costs; later reruns reuse the imports and cached assets.")
+        st.dataframe(
+            pd.DataFrame({"Phase": list(timings), "Seconds": list(timings.values())}).assign(
+                Seconds=lambda d: d["Seconds"].round(4)
+            ),
+            hide_index=True
+        )
+        st.caption(f"This rerun: {time.perf_counter() - _script_start:.3f}s")
+if st.query_params.get("cache_stats") == "1":
+    with st.expander("🗄 Result Cache"):
+        st.json(result_cache().stats())
+        st.caption("Monte Carlo draws")
+        st.json(DRAW_CACHE.stats())
+
+
+# ==== Rerun profile panel ====
+@st.fragment
+def render_profile_panel():
+    profiler = st.session_state._profiler
+    with st.expander("🩺 Rerun Profile", expanded=True):
+        # Tab fragments log their own reruns without rerunning this panel
+        st.button("🔄 Refresh", key="profile_refresh")
+        summary_columns = {
+            "kind": "Kind", "section": "Section", "count": "Count", "p50_ms": "p50 (ms)", "p95_ms": "p95 (ms)",
+            "max_ms": "Max (ms)", "p50_kb": "p50 Payload (KB)", "p95_kb": "p95 Payload (KB)",
+        }
+        this_session, all_sessions = st.tabs(["This Session", "All Sessions (log)"])
+        with this_session:
+            st.dataframe(
+                summarize_profile(profiler.recent).rename(columns=summary_columns).round(2),
+                hide_index=True, use_container_width=True
+            )
+            st.caption(f"Session {profiler.session}, last {len(profiler.recent)} timed sections.")
+        with all_sessions:
+            log = read_profile_log(profile_log().path, last=PANEL_RECORDS)
+            st.dataframe(
+                summarize_profile(log).rename(columns=summary_columns).round(2),
+                hide_index=True, use_container_width=True
+            )
+            sessions = log["session"].nunique() if "session" in log else 0
+            st.caption(f"Last {len(log):,} records, from {sessions:,} sessions, in {profile_log().path}.")
+
+
+if PROFILING:
+    st.session_state._profiler.record("full rerun", time.perf_counter() - _script_start, "rerun")
+    flush_profile()
+    render_profile_panel()
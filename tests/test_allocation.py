@@ -0,0 +1,30 @@
+import warnings
+
+import pytest
+
+from forecasting import allocate
+
+CHANNELS = [
+    {"name": "Meta", "base_cpc": 1.5, "elasticity": 0.5, "saturation_spend": 1000, "conversion": 2.0},
+    {"name": "Google", "base_cpc": 2.4, "elasticity": 0.3, "saturation_spend": 500, "conversion": 3.0},
+]
+
+
+@pytest.mark.parametrize("deal_value", [0.0, -10.0])
+def test_non_positive_deal_value_is_rejected(deal_value):
+    with pytest.raises(ValueError, match="Deal value"):
+        allocate(CHANNELS, 1000, deal_value, objective="revenue")
+
+
+def test_channels_that_never_convert_are_rejected():
+    with pytest.raises(ValueError, match="click-to-sale"):
+        allocate([{**c, "conversion": 0.0} for c in CHANNELS], 1000, 100)
+
+
+def test_revenue_objective_spends_the_budget_without_warnings():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = allocate([*CHANNELS, {**CHANNELS[0], "name": "Dud", "conversion": 0.0}], 1000, 100, objective="revenue")
+    assert result["constraint"] == "budget"
+    assert result["spend"] == pytest.approx(1000, rel=1e-3)
+    assert result["channels"].set_index("name").loc["Dud", "spend"] == 0
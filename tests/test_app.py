@@ -0,0 +1,46 @@
+import re
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def rendered_text(at):
+    texts = [m.value for m in at.markdown] + [c.value for c in at.caption]
+    texts += [f"{m.value} {m.delta}" for m in at.metric]
+    return texts
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setenv("SCENARIO_DB", str(tmp_path / "scenarios.db"))
+    import streamlit as st
+
+    # Benchmarks are cached per process; each test loads its own file
+    st.cache_resource.clear()
+    yield lambda: AppTest.from_file(str(ROOT / "streamlit_app.py"), default_timeout=120).run()
+    st.cache_resource.clear()
+
+
+def test_default_view_renders_without_nan(app):
+    at = app()
+    assert not at.exception
+    assert "**Avg CPC:** $1.5" in [m.value for m in at.markdown]
+    assert not [t for t in rendered_text(at) if re.search(r"\bnan\b", t, re.IGNORECASE)]
+
+
+def test_missing_benchmarks_show_as_not_available(app, tmp_path, monkeypatch):
+    seed = pd.read_csv(ROOT / "data" / "benchmarks.csv")
+    path = tmp_path / "benchmarks.csv"
+    seed[seed["metric"] != "cpc"].to_csv(path, index=False)
+    monkeypatch.setenv("BENCHMARKS_PATH", str(path))
+    at = app()
+    assert not at.exception
+    assert "**Avg CPC:** n/a" in [m.value for m in at.markdown]
+    assert not [t for t in rendered_text(at) if re.search(r"\bnan\b", t, re.IGNORECASE)]
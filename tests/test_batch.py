@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from forecasting import forecast_file, read_export, run_scenarios
+
+
+def test_mixed_models_keep_row_order_with_duplicate_index_labels():
+    frame = pd.DataFrame(
+        {"model": ["webinar", "crm", "webinar", "crm"], "client": ["a", "b", "c", "d"]},
+        index=[0, 0, 1, 1],
+    )
+    priced = run_scenarios(frame)
+    assert len(priced) == 4
+    assert list(priced.index) == [0, 0, 1, 1]
+    assert list(priced["client"]) == ["a", "b", "c", "d"]
+    assert list(priced["model"]) == ["webinar", "crm", "webinar", "crm"]
+
+
+def test_rows_without_a_model_are_named():
+    frame = pd.DataFrame({"model": ["webinar", None, "crm", float("nan")], "budget": [1000, 500, None, None]})
+    with pytest.raises(ValueError, match=r"row\(s\) 1, 3"):
+        run_scenarios(frame)
+
+
+def test_forecast_file_rejects_a_blank_model(tmp_path):
+    source = tmp_path / "scenarios.csv"
+    source.write_text("model,budget\nwebinar,1000\n,500\n")
+    with pytest.raises(ValueError, match=r"No model given for row\(s\) 1"):
+        forecast_file(source, tmp_path / "out.csv", workers=1)
+
+
+def _scenarios():
+    return pd.DataFrame({
+        "client": [f"c{i}" for i in range(6)],
+        "model": ["crm", "crm", "webinar", "webinar", "crm", "book_a_call"],
+        "team_members": [2, 3, None, None, 2.5, None],
+        "budget": [None, None, 1000, 2500, None, None],
+        "seats": [10, 20, 30, 40.5, None, None],
+    })
+
+
+@pytest.mark.parametrize("source_format", ["csv", "jsonl", "parquet"])
+@pytest.mark.parametrize("output_format", ["parquet", "csv", "xlsx"])
+def test_forecast_file_schema_does_not_depend_on_the_first_chunk(tmp_path, source_format, output_format):
+    if output_format == "xlsx":
+        pytest.importorskip("openpyxl")
+    scenarios = _scenarios()
+    source = tmp_path / f"scenarios.{source_format}"
+    if source_format == "csv":
+        scenarios.to_csv(source, index=False)
+    elif source_format == "parquet":
+        scenarios.to_parquet(source, index=False)
+    else:
+        # A key that only shows up after the first chunk
+        rows = [{k: v for k, v in row.items() if pd.notna(v)} for row in scenarios.to_dict("records")]
+        rows[-1]["campaign"] = "late"
+        pd.DataFrame(rows).to_json(source, orient="records", lines=True)
+    destination = tmp_path / f"results.{output_format}"
+
+    # Two-row chunks: the first holds only CRM rows with whole team sizes and seat counts
+    assert forecast_file(source, destination, workers=1, chunksize=2) == 6
+    results = read_export(destination)
+    if output_format == "xlsx":
+        results = results["Results"]
+    assert list(results["client"]) == list(scenarios["client"])
+    assert results.loc[2, "revenue"] > 0
+    assert results.loc[5, "model"] == "book_a_call"
+    assert results["seats"].isna().sum() == 2
+    if source_format == "jsonl":
+        assert results["campaign"].isna().sum() == 5
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from forecasting import BenchmarkSet, percentile_rank, write_benchmarks
+
+
+def row(metric, p50, industry="All", region="All", channel="All", deal_size="All", n=100, model="webinar"):
+    return {
+        "model": model, "industry": industry, "region": region, "channel": channel, "deal_size": deal_size,
+        "metric": metric, "n": n, "p10": p50 * 0.5, "p25": p50 * 0.75, "p50": p50, "p75": p50 * 1.25, "p90": p50 * 1.5,
+    }
+
+
+def benchmark_set(*rows):
+    return BenchmarkSet(pa.Table.from_pandas(pd.DataFrame(rows), preserve_index=False))
+
+
+def test_exact_segment_wins():
+    benchmarks = benchmark_set(
+        row("roas", 2.0),
+        row("roas", 3.0, industry="SaaS", region="EU", channel="Meta", deal_size="$1k-$5k"),
+    )
+    match = benchmarks.lookup("webinar", industry="SaaS", region="EU", channel="Meta", deal_size="$1k-$5k").loc["roas"]
+    assert match["p50"] == 3.0
+    assert match["exact"]
+
+
+def test_fallback_prefers_industry_then_channel_then_region():
+    benchmarks = benchmark_set(
+        row("roas", 1.0),
+        row("roas", 2.0, region="EU"),
+        row("roas", 3.0, channel="Meta", region="EU"),
+        row("roas", 4.0, industry="SaaS"),
+    )
+    segment = {"industry": "SaaS", "region": "EU", "channel": "Meta"}
+    assert benchmarks.medians("webinar", **segment)["roas"] == 4.0
+    assert benchmarks.medians("webinar", **{**segment, "industry": "Retail"})["roas"] == 3.0
+    assert benchmarks.medians("webinar", **{**segment, "industry": "Retail", "channel": "Google"})["roas"] == 2.0
+    assert benchmarks.medians("webinar", industry="Retail", region="US")["roas"] == 1.0
+    assert not benchmarks.lookup("webinar", industry="Retail").loc["roas", "exact"]
+
+
+def test_a_different_segment_value_is_never_used():
+    benchmarks = benchmark_set(row("roas", 2.0, industry="Finance"), row("cpc", 1.5))
+    assert list(benchmarks.lookup("webinar", industry="SaaS").index) == ["cpc"]
+
+
+def test_deal_size_falls_back_to_all_then_the_nearest_band():
+    bands = benchmark_set(row("roas", 1.0, deal_size="<$1k"), row("roas", 2.0, deal_size="$1k-$5k"))
+    assert bands.medians("webinar", deal_size="$5k-$25k")["roas"] == 2.0
+    assert bands.medians("webinar", deal_size="$25k+")["roas"] == 2.0
+    with_all = benchmark_set(row("roas", 2.0, deal_size="$1k-$5k"), row("roas", 5.0))
+    assert with_all.medians("webinar", deal_size="$5k-$25k")["roas"] == 5.0
+
+
+def test_more_campaigns_break_ties():
+    benchmarks = benchmark_set(row("roas", 1.0, region="EU", n=10), row("roas", 2.0, channel="Meta", n=10),
+                               row("roas", 3.0, region="EU", n=500))
+    assert benchmarks.medians("webinar", region="EU", channel="Google")["roas"] == 3.0
+
+
+def test_percentile_rank_interpolates_and_clips():
+    band = [[1.0, 2.0, 3.0, 4.0, 5.0]]
+    assert percentile_rank([3.0], band)[0] == pytest.approx(50)
+    assert percentile_rank([2.5], band)[0] == pytest.approx(37.5)
+    assert percentile_rank([0.5], band)[0] == pytest.approx(2.5)
+    assert percentile_rank([100.0], band)[0] == 100
+    assert np.isnan(percentile_rank([np.nan], band)[0])
+
+
+def test_lower_is_better_metrics_flip_the_share_beaten():
+    benchmarks = benchmark_set(row("cpc", 2.0), row("roas", 2.0), row("cost_per_lead", 40.0))
+    ranks = benchmarks.percentile_ranks("webinar", {"cpc": 1.5, "roas": 2.5, "cost_per_lead": 70.0})
+    # Your value sits at p25 of CPC and p75 of ROAS: both beat 75% of the segment
+    assert ranks.loc["cpc", "percentile"] == pytest.approx(25)
+    assert ranks.loc["cpc", "better_than"] == pytest.approx(75)
+    assert ranks.loc["roas", "percentile"] == pytest.approx(75)
+    assert ranks.loc["roas", "better_than"] == pytest.approx(75)
+    assert ranks.loc["cost_per_lead", "better_than"] == pytest.approx(0)
+
+
+def test_csv_is_cached_as_a_mapped_arrow_file(tmp_path):
+    frame = pd.DataFrame([row("roas", 2.0), row("cpc", 1.5, industry="SaaS")])
+    frame.to_csv(tmp_path / "benchmarks.csv", index=False)
+    loaded = BenchmarkSet.load(tmp_path / "benchmarks.csv")
+    assert (tmp_path / "benchmarks.arrow").exists()
+    assert loaded.medians("webinar", industry="SaaS") == {"cpc": 1.5, "roas": 2.0}
+    write_benchmarks(frame, tmp_path / "copy.arrow")
+    assert len(BenchmarkSet.load(tmp_path / "copy.arrow")) == 2
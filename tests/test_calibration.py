@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from forecasting import Calibrator
+
+
+@pytest.fixture
+def calibrator():
+    calibrator = Calibrator()
+    yield calibrator
+    calibrator.close()
+
+
+def test_rows_for_the_same_day_are_summed(calibrator):
+    rows = pd.DataFrame({
+        "date": ["2024-05-01", "2024-05-01", "2024-05-02"],
+        "clicks": [100, 300, 200], "signups": [10, 30, 20],
+    })
+    assert calibrator.update(rows, "webinar") == 3
+    posterior = calibrator.posterior("webinar")
+    assert posterior.loc["landing_cr", "trials"] == 600
+    assert posterior.loc["landing_cr", "successes"] == 60
+
+
+def test_days_already_counted_are_skipped(calibrator):
+    first = pd.DataFrame({"date": ["2024-05-01"], "clicks": [100], "signups": [10]})
+    again = pd.DataFrame({"date": ["2024-05-01", "2024-05-02"], "clicks": [100, 50], "signups": [10, 5]})
+    calibrator.update(first, "webinar")
+    assert calibrator.update(again, "webinar") == 1
+    assert calibrator.posterior("webinar").loc["landing_cr", "trials"] == 150
+
+
+def test_undated_uploads_are_counted_once(calibrator):
+    totals = pd.DataFrame({"clicks": [1000], "signups": [120]})
+    assert calibrator.update(totals, "webinar", digest="abc") == 1
+    assert calibrator.update(totals, "webinar", digest="abc") == 0
+    assert calibrator.update(totals, "webinar") == 1
+    assert calibrator.update(totals, "webinar") == 0
+    assert calibrator.update(totals, "webinar", client="acme", digest="abc") == 1
+    assert calibrator.posterior("webinar").loc["landing_cr", "trials"] == 2000
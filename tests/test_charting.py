@@ -0,0 +1,95 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting import charting
+from forecasting.charting import MIN_POINTS, decode, downsample_frame, fit_figure, lttb
+
+
+@pytest.fixture
+def spiky():
+    rng = np.random.default_rng(7)
+    x = np.arange(100_000, dtype=float)
+    y = rng.normal(0, 1, len(x))
+    y[31_337], y[77_777] = 50.0, -50.0
+    return x, y
+
+
+def line_figure(x, y, mode="lines"):
+    return {"data": [{"type": "scatter", "mode": mode, "x": x.tolist(), "y": y.tolist()}], "layout": {}}
+
+
+def test_lttb_keeps_the_endpoints_and_the_extremes(spiky):
+    x, y = spiky
+    keep = lttb(x, y, 500)
+    assert len(keep) <= 500
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert {31_337, 77_777} <= set(keep.tolist())
+
+
+@pytest.mark.parametrize("n_out", [2, 10, 200])
+def test_lttb_keeps_everything_when_it_cannot_reduce(n_out):
+    # Fewer than three output points can't hold both endpoints and a bucket
+    x = np.arange(10.0)
+    assert lttb(x, x ** 2, n_out).tolist() == list(range(10))
+
+
+def test_fit_figure_downsamples_lines_and_keeps_peaks(spiky):
+    x, y = spiky
+    figure, report = fit_figure(line_figure(x, y), max_points=1000)
+    trace = figure["data"][0]
+    kept_y = decode(trace["y"])
+    assert report["points"] == len(x)
+    assert report["kept"] == len(kept_y) <= 1000
+    assert kept_y.max() == 50.0 and kept_y.min() == -50.0
+    assert decode(trace["x"])[[0, -1]].tolist() == [0.0, len(x) - 1]
+
+
+def test_large_marker_scatters_switch_to_webgl():
+    rng = np.random.default_rng(1)
+    figure, report = fit_figure(line_figure(rng.random(5000), rng.random(5000), mode="markers"))
+    assert report["webgl"] == 1
+    assert figure["data"][0]["type"] == "scattergl"
+
+
+def test_payload_cap_halves_the_budget_until_the_figure_fits(spiky):
+    x, y = spiky
+    figure, report = fit_figure(line_figure(x, y), max_points=4000, max_bytes=40_000)
+    assert report["bytes"] == len(json.dumps(figure)) <= 40_000
+    assert not report["over"]
+    # Halved at least once, never below the floor
+    assert MIN_POINTS <= report["kept"] < 4000
+
+
+def test_payload_cap_stops_at_the_floor_and_reports_overflow(spiky):
+    x, y = spiky
+    figure, report = fit_figure(line_figure(x, y), max_bytes=100)
+    assert report["over"]
+    assert report["kept"] <= MIN_POINTS
+    assert report["bytes"] > 100
+
+
+def test_payload_cap_rechecks_after_every_halving(spiky, monkeypatch):
+    budgets = []
+    fit = charting._fit
+
+    def recording(figure, max_points, max_cells, webgl_threshold):
+        budgets.append(max_points)
+        return fit(figure, max_points, max_cells, webgl_threshold)
+
+    monkeypatch.setattr(charting, "_fit", recording)
+    fit_figure(line_figure(*spiky), max_points=4000, max_bytes=100)
+    assert budgets == [4000, 2000, 1000, 500, 250]
+
+
+def test_downsample_frame_reduces_each_group_separately():
+    x = np.tile(np.arange(10_000), 2)
+    frame = pd.DataFrame({"x": x, "y": np.sin(x / 100.0), "group": np.repeat(["a", "b"], 10_000)})
+    frame.loc[12_345, "y"] = 10.0
+    reduced = downsample_frame(frame, "x", "y", max_points=300, by="group")
+    assert reduced.groupby("group").size().max() <= 300
+    assert 12_345 in reduced.index
+    assert reduced.groupby("group")["x"].agg(["min", "max"]).values.tolist() == [[0, 9999], [0, 9999]]
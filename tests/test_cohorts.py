@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from forecasting import lag_distribution
+
+
+@pytest.mark.parametrize("kind", ["exponential", "gamma", "uniform"])
+@pytest.mark.parametrize("period", ["daily", "weekly"])
+def test_lag_distributions_are_probabilities(kind, period):
+    pmf = lag_distribution(kind, 21.0, 3.0, period)
+    assert np.all(pmf >= 0)
+    assert pmf.sum() == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("mean_days", [0.1, 0.2, 0.24])
+def test_sub_day_uniform_lag_books_everything_on_day_zero(mean_days):
+    pmf = lag_distribution("uniform", mean_days)
+    assert pmf.tolist() == [1.0]
+
+
+def test_uniform_lag_spreads_over_twice_the_mean():
+    pmf = lag_distribution("uniform", 5.0)
+    assert len(pmf) == 10
+    assert np.allclose(pmf, 0.1)
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting import ResultWriter, export_bytes, read_export, write_tables
+from forecasting import export
+
+
+@pytest.fixture
+def table():
+    return pd.DataFrame({
+        "scenario": np.arange(50),
+        "revenue": np.linspace(0, 1e6, 50),
+        "client": [f"client {i}" for i in range(50)],
+        "note": [None if i % 7 == 0 else "=looks like a formula" for i in range(50)],
+    }).assign(revenue=lambda df: df["revenue"].where(df["scenario"] % 5 != 0))
+
+
+def assert_same_cells(actual, expected):
+    assert list(actual.columns) == list(expected.columns)
+    assert len(actual) == len(expected)
+    for column in expected:
+        assert actual[column].isna().tolist() == expected[column].isna().tolist(), column
+        present = expected[column].notna()
+        values, wanted = actual.loc[present, column].tolist(), expected.loc[present, column].tolist()
+        if pd.api.types.is_float_dtype(expected[column]):
+            # Excel keeps 15 significant digits
+            assert values == pytest.approx(wanted, rel=1e-14), column
+        else:
+            assert values == wanted, column
+
+
+def test_workbook_round_trip_keeps_every_cell(tmp_path, table):
+    pytest.importorskip("openpyxl")
+    path = tmp_path / "export.xlsx"
+    write_tables(path, {"Outputs": [table.iloc[:20], table.iloc[20:]], "Empty": table.iloc[:0]})
+    sheets = read_export(path)
+    assert_same_cells(sheets["Outputs"], table)
+    assert list(sheets["Empty"].columns) == list(table.columns)
+
+
+def test_excel_continues_on_new_sheets_past_the_row_limit(tmp_path, table, monkeypatch):
+    pytest.importorskip("openpyxl")
+    monkeypatch.setattr(export, "EXCEL_MAX_ROWS", 21)
+    path = tmp_path / "results.xlsx"
+    with ResultWriter(path) as writer:
+        for start in range(0, len(table), 15):
+            writer.write(table.iloc[start:start + 15])
+    sheets = read_export(path)
+    assert list(sheets) == ["Results", "Results (2)", "Results (3)"]
+    assert_same_cells(pd.concat(sheets.values(), ignore_index=True), table)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "jsonl"])
+def test_zip_round_trip_keeps_every_cell(tmp_path, table, fmt):
+    data, ext, _ = export_bytes({"Outputs": table}, fmt)
+    path = tmp_path / f"export{ext}"
+    path.write_bytes(data)
+    assert_same_cells(read_export(path)["Outputs"], table)
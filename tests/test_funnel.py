@@ -0,0 +1,120 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from forecasting import (
+    MODELS, WEBINAR_DEFAULTS, BenchmarkSet, book_a_call_forecast, crm_forecast, run_model, webinar_forecast,
+)
+
+SEED_BENCHMARKS = Path(__file__).resolve().parent.parent / "data" / "benchmarks.csv"
+
+
+# Scalar formulas as the app computed them before the models were vectorized
+def baseline_webinar(budget, cpc, landing_cr, attendance_rate, lead_rate, sales_rate,
+                     avg_deal_value, cogs_per_sale, treat_all_as_leads=False):
+    clicks = budget / cpc if cpc > 0 else 0
+    signups = clicks * landing_cr / 100
+    attendees = signups * attendance_rate / 100
+    leads = attendees if treat_all_as_leads else attendees * lead_rate / 100
+    sales = leads * sales_rate / 100
+    revenue = sales * avg_deal_value
+    total_cogs = sales * cogs_per_sale
+    gross_profit = revenue - total_cogs
+    net_profit = gross_profit - budget
+    return {
+        "clicks": clicks, "signups": signups, "attendees": attendees, "leads": leads, "sales": sales,
+        "revenue": revenue, "roas": revenue / budget if budget > 0 else 0,
+        "cost_per_attendee": budget / attendees if attendees > 0 else 0,
+        "cost_per_lead": budget / leads if leads > 0 else 0,
+        "total_cogs": total_cogs, "gross_profit": gross_profit, "net_profit": net_profit,
+        "profit_margin": net_profit / revenue * 100 if revenue > 0 else 0,
+    }
+
+
+def baseline_book_a_call(ad_spend, cpc, landing_page_rate, show_rate, close_rate, client_value):
+    clicks = ad_spend / cpc if cpc > 0 else 0
+    booked_calls = clicks * landing_page_rate / 100
+    showed = booked_calls * show_rate / 100
+    closed = showed * close_rate / 100
+    revenue = closed * client_value
+    net_profit = revenue - ad_spend
+    base_roi = net_profit / ad_spend if ad_spend else 0
+    return {
+        "clicks": clicks, "booked_calls": booked_calls, "showed": showed, "closed": closed,
+        "revenue": revenue, "net_profit": net_profit, "roi": base_roi * 100,
+        "roas": revenue / ad_spend if ad_spend else 0,
+        "light_roi": base_roi * 0.25 * 100, "moderate_roi": base_roi * 0.5 * 100,
+        "aggressive_roi": base_roi * 100,
+    }
+
+
+def baseline_crm(total_crm_leads, active_leads, contact_rate, booking_rate, show_rate, close_rate,
+                 client_value, monthly_tech_stack, team_members, monthly_salary,
+                 existing_overhead=0.0, months=1):
+    leads_to_reengage = total_crm_leads - active_leads
+    contacted = leads_to_reengage * contact_rate / 100
+    booked = contacted * booking_rate / 100
+    showed = booked * show_rate / 100
+    closed = showed * close_rate / 100
+    revenue = closed * client_value * months
+    tech_cost = monthly_tech_stack * months
+    salary_cost = team_members * monthly_salary * months
+    overhead_cost = existing_overhead * months
+    total_cost = tech_cost + salary_cost + overhead_cost
+    net_profit = revenue - total_cost
+    return {
+        "leads_to_reengage": leads_to_reengage, "contacted": contacted, "booked": booked,
+        "showed": showed, "closed": closed, "revenue": revenue, "tech_cost": tech_cost,
+        "salary_cost": salary_cost, "overhead_cost": overhead_cost, "total_cost": total_cost,
+        "net_profit": net_profit, "roi": net_profit / total_cost * 100 if total_cost else 0,
+    }
+
+
+WEBINAR_CASES = [
+    {},
+    {"treat_all_as_leads": True},
+    {"budget": 0.0},
+    {"landing_cr": 0},
+    {"budget": 12_500.0, "cpc": 0.85, "landing_cr": 33, "attendance_rate": 47, "sales_rate": 9,
+     "avg_deal_value": 2_400.0, "cogs_per_sale": 640.0},
+]
+
+
+@pytest.mark.parametrize("overrides", WEBINAR_CASES)
+def test_webinar_matches_the_baseline_formulas(overrides):
+    inputs = {**WEBINAR_DEFAULTS, **overrides}
+    result = webinar_forecast(**inputs)
+    assert result == pytest.approx(baseline_webinar(**inputs), rel=1e-12)
+
+
+@pytest.mark.parametrize("overrides", [{}, {"ad_spend": 0.0}, {"cpc": 4.1, "close_rate": 35, "client_value": 900.0}])
+def test_book_a_call_matches_the_baseline_formulas(overrides):
+    inputs = {**MODELS["book_a_call"][1], **overrides}
+    assert book_a_call_forecast(**inputs) == pytest.approx(baseline_book_a_call(**inputs), rel=1e-12)
+
+
+@pytest.mark.parametrize("overrides", [{}, {"months": 12}, {"existing_overhead": 2000.0, "months": 12}, {
+    "monthly_tech_stack": 0.0, "monthly_salary": 0.0,
+}])
+def test_crm_matches_the_baseline_formulas(overrides):
+    inputs = {**MODELS["crm"][1], **overrides}
+    result = crm_forecast(**inputs)
+    expected = baseline_crm(**inputs)
+    assert {k: result[k] for k in expected} == pytest.approx(expected, rel=1e-12)
+    assert result["monthly_roi"] == pytest.approx(expected["roi"] / 100 / inputs["months"] if expected["total_cost"] else 0)
+
+
+def test_vectorized_rows_match_scalar_calls():
+    budgets = np.array([0.0, 500.0, 1000.0, 7_500.0])
+    result = run_model("webinar", {"budget": budgets})
+    for i, budget in enumerate(budgets):
+        scalar = baseline_webinar(**{**WEBINAR_DEFAULTS, "budget": budget})
+        assert {k: result[k][i] for k in scalar} == pytest.approx(scalar, rel=1e-12)
+
+
+def test_webinar_rate_defaults_match_the_all_segment_medians():
+    pytest.importorskip("pyarrow")
+    medians = BenchmarkSet.load(SEED_BENCHMARKS).medians("webinar")
+    for key in ("landing_cr", "attendance_rate", "lead_rate", "sales_rate"):
+        assert WEBINAR_DEFAULTS[key] == medians[key]
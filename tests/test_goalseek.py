@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from forecasting import CRM_DEFAULTS, WEBINAR_DEFAULTS, bisect, crm_forecast, leads_for_roi, solve_for, webinar_forecast
+from forecasting.goalseek import solve_increasing
+
+
+def webinar_with(**inputs):
+    return webinar_forecast(**{**WEBINAR_DEFAULTS, **inputs})
+
+
+def test_budget_for_a_net_profit_target_round_trips():
+    budget = solve_for("webinar", {"avg_deal_value": 5_000}, "budget", "net_profit", 5_000)
+    assert budget > 0
+    assert webinar_with(budget=budget, avg_deal_value=5_000)["net_profit"] == pytest.approx(5_000)
+    # At the default deal value every extra dollar loses money
+    assert np.isnan(solve_for("webinar", {}, "budget", "net_profit", 5_000))
+
+
+def test_rate_for_a_revenue_target_round_trips():
+    rate = solve_for("webinar", {"budget": 3_000}, "sales_rate", "revenue", 2_500)
+    assert 0 <= rate <= 100
+    assert webinar_with(budget=3_000, sales_rate=rate)["revenue"] == pytest.approx(2_500)
+
+
+def test_cpc_is_solved_through_its_reciprocal():
+    cpc = solve_for("webinar", {}, "cpc", "roas", 0.5)
+    assert webinar_with(cpc=cpc)["roas"] == pytest.approx(0.5)
+
+
+def test_targets_broadcast_over_arrays():
+    targets = np.array([100.0, 1_000.0, 10_000.0])
+    budgets = solve_for("webinar", {}, "budget", "revenue", targets)
+    assert webinar_with(budget=budgets)["revenue"] == pytest.approx(targets)
+
+
+def test_unreachable_targets_are_nan():
+    # Hitting this revenue would take a sales rate above 100%
+    assert np.isnan(solve_for("webinar", {}, "sales_rate", "revenue", 1e9))
+    # Revenue can't go negative by adding budget
+    assert np.isnan(solve_for("webinar", {}, "budget", "revenue", -10))
+    rates = solve_for("webinar", {}, "sales_rate", "revenue", np.array([100.0, 1e9]))
+    assert np.isfinite(rates[0]) and np.isnan(rates[1])
+
+
+@pytest.mark.parametrize("model, unknown, metric", [
+    ("webinar", "budget", "roas"),
+    ("book_a_call", "ad_spend", "roi"),
+    ("webinar", "treat_all_as_leads", "revenue"),
+    ("crm", "monthly_salary", "roi"),
+])
+def test_non_linear_unknowns_are_rejected(model, unknown, metric):
+    with pytest.raises(ValueError, match=f"{metric} is not linear in {unknown}"):
+        solve_for(model, {}, unknown, metric, 1.0)
+
+
+def test_leads_for_roi_round_trips():
+    leads = leads_for_roi({}, 50)
+    total = leads + CRM_DEFAULTS["active_leads"]
+    assert crm_forecast(**{**CRM_DEFAULTS, "total_crm_leads": total})["roi"] == pytest.approx(50)
+
+
+def test_bisect_finds_the_root_of_an_increasing_function():
+    root = bisect(lambda x: x ** 3, np.array([8.0, 27.0]), 0.0, 10.0)
+    assert root == pytest.approx([2.0, 3.0])
+
+
+def test_bisect_returns_nan_outside_the_bracket():
+    root = bisect(lambda x: x ** 3, np.array([-1.0, 8.0, 1_001.0]), 0.0, 10.0)
+    assert np.isnan(root[0]) and np.isnan(root[2])
+    assert root[1] == pytest.approx(2.0)
+
+
+def test_solve_increasing_widens_its_bracket():
+    assert solve_increasing(lambda x: x, 5e6) == pytest.approx(5e6)
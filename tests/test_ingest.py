@@ -0,0 +1,62 @@
+import io
+
+import pandas as pd
+import pytest
+
+from forecasting import campaign_inputs, file_digest, read_campaign_csv
+from forecasting.ingest import resolve_columns
+
+EXPORT = """Reporting starts,Campaign,Amount spent (USD),Link clicks,Registrations,Attended,Purchases,Purchase value
+2024-03-01,A,"1,200.50",800,160,64,8,4000
+2024-03-01,B,300,200,50,20,2,1000
+2024-03-02,A,450.25,300,60,30,3,1500
+2024-03-03,B,,100,20,10,1,500
+2024-03-02,B,99.25,50,10,5,0,0
+"""
+
+
+def test_export_headers_map_to_canonical_columns():
+    header = ["Reporting starts", "Campaign", "Amount spent (USD)", "Cost", "Link clicks", "Sign-ups"]
+    assert resolve_columns(header) == {
+        "Reporting starts": "date", "Amount spent (USD)": "spend", "Link clicks": "clicks", "Sign-ups": "signups",
+    }
+
+
+def test_chunked_totals_match_a_whole_file_read():
+    whole = pd.read_csv(io.StringIO(EXPORT), thousands=",")
+    result = read_campaign_csv(io.StringIO(EXPORT), chunksize=2)
+    assert result["rows"] == 5
+    assert result["totals"] == pytest.approx({
+        "spend": whole["Amount spent (USD)"].sum(), "clicks": whole["Link clicks"].sum(),
+        "signups": whole["Registrations"].sum(), "attendees": whole["Attended"].sum(),
+        "sales": whole["Purchases"].sum(), "revenue": whole["Purchase value"].sum(),
+    })
+    assert result["totals"] == read_campaign_csv(io.StringIO(EXPORT))["totals"]
+
+
+def test_daily_rollup_sums_across_chunks():
+    daily = read_campaign_csv(io.StringIO(EXPORT), chunksize=2)["daily"]
+    assert list(daily.index) == list(pd.to_datetime(["2024-03-01", "2024-03-02", "2024-03-03"]))
+    assert list(daily["clicks"]) == [1000, 350, 100]
+    assert daily["spend"].tolist() == pytest.approx([1500.5, 549.5, 0.0])
+
+
+def test_a_missing_required_column_is_named():
+    export = "Amount spent (USD),Link clicks,Registrations\n100,50,10\n"
+    with pytest.raises(ValueError, match="attendees, sales"):
+        read_campaign_csv(io.StringIO(export))
+
+
+def test_campaign_inputs_treat_attendees_as_leads_without_a_leads_column():
+    inputs = campaign_inputs(read_campaign_csv(io.StringIO(EXPORT))["totals"])
+    assert inputs["cpc"] == pytest.approx(2050.0 / 1450)
+    assert inputs["landing_cr"] == pytest.approx(300 / 1450 * 100)
+    assert inputs["lead_rate"] == 100
+    assert inputs["sales_rate"] == pytest.approx(14 / 129 * 100)
+
+
+def test_file_digest_matches_for_paths_and_file_objects(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text(EXPORT)
+    with open(path, "rb") as fh:
+        assert file_digest(fh) == file_digest(path)
@@ -0,0 +1,30 @@
+import io
+
+import pytest
+
+from forecasting import crm_forecast, read_crm_leads, segment_funnel, segment_inputs
+from forecasting.funnel import CRM_DEFAULTS
+
+EXPORT = """lead_source,status,age_days
+Webinar,closed won,10
+Webinar,contacted,45
+Unknown,booked,400
+,showed,
+Referral,new,200
+Referral,contacted,
+"""
+
+
+def test_an_existing_unknown_label_merges_with_missing_values():
+    segments = read_crm_leads(io.StringIO(EXPORT), as_of="2024-06-01")["segments"]
+    sources = segments.groupby(level="source", observed=True)["leads"].sum()
+    assert sources["Unknown"] == 2
+    ages = segments.groupby(level="age_bucket", observed=True)["leads"].sum()
+    assert ages["Unknown"] == 2
+    assert segments["leads"].sum() == 6
+
+
+def test_segment_inputs_reproduce_the_per_segment_forecast():
+    funnel = segment_funnel(read_crm_leads(io.StringIO(EXPORT), as_of="2024-06-01")["segments"])
+    result = crm_forecast(**{**CRM_DEFAULTS, **segment_inputs(funnel)})
+    assert result["closed"] == pytest.approx(funnel["forecast_closed"].sum(), rel=1e-12)
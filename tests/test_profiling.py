@@ -0,0 +1,37 @@
+import pytest
+
+from forecasting import ProfileLog, Profiler, read_profile_log, summarize_profile
+from forecasting import profiling
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = tmp_path / "profile.jsonl"
+    profiler = Profiler(ProfileLog(path), session="s1")
+    for i in range(1000):
+        profiler.record(f"section {i % 3}", i / 1000)
+    profiler.flush()
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write("not json\n")
+    return path
+
+
+def test_full_read_skips_malformed_lines(log_path):
+    log = read_profile_log(log_path)
+    assert len(log) == 1000
+    assert set(summarize_profile(log)["section"]) == {"section 0", "section 1", "section 2"}
+
+
+@pytest.mark.parametrize("last", [1, 10, 999, 5000])
+def test_tail_read_returns_the_last_records(log_path, last, monkeypatch):
+    # Small blocks so the read crosses block boundaries mid-line
+    monkeypatch.setattr(profiling, "TAIL_BLOCK", 97)
+    full = read_profile_log(log_path)
+    tail = read_profile_log(log_path, last=last)
+    # The malformed trailing line counts towards ``last`` but is dropped
+    expected = full.tail(min(last - 1, len(full))) if last > 1 else full.iloc[:0]
+    assert tail["ms"].tolist() == expected["ms"].tolist()
+
+
+def test_missing_log_is_empty(tmp_path):
+    assert read_profile_log(tmp_path / "missing.jsonl", last=10).empty
@@ -0,0 +1,22 @@
+import pytest
+
+from forecasting import crm_forecast, leads_for_roi, reinvestment_frame, reinvestment_totals, simulate_reinvestment
+from forecasting.funnel import CRM_DEFAULTS
+
+
+def test_yearly_totals_add_up_the_first_twelve_simulated_months():
+    inputs = {"new_leads_per_month": 200, "cost_per_new_lead": 10.0}
+    timeline = reinvestment_frame(simulate_reinvestment(inputs, horizon=24))
+    totals = reinvestment_totals(timeline, inputs, "Moderate")
+    year = timeline[(timeline["mode"] == "Moderate") & (timeline["month"] <= 12)]
+    assert totals["revenue"] == pytest.approx(year["revenue"].sum())
+    assert totals["total_cost"] == pytest.approx(
+        totals["tech_cost"] + totals["salary_cost"] + totals["overhead_cost"] + totals["lead_cost"]
+    )
+    assert totals["roi"] == pytest.approx(year["cumulative_roi"].iloc[-1])
+
+
+def test_leads_for_roi_reaches_the_target_roi():
+    leads = leads_for_roi({}, 250.0)
+    inputs = {**CRM_DEFAULTS, "total_crm_leads": CRM_DEFAULTS["active_leads"] + leads}
+    assert crm_forecast(**inputs)["roi"] == pytest.approx(250.0)
@@ -0,0 +1,22 @@
+import numpy as np
+
+from forecasting import DRAW_CACHE, draw, simulate
+
+
+def test_draws_are_cached_and_read_only():
+    first = draw("cpc", 1.5, ("lognormal", 0.2), 10_000)
+    assert draw("cpc", 1.5, ("lognormal", 0.2), 10_000) is first
+    assert not first.flags.writeable
+
+
+def test_draw_cache_stays_within_its_byte_budget():
+    for value in range(1, 40):
+        draw("landing_cr", float(value), ("beta", 5.0), 1_000_000)
+    stats = DRAW_CACHE.stats()
+    assert stats["size_bytes"] <= stats["max_bytes"]
+    assert stats["evictions"] > 0
+
+
+def test_simulate_centres_on_the_point_forecast():
+    outcomes = simulate("webinar", {}, {"cpc": ("lognormal", 0.0)}, n=100)
+    assert np.allclose(outcomes["clicks"], 1000 / 1.5)
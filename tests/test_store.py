@@ -0,0 +1,93 @@
+import math
+
+import pandas as pd
+import pytest
+
+from forecasting import ScenarioStore, run_scenarios, webinar_forecast
+from forecasting.funnel import WEBINAR_DEFAULTS
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ScenarioStore(tmp_path / "scenarios.db")
+    yield store
+    store.close()
+
+
+def _priced():
+    return run_scenarios(pd.DataFrame({
+        "name": ["w-low", "w-high", "call", "crm"],
+        "client": ["acme", "acme", "acme", "globex"],
+        "model": ["webinar", "webinar", "book_a_call", "crm"],
+        "avg_deal_value": [500, 5_000, None, None],
+        "client_value": [None, None, 3_000, 1_500],
+    }))
+
+
+def test_save_many_stores_every_row_with_its_metrics(store):
+    priced = _priced()
+    assert store.save_many(priced) == 4
+    saved = store.query(limit=10, expand=True).set_index("name")
+    assert len(saved) == 4
+    assert saved.loc["w-high", "roas"] == pytest.approx(priced["roas"][1])
+    assert saved.loc["crm", "net_profit"] == pytest.approx(priced["net_profit"][3])
+    assert saved.loc["w-low", "input.avg_deal_value"] == 500
+    # Webinar scenarios have no ROI
+    assert math.isnan(saved.loc["w-low", "roi"])
+    assert store.clients() == ["acme", "globex"]
+
+
+def test_save_many_labels_unnamed_rows_by_model(store):
+    store.save_many(run_scenarios(pd.DataFrame({"budget": [1000, 2000]}), "webinar"), model="webinar")
+    assert sorted(store.query()["name"]) == ["webinar #0", "webinar #1"]
+
+
+def test_query_filters_and_orders_in_sql(store):
+    store.save_many(_priced())
+    by_roas = store.query(client="acme", order_by="roas")
+    assert list(by_roas["name"]) == ["call", "w-high", "w-low"]
+    ascending = store.query(order_by="roi", descending=False)
+    # NULL ROIs (the webinar rows) sort last
+    assert ascending["roi"][:2].is_monotonic_increasing
+    assert ascending["roi"][2:].isna().all()
+    assert list(store.query(model=["crm", "book_a_call"], order_by="name", descending=False)["name"]) == ["call", "crm"]
+    assert len(store.query(client="acme", limit=2)) == 2
+    assert store.query(since="2999-01-01").empty
+
+
+def test_query_rejects_unknown_sort_columns(store):
+    with pytest.raises(ValueError, match="Can't sort by 'inputs'"):
+        store.query(order_by="inputs")
+
+
+def test_save_and_load_round_trip(store):
+    results = webinar_forecast(**WEBINAR_DEFAULTS)
+    scenario_id = store.save("base", "webinar", WEBINAR_DEFAULTS, results, client="acme")
+    loaded = store.load([scenario_id]).iloc[0]
+    assert loaded["name"] == "base"
+    assert loaded["input.cpc"] == WEBINAR_DEFAULTS["cpc"]
+    assert loaded["result.net_profit"] == pytest.approx(results["net_profit"])
+    with pytest.raises(ValueError, match="Unknown model"):
+        store.save("bad", "radio", {}, {})
+
+
+def test_delete_removes_only_the_given_ids(store):
+    store.save_many(_priced())
+    ids = store.query(order_by="name", descending=False)["id"]
+    store.delete(ids[:2])
+    assert list(store.query(order_by="name", descending=False)["name"]) == ["w-high", "w-low"]
+
+
+def test_reopening_an_existing_database_keeps_its_scenarios(tmp_path):
+    path = tmp_path / "scenarios.db"
+    first = ScenarioStore(path)
+    first.save_many(_priced())
+    first.close()
+
+    reopened = ScenarioStore(path)
+    try:
+        assert len(reopened.query(limit=10)) == 4
+        reopened.save("extra", "crm", {}, {"roi": 10.0})
+        assert len(reopened.query(limit=10)) == 5
+    finally:
+        reopened.close()